@@ -1,6 +1,7 @@
 from django.contrib import admin
 from academic.models import AcademicYear, SchoolClass, Section, House, Enrollment, Subject, Department, Routine, \
-	AttendanceRecord, AttendanceSession, Assignment, AssignmentAttachment, Submission, Exam, Announcement
+	AttendanceRecord, AttendanceSession, AttendanceSummary, AttendanceBitmap, GateScanEvent, Assignment, \
+	AssignmentAttachment, Submission, Exam, Announcement, TimetableJob
 from user.models import Leave
 
 
@@ -96,6 +97,37 @@ class AttendanceRecordAdmin(admin.ModelAdmin):
 	list_editable = ('status',)
 
 
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+	list_display = ('student', 'academic_year', 'present', 'absent', 'last_marked')
+	list_filter = ('academic_year',)
+	search_fields = ('student__first_name', 'student__last_name')
+	readonly_fields = ('student', 'academic_year', 'present', 'absent', 'last_marked', 'updated_at')
+
+
+@admin.register(AttendanceBitmap)
+class AttendanceBitmapAdmin(admin.ModelAdmin):
+	list_display = ('student', 'academic_year', 'updated_at')
+	list_filter = ('academic_year',)
+	search_fields = ('student__first_name', 'student__last_name')
+	exclude = ('marked', 'present')
+	readonly_fields = ('student', 'academic_year', 'remarks', 'updated_at')
+
+
+@admin.register(GateScanEvent)
+class GateScanEventAdmin(admin.ModelAdmin):
+	list_display = ('card_id', 'scanned_at', 'device', 'received_at', 'processed_at')
+	list_filter = ('device',)
+	search_fields = ('card_id',)
+
+
+@admin.register(TimetableJob)
+class TimetableJobAdmin(admin.ModelAdmin):
+	list_display = ('id', 'academic_year', 'status', 'progress', 'created_by', 'created_at', 'finished_at')
+	list_filter = ('status',)
+	readonly_fields = ('progress', 'message', 'result', 'started_at', 'finished_at')
+
+
 @admin.register(Assignment)
 class AssignmentAdmin(admin.ModelAdmin):
 	list_display = ('id', 'title', 'subject', 'is_active', 'school_class', 'due_date', 'created_at')
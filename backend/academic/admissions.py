@@ -0,0 +1,247 @@
+import csv
+import datetime
+import io
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from academic.dashboard import invalidate_dashboard_snapshot
+from academic.ical import touch_calendars
+from academic.models import AcademicYear, Enrollment, House, Section, SectionRollCounter
+from user.emails import allocate_emails
+from user.passwords import generate_password, hash_passwords
+from user.models import CustomUser, Parent, Student
+
+STUDENT_COLUMNS = [
+	'first_name', 'last_name', 'date_of_birth', 'gender', 'blood_group', 'personal_email', 'phone_number',
+	'card_id', 'current_address', 'permanent_address', 'transportation', 'pickup_address', 'previous_school',
+	'previous_school_address',
+]
+ENROLLMENT_COLUMNS = ['school_class', 'section', 'house', 'enrollment_date']
+PARENT_COLUMNS = ['full_name', 'email', 'phone_number', 'occupation', 'guardian_relation', 'address']
+PARENT_ROLES = [('father', 'F'), ('mother', 'M'), ('guardian', 'G')]
+ADMISSION_COLUMNS = STUDENT_COLUMNS + ENROLLMENT_COLUMNS + [
+	f'{role}_{column}' for role, _ in PARENT_ROLES for column in PARENT_COLUMNS
+]
+
+PROGRESS_EVERY = 500
+BULK_BATCH_SIZE = 500
+
+
+def _cell(value):
+	if value is None:
+		return ''
+	if isinstance(value, datetime.datetime):
+		return value.date().isoformat()
+	if isinstance(value, datetime.date):
+		return value.isoformat()
+	if isinstance(value, float) and value.is_integer():
+		return str(int(value))
+	return str(value).strip()
+
+
+def read_admission_file(file, filename):
+	"""Read a CSV or XLSX admission sheet into a list of row dicts keyed by header."""
+	if filename.lower().endswith('.xlsx'):
+		try:
+			from openpyxl import load_workbook
+		except ImportError:
+			raise ValidationError('XLSX import requires openpyxl to be installed.')
+		sheet = load_workbook(file, read_only=True, data_only=True).active
+		rows = sheet.iter_rows(values_only=True)
+		header = [_cell(value) for value in next(rows, [])]
+		return [
+			dict(zip(header, (_cell(value) for value in row)))
+			for row in rows if any(value not in (None, '') for value in row)
+		]
+	if filename.lower().endswith('.csv'):
+		text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+		return [{key: _cell(value) for key, value in row.items() if key} for row in csv.DictReader(text)]
+	raise ValidationError('Upload a .csv or .xlsx file.')
+
+
+def _optional(row, column):
+	return row.get(column) or None
+
+
+def _error_dict(error, prefix=''):
+	return {f'{prefix}{field}': messages for field, messages in error.message_dict.items()}
+
+
+def import_admissions(rows, dry_run=False, progress=None):
+	"""
+	Validate a whole admission sheet in memory and, unless ``dry_run``, create its parents,
+	students, user accounts and enrollments with a handful of bulk inserts.
+
+	Parents are de-duplicated by email within the file and against existing parents. Nothing
+	is written if any row is invalid. ``progress(stage, done, total)`` is called as work
+	advances. Returns a report with per-row errors, the number of rows created and the
+	generated student ``credentials``.
+	"""
+	progress = progress or (lambda stage, done, total: None)
+	total = len(rows)
+	report = {'dry_run': dry_run, 'total_rows': total, 'valid_rows': 0, 'errors': [], 'created': {}}
+
+	academic_year = AcademicYear.objects.filter(is_active=True).first()
+	if academic_year is None:
+		raise ValidationError('No active academic year found. Please set one.')
+
+	sections = {
+		(class_name.strip().lower(), name.strip().lower()): (section_id, school_class_id)
+		for section_id, school_class_id, class_name, name in Section.objects.values_list(
+			'id', 'school_class_id', 'school_class__name', 'name'
+		)
+	}
+	houses = {color.strip().lower(): house_id for house_id, color in House.objects.values_list('id', 'color')}
+	parent_emails = {row.get(f'{role}_email', '').lower() for row in rows for role, _ in PARENT_ROLES} - {''}
+	# Stored emails keep the case they were typed in, so match on the lower-cased column.
+	existing_parents = {
+		email.lower(): parent_id
+		for parent_id, email in Parent.objects.alias(email_lower=Lower('email')).filter(
+			email_lower__in=parent_emails
+		).values_list('id', 'email')
+	}
+	card_ids = {row['card_id'] for row in rows if row.get('card_id')}
+	taken_cards = set(Student.objects.filter(card_id__in=card_ids).values_list('card_id', flat=True))
+
+	new_parents = {}
+	admissions = []
+	seen_cards = set()
+	for index, row in enumerate(rows):
+		errors = {}
+
+		student = Student(**{column: _optional(row, column) for column in STUDENT_COLUMNS})
+		for column in ('current_address', 'permanent_address'):
+			setattr(student, column, getattr(student, column) or '')
+		try:
+			student.full_clean(
+				exclude=['father', 'mother', 'guardian', 'email', 'password'],
+				validate_unique=False, validate_constraints=False
+			)
+		except ValidationError as e:
+			errors.update(_error_dict(e))
+		if student.card_id and (student.card_id in taken_cards or student.card_id in seen_cards):
+			errors['card_id'] = ['A student with this card id already exists.']
+		seen_cards.add(student.card_id)
+
+		section = sections.get(((row.get('school_class') or '').lower(), (row.get('section') or '').lower()))
+		if section is None:
+			errors['section'] = [f"Unknown class/section \"{row.get('school_class')}\"/\"{row.get('section')}\"."]
+		house = None
+		if row.get('house'):
+			house = houses.get(row['house'].lower())
+			if house is None:
+				errors['house'] = [f"Unknown house \"{row['house']}\"."]
+		try:
+			enrollment_date = datetime.date.fromisoformat(row['enrollment_date']) if row.get('enrollment_date') \
+				else datetime.date.today()
+		except ValueError:
+			errors['enrollment_date'] = ['Enter a valid date in YYYY-MM-DD format.']
+			enrollment_date = None
+
+		parents = {}
+		for role, relationship in PARENT_ROLES:
+			values = {column: _optional(row, f'{role}_{column}') for column in PARENT_COLUMNS}
+			if not any(values.values()):
+				continue
+			email = (values['email'] or '').lower()
+			if email in existing_parents:
+				parents[role] = existing_parents[email]
+				continue
+			if email and email in new_parents:
+				parents[role] = new_parents[email].id
+				continue
+			parent = Parent(relationship=relationship, **values)
+			try:
+				parent.full_clean(validate_unique=False, validate_constraints=False)
+			except ValidationError as e:
+				errors.update(_error_dict(e, prefix=f'{role}_'))
+				continue
+			new_parents[email or parent.id] = parent
+			parents[role] = parent.id
+
+		if errors:
+			# Row numbers match the spreadsheet, whose first row is the header.
+			report['errors'].append({'row': index + 2, 'errors': errors})
+		else:
+			admissions.append((student, parents, section, house, enrollment_date))
+		if (index + 1) % PROGRESS_EVERY == 0 or index + 1 == total:
+			progress('validate', index + 1, total)
+
+	report['valid_rows'] = len(admissions)
+	if report['errors'] or dry_run:
+		return report
+
+	# Hashed across all cores before the transaction opens; this is the slow part of an import.
+	raw_passwords = [generate_password() for _ in admissions]
+	hashed_passwords = hash_passwords(raw_passwords)
+	progress('passwords', len(admissions), len(admissions))
+
+	with transaction.atomic():
+		emails = allocate_emails([(student.first_name, student.last_name) for student, _, _, _, _ in admissions])
+		parent_users = set(CustomUser.objects.annotate(email_lower=Lower('email')).filter(
+			email_lower__in=[parent.email.lower() for parent in new_parents.values() if parent.email]
+		).values_list('email_lower', flat=True))
+
+		parents = list(new_parents.values())
+		Parent.objects.bulk_create(parents, batch_size=BULK_BATCH_SIZE)
+		progress('parents', len(parents), len(parents))
+
+		students = []
+		for (student, parent_ids, _, _, _), email, password in zip(admissions, emails, hashed_passwords):
+			student.email = email
+			student.password = password
+			student.father_id = parent_ids.get('father')
+			student.mother_id = parent_ids.get('mother')
+			student.guardian_id = parent_ids.get('guardian')
+			students.append(student)
+		Student.objects.bulk_create(students, batch_size=BULK_BATCH_SIZE)
+		progress('students', len(students), len(students))
+
+		# Same accounts the post_save signals create for single admissions.
+		users = [CustomUser(email=student.email, roles='student') for student in students]
+		users += [
+			CustomUser(email=parent.email, roles='parent')
+			for parent in parents if parent.email and parent.email.lower() not in parent_users
+		]
+		CustomUser.objects.bulk_create(users, batch_size=BULK_BATCH_SIZE)
+		progress('users', len(users), len(users))
+
+		block_sizes = defaultdict(int)
+		for _, _, (section_id, school_class_id), _, _ in admissions:
+			block_sizes[(academic_year.id, school_class_id, section_id)] += 1
+		next_roll = SectionRollCounter.reserve_blocks(block_sizes)
+		enrollments = []
+		for student, _, (section_id, school_class_id), house_id, enrollment_date in admissions:
+			key = (academic_year.id, school_class_id, section_id)
+			enrollments.append(Enrollment(
+				student=student,
+				academic_year=academic_year,
+				school_class_id=school_class_id,
+				section_id=section_id,
+				house_id=house_id,
+				enrollment_date=enrollment_date,
+				roll_number=next_roll[key]
+			))
+			next_roll[key] += 1
+		Enrollment.objects.bulk_create(enrollments, batch_size=BULK_BATCH_SIZE)
+		Student.objects.filter(
+			current_enrollment=None, enrollments__academic_year=academic_year
+		).refresh_current_enrollment()
+		progress('enrollments', len(enrollments), len(enrollments))
+
+		invalidate_dashboard_snapshot()
+		touch_calendars()
+
+	report['credentials'] = [
+		{'email': student.email, 'password': password} for student, password in zip(students, raw_passwords)
+	]
+	report['created'] = {
+		'parents': len(parents),
+		'students': len(students),
+		'users': len(users),
+		'enrollments': len(enrollments),
+	}
+	return report
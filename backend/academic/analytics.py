@@ -0,0 +1,181 @@
+import numpy as np
+
+from academic.models import AttendanceRecord, AttendanceSession, Section
+from user.models import Student
+
+# datetime64[D] counts days from 1970-01-01 (a Thursday); shifting by 3 makes weeks start on Sunday.
+_WEEK_SHIFT = 3
+
+
+def _factorize(values):
+	index = {}
+	codes = np.fromiter((index.setdefault(value, len(index)) for value in values), dtype=np.int64, count=len(values))
+	return codes, list(index)
+
+
+def _rates(present, total):
+	with np.errstate(divide='ignore', invalid='ignore'):
+		return np.where(total > 0, present / np.maximum(total, 1), 0.0)
+
+
+def _grouped(group_codes, period_codes, n_groups, n_periods, status):
+	keys = group_codes * n_periods + period_codes
+	size = n_groups * n_periods
+	present = np.bincount(keys, weights=status, minlength=size).reshape(n_groups, n_periods)
+	total = np.bincount(keys, minlength=size).reshape(n_groups, n_periods)
+	return present, total
+
+
+def _series(labels, present, total):
+	rates = _rates(present, total)
+	return [
+		{'period': label, 'present': int(p), 'total': int(t), 'rate': round(float(r) * 100, 2)}
+		for label, p, t, r in zip(labels, present, total, rates) if t
+	]
+
+
+def _moving_average(values, window):
+	window = max(int(window), 1)
+	cumulative = np.cumsum(np.insert(values, 0, 0.0))
+	counts = np.minimum(np.arange(1, len(values) + 1), window)
+	starts = np.arange(len(values)) + 1 - counts
+	return (cumulative[1:] - cumulative[starts]) / counts
+
+
+def attendance_analytics(start, end, school_class=None, section=None, threshold=90, window=7):
+	"""
+	Daily, weekly and monthly attendance rates per school, class and section between
+	``start`` and ``end``, plus chronic absentees (present rate below ``threshold`` percent)
+	and a ``window``-day moving average of the daily school rate.
+
+	The sessions in range (a few rows per section and day) are read once; the records, which
+	can run to hundreds of thousands, are read as bare ``(session, student, status)`` triples and
+	mapped onto the sessions' dates and sections with integer codes, so no per-record date or
+	section object is ever built. Every rollup is then computed with NumPy on those codes.
+	"""
+	sessions = AttendanceSession.objects.order_by().filter(date__range=(start, end))
+	if school_class:
+		sessions = sessions.filter(school_class_id=school_class)
+	if section:
+		sessions = sessions.filter(section_id=section)
+	session_rows = list(sessions.values_list('id', 'date', 'section_id'))
+
+	result = {
+		'start': start,
+		'end': end,
+		'daily': [],
+		'weekly': {'school': [], 'classes': [], 'sections': []},
+		'monthly': {'school': [], 'classes': [], 'sections': []},
+		'chronic_absentees': [],
+	}
+	if not session_rows:
+		return result
+
+	session_ids, session_dates, session_sections = zip(*session_rows)
+	session_index = {session_id: i for i, session_id in enumerate(session_ids)}
+	session_days = np.array(session_dates, dtype='datetime64[D]')
+	session_section_codes, sections = _factorize(session_sections)
+
+	rows = list(AttendanceRecord.objects.order_by().filter(session__in=sessions).values_list(
+		'session_id', 'student_id', 'status'
+	))
+	if not rows:
+		return result
+	record_sessions, student_ids, statuses = zip(*rows)
+
+	session_codes = np.fromiter(
+		(session_index[session_id] for session_id in record_sessions), dtype=np.int64, count=len(record_sessions)
+	)
+	days = session_days[session_codes]
+	section_codes = session_section_codes[session_codes]
+	status = np.fromiter(statuses, dtype=np.float64, count=len(statuses))
+	student_codes, students = _factorize(student_ids)
+
+	section_info = {
+		row[0]: row[1:]
+		for row in Section.objects.filter(id__in=sections).values_list(
+			'id', 'name', 'school_class_id', 'school_class__name'
+		)
+	}
+	class_of_section, classes = _factorize([section_info[section_id][1] for section_id in sections])
+	class_codes = class_of_section[section_codes]
+	class_names = {info[1]: info[2] for info in section_info.values()}
+
+	# Daily school-wide series with moving average.
+	day_labels, day_codes = np.unique(days, return_inverse=True)
+	present = np.bincount(day_codes, weights=status)
+	total = np.bincount(day_codes)
+	daily_rates = _rates(present, total) * 100
+	moving = _moving_average(daily_rates, window)
+	result['daily'] = [
+		{
+			'date': label.item(),
+			'present': int(p),
+			'total': int(t),
+			'rate': round(float(r), 2),
+			'moving_average': round(float(m), 2),
+		}
+		for label, p, t, r, m in zip(day_labels, present, total, daily_rates, moving)
+	]
+
+	periods = {
+		'weekly': (days - _WEEK_SHIFT).astype('datetime64[W]').astype('datetime64[D]') + _WEEK_SHIFT,
+		'monthly': days.astype('datetime64[M]').astype('datetime64[D]'),
+	}
+	for name, period_days in periods.items():
+		labels, period_codes = np.unique(period_days, return_inverse=True)
+		labels = [label.item() for label in labels]
+		n_periods = len(labels)
+
+		present, total = _grouped(np.zeros_like(period_codes), period_codes, 1, n_periods, status)
+		result[name]['school'] = _series(labels, present[0], total[0])
+
+		present, total = _grouped(class_codes, period_codes, len(classes), n_periods, status)
+		result[name]['classes'] = [
+			{'id': class_id, 'name': class_names[class_id], 'series': _series(labels, present[i], total[i])}
+			for i, class_id in enumerate(classes)
+		]
+
+		present, total = _grouped(section_codes, period_codes, len(sections), n_periods, status)
+		result[name]['sections'] = [
+			{
+				'id': section_id,
+				'name': section_info[section_id][0],
+				'school_class': section_info[section_id][2],
+				'series': _series(labels, present[i], total[i]),
+			}
+			for i, section_id in enumerate(sections)
+		]
+
+	# Chronic absentees: students whose present rate is below the threshold.
+	present = np.bincount(student_codes, weights=status, minlength=len(students))
+	total = np.bincount(student_codes, minlength=len(students))
+	rates = _rates(present, total) * 100
+	# The section a student is listed under is the one of their latest session in range; rows come
+	# back in no particular order, so sort by (student, day) and take the last row of each student.
+	order = np.lexsort((days, student_codes))
+	last = order[np.append(student_codes[order][1:] != student_codes[order][:-1], True)]
+	last_section = np.zeros(len(students), dtype=np.int64)
+	last_section[student_codes[last]] = section_codes[last]
+	flagged = np.flatnonzero(rates < threshold)
+	flagged = flagged[np.argsort(rates[flagged], kind='stable')]
+	full_names = {
+		student_id: f'{first_name} {last_name}'
+		for student_id, first_name, last_name in Student.objects.filter(
+			id__in=[students[i] for i in flagged]
+		).values_list('id', 'first_name', 'last_name')
+	} if len(flagged) else {}
+	for i in flagged:
+		section_id = sections[last_section[i]]
+		result['chronic_absentees'].append({
+			'student': students[i],
+			'full_name': full_names.get(students[i]),
+			'school_class': section_info[section_id][2],
+			'section': section_info[section_id][0],
+			'present': int(present[i]),
+			'absent': int(total[i] - present[i]),
+			'rate': round(float(rates[i]), 2),
+		})
+
+	return result
+
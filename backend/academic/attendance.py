@@ -0,0 +1,211 @@
+import datetime
+import uuid
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from academic.dashboard import invalidate_dashboard_snapshot
+from academic.models import AttendanceRecord, AttendanceSummary, AttendanceBitmap
+
+SYNC_TOKEN_SALT = 'academic.attendance-sync'
+# Changes committed slightly out of timestamp order are caught by re-sending a short window.
+SYNC_OVERLAP = datetime.timedelta(seconds=5)
+SYNC_INITIAL_DAYS = 30
+SYNC_FIELDS = ['id', 'session', 'student', 'status', 'remarks', 'version']
+
+
+def _to_status(value):
+	if isinstance(value, bool):
+		return value
+	if isinstance(value, int) and value in (0, 1):
+		return bool(value)
+	if isinstance(value, str) and value.strip().lower() in ('true', '1', 'present', 'p'):
+		return True
+	if isinstance(value, str) and value.strip().lower() in ('false', '0', 'absent', 'a'):
+		return False
+	raise ValidationError(f'"{value}" is not a valid attendance status.')
+
+
+def _to_datetime(value, now):
+	moment = parse_datetime(value) if isinstance(value, str) else None
+	if moment is None:
+		raise ValidationError(f'"{value}" is not a valid ISO 8601 timestamp.')
+	if timezone.is_naive(moment):
+		moment = timezone.make_aware(moment, datetime.timezone.utc)
+	# A client clock running ahead must not make its edit unbeatable.
+	return min(moment, now)
+
+
+def _is_uuid(value):
+	try:
+		uuid.UUID(str(value))
+		return True
+	except ValueError:
+		return False
+
+
+def _row_result(item, result, record=None, detail=None):
+	row = {
+		'id': str(record.id) if record else item.get('id'),
+		'session': str(record.session_id) if record else item.get('session'),
+		'student': str(record.student_id) if record else item.get('student'),
+		'result': result,
+	}
+	if record:
+		row['version'] = record.version
+	if detail:
+		row['detail'] = detail
+	return row
+
+
+def apply_attendance_changes(items, session_id=None, partial=True, section_ids=None):
+	"""
+	Apply status/remarks changes to many attendance records in one transaction.
+
+	Each item addresses its record either by ``id`` or by ``session`` + ``student``.
+	When ``session_id`` is given every record must belong to that session, and when
+	``section_ids`` is given every record must belong to a session of those sections; other
+	records are reported as ``not_found``. All records
+	are fetched with a single query and written back with a single ``bulk_update``.
+	With ``partial=False`` nothing is written unless every item is valid.
+
+	An item may carry ``modified_at``, the ISO 8601 time the edit was made on the client.
+	Such an edit is applied only if it is newer than the record's last change (last writer
+	wins), so replaying a batch is harmless. Every applied change bumps ``version``.
+
+	Returns ``(results, updated_records)`` where ``results`` has one entry per item in
+	input order with ``result`` set to ``updated``, ``stale``, ``not_found`` or ``invalid``.
+	"""
+	now = timezone.now()
+	results = [None] * len(items)
+	ids = set()
+	sessions = set()
+	students = set()
+
+	for index, item in enumerate(items):
+		if not isinstance(item, dict):
+			results[index] = _row_result({}, 'invalid', detail='Each record must be an object.')
+			continue
+		item_session = item.get('session') or session_id
+		if not all(_is_uuid(value) for value in (item.get('id'), item_session, item.get('student')) if value):
+			results[index] = _row_result(item, 'invalid', detail='Invalid identifier.')
+		elif item.get('id'):
+			ids.add(str(item['id']))
+		elif item_session and item.get('student'):
+			sessions.add(str(item_session))
+			students.add(str(item['student']))
+		else:
+			results[index] = _row_result(item, 'invalid', detail='Each record must include "id" or "student".')
+
+	with transaction.atomic():
+		lookup = Q(pk__in=ids) | Q(session_id__in=sessions, student_id__in=students)
+		records = AttendanceRecord.objects.select_for_update(of=('self',)).select_related('session').filter(
+			lookup
+		).order_by('pk')
+		if session_id:
+			records = records.filter(session_id=session_id)
+		if section_ids is not None:
+			records = records.filter(session__section_id__in=section_ids)
+
+		by_id = {}
+		by_pair = {}
+		for record in records:
+			by_id[str(record.id)] = record
+			by_pair[(str(record.session_id), str(record.student_id))] = record
+
+		changed = {}
+		previous_status = {}
+		for index, item in enumerate(items):
+			if results[index] is not None:
+				continue
+
+			if item.get('id'):
+				record = by_id.get(str(item['id']))
+			else:
+				record = by_pair.get((str(item.get('session') or session_id), str(item['student'])))
+
+			if record is None:
+				results[index] = _row_result(item, 'not_found', detail='Attendance record not found.')
+				continue
+
+			try:
+				new_status = _to_status(item['status']) if 'status' in item else record.status
+				modified_at = _to_datetime(item['modified_at'], now) if item.get('modified_at') else now
+			except ValidationError as e:
+				results[index] = _row_result(item, 'invalid', record, detail=e.messages[0])
+				continue
+
+			if item.get('modified_at') and record.modified_at and modified_at <= record.modified_at:
+				results[index] = _row_result(item, 'stale', record, detail='A newer change has already been applied.')
+				continue
+
+			previous_status.setdefault(record.pk, record.status)
+			record.status = new_status
+			if 'remarks' in item:
+				record.remarks = item['remarks']
+			if record.pk not in changed:
+				record.version += 1
+			record.modified_at = modified_at
+			record.updated_at = now
+			changed[record.pk] = record
+			results[index] = _row_result(item, 'updated', record)
+
+		failed = any(row['result'] not in ('updated', 'stale') for row in results)
+		if changed and (partial or not failed):
+			AttendanceRecord.objects.bulk_update(
+				changed.values(), ['status', 'remarks', 'version', 'modified_at', 'updated_at']
+			)
+			AttendanceSummary.apply_status_changes(changed.values(), previous_status)
+			AttendanceBitmap.sync_records(changed.values())
+			invalidate_dashboard_snapshot()
+			return results, list(changed.values())
+
+	return results, []
+
+
+def make_sync_token(moment):
+	return signing.dumps({'since': moment.isoformat()}, salt=SYNC_TOKEN_SALT)
+
+
+def read_sync_token(token):
+	try:
+		return datetime.datetime.fromisoformat(signing.loads(token, salt=SYNC_TOKEN_SALT)['since'])
+	except (signing.BadSignature, KeyError, TypeError, ValueError):
+		raise ValidationError('Invalid sync token.')
+
+
+def sync_attendance(items, sync_token=None, section_ids=()):
+	"""
+	Apply a batch of offline edits and return the server-side changes the client has not seen.
+
+	Edits are applied with ``apply_attendance_changes`` (last writer wins on ``modified_at``)
+	and, like the delta, are limited to sessions of ``section_ids``: edits to other sections'
+	records come back as ``not_found``. The delta holds the records of those sections changed
+	since ``sync_token``, or the last ``SYNC_INITIAL_DAYS`` days on a first sync.
+	Rows are sent as value lists in ``SYNC_FIELDS`` order; clients keep the highest version.
+	"""
+	now = timezone.now()
+	since = read_sync_token(sync_token) if sync_token else None
+	results, _ = apply_attendance_changes(items, section_ids=section_ids)
+
+	changes = AttendanceRecord.objects.order_by('updated_at').filter(session__section_id__in=section_ids)
+	if since:
+		changes = changes.filter(updated_at__gt=since - SYNC_OVERLAP)
+	else:
+		changes = changes.filter(session__date__gte=timezone.localdate() - datetime.timedelta(days=SYNC_INITIAL_DAYS))
+
+	return {
+		'results': results,
+		'fields': SYNC_FIELDS,
+		'changes': [
+			[str(record_id), str(session_id), str(student_id), record_status, remarks, version]
+			for record_id, session_id, student_id, record_status, remarks, version in changes.values_list(
+				'id', 'session_id', 'student_id', 'status', 'remarks', 'version'
+			)
+		],
+		'sync_token': make_sync_token(now),
+	}
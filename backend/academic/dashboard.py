@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from academic.models import SchoolClass, AttendanceRecord, AttendanceSession, Enrollment
+from user.models import Student, Teacher, ManagementStaff, Parent
+
+DASHBOARD_CACHE_KEY = 'academic:admin-dashboard'
+DASHBOARD_CACHE_TIMEOUT = 60 * 10
+
+
+def _count_per_class(queryset, class_field):
+	counts = queryset.filter(**{class_field: OuterRef('pk')}).order_by().values(class_field).annotate(
+		total=Count('pk')
+	).values('total')
+	return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def build_dashboard_snapshot():
+	students = Student.objects.aggregate(
+		total_student=Count('id'),
+		total_student_active=Count('id', filter=Q(account_status='A')),
+		total_student_inactive=Count('id', filter=Q(account_status='I')),
+		total_boys=Count('id', filter=Q(gender='M')),
+		total_girls=Count('id', filter=Q(gender='F')),
+	)
+	teachers = Teacher.objects.aggregate(
+		total_teacher_active=Count('id', filter=Q(staff__account_status='A')),
+		total_teacher_inactive=Count('id', filter=Q(staff__account_status='I')),
+	)
+	management = ManagementStaff.objects.aggregate(
+		total_staff_active=Count('id', filter=Q(staff__account_status='A')),
+		total_staff_inactive=Count('id', filter=Q(staff__account_status='I')),
+	)
+
+	classes = SchoolClass.objects.order_by('name').annotate(
+		present_count=_count_per_class(AttendanceRecord.objects.filter(status=True), 'session__school_class'),
+		session_count=_count_per_class(AttendanceSession.objects.all(), 'school_class'),
+		student_count=_count_per_class(Enrollment.objects.all(), 'school_class'),
+	).values_list('name', 'present_count', 'session_count', 'student_count')
+
+	average_weekly_attendance = {}
+	for name, present_count, session_count, student_count in classes:
+		expected_attendance = session_count * student_count
+		if expected_attendance > 0:
+			attendance_percentage = (present_count / expected_attendance) * 100
+		else:
+			attendance_percentage = 0
+		average_weekly_attendance[name] = round(attendance_percentage, 2)
+
+	return {
+		'total_student_active': students['total_student_active'],
+		'total_student_inactive': students['total_student_inactive'],
+		'total_teacher_active': teachers['total_teacher_active'],
+		'total_teacher_inactive': teachers['total_teacher_inactive'],
+		'total_parent_active': Parent.objects.count(),
+		'total_parent_inactive': 0,
+		'total_staff_active': management['total_staff_active'],
+		'total_staff_inactive': management['total_staff_inactive'],
+		'total_student': students['total_student'],
+		'total_boys': students['total_boys'],
+		'total_girls': students['total_girls'],
+		'average_weekly_attendance': average_weekly_attendance,
+	}
+
+
+def get_dashboard_snapshot():
+	snapshot = cache.get(DASHBOARD_CACHE_KEY)
+	if snapshot is None:
+		snapshot = build_dashboard_snapshot()
+		cache.set(DASHBOARD_CACHE_KEY, snapshot, DASHBOARD_CACHE_TIMEOUT)
+	return snapshot
+
+
+def invalidate_dashboard_snapshot():
+	# Deferred until commit so a concurrent reader cannot cache the pre-commit state again.
+	transaction.on_commit(lambda: cache.delete(DASHBOARD_CACHE_KEY))
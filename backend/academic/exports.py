@@ -0,0 +1,124 @@
+import csv
+
+from academic.models import AttendanceRecord
+
+EXPORT_CHUNK_SIZE = 5000
+
+EXPORT_COLUMNS = [
+	('date', 'session__date'),
+	('school_class', 'session__school_class__name'),
+	('section', 'session__section__name'),
+	('student_id', 'student_id'),
+	('first_name', 'student__first_name'),
+	('last_name', 'student__last_name'),
+	('email', 'student__email'),
+	('status', 'status'),
+	('remarks', 'remarks'),
+]
+
+
+def attendance_export_rows(academic_year=None, school_class=None, section=None, start=None, end=None,
+                           chunk_size=EXPORT_CHUNK_SIZE):
+	records = AttendanceRecord.objects.order_by('session__date', 'session__school_class__name',
+	                                            'session__section__name', 'student__last_name')
+	if academic_year:
+		records = records.filter(session__academic_year=academic_year)
+	if school_class:
+		records = records.filter(session__school_class=school_class)
+	if section:
+		records = records.filter(session__section=section)
+	if start:
+		records = records.filter(session__date__gte=start)
+	if end:
+		records = records.filter(session__date__lte=end)
+
+	# iterator() uses a server-side cursor on PostgreSQL, so only one chunk is in memory.
+	return records.values_list(*[field for _, field in EXPORT_COLUMNS]).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+	def write(self, value):
+		return value
+
+
+def stream_csv(rows):
+	writer = csv.writer(_Echo())
+	yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+	for row in rows:
+		yield writer.writerow(row)
+
+
+class _ChunkSink:
+	"""Write-only file object that hands written bytes back to the generator draining it."""
+
+	def __init__(self):
+		self.chunks = []
+		self.position = 0
+		self.closed = False
+
+	def write(self, data):
+		data = bytes(data)
+		self.chunks.append(data)
+		self.position += len(data)
+		return len(data)
+
+	def tell(self):
+		return self.position
+
+	def flush(self):
+		pass
+
+	def close(self):
+		self.closed = True
+
+	def drain(self):
+		data = b''.join(self.chunks)
+		self.chunks = []
+		return data
+
+
+def stream_parquet(rows, chunk_size=EXPORT_CHUNK_SIZE):
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+
+	schema = pa.schema([
+		('date', pa.date32()),
+		('school_class', pa.string()),
+		('section', pa.string()),
+		('student_id', pa.string()),
+		('first_name', pa.string()),
+		('last_name', pa.string()),
+		('email', pa.string()),
+		('status', pa.bool_()),
+		('remarks', pa.string()),
+	])
+	sink = _ChunkSink()
+	writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+	def write_batch(batch):
+		columns = list(zip(*batch))
+		columns[3] = [str(value) for value in columns[3]]
+		writer.write_table(pa.Table.from_arrays(
+			[pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+			schema=schema
+		))
+
+	batch = []
+	for row in rows:
+		batch.append(row)
+		if len(batch) >= chunk_size:
+			write_batch(batch)
+			batch = []
+			yield sink.drain()
+	if batch:
+		write_batch(batch)
+	writer.close()
+	yield sink.drain()
+
+
+def parquet_available():
+	try:
+		import pyarrow.parquet  # noqa: F401
+	except ImportError:
+		return False
+	return True
@@ -0,0 +1,126 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from academic.attendance import apply_attendance_changes
+from academic.models import AttendanceRecord, GateScanEvent
+from crons.cron import precreate_attendance_sessions
+from user.models import Student
+
+MAX_SCAN_BATCH = 5000
+GATE_FLUSH_BATCH_SIZE = 20000
+
+
+def _scan_time(value, now):
+	try:
+		moment = parse_datetime(value) if isinstance(value, str) else None
+	except ValueError:
+		moment = None
+	if moment is None:
+		return None
+	if timezone.is_naive(moment):
+		moment = timezone.make_aware(moment)
+	return min(moment, now)
+
+
+def ingest_gate_scans(events, device=''):
+	"""
+	Buffer a batch of gate scans with a single insert. Nothing is looked up here, so the
+	gate burst costs one write per batch; matching to students happens in the flush.
+
+	Each event needs ``card_id`` and an ISO 8601 ``scanned_at`` and may override ``device``.
+	Returns ``(accepted, rejected)`` where ``rejected`` lists the indexes of invalid events.
+	"""
+	now = timezone.now()
+	scans = []
+	rejected = []
+	for index, event in enumerate(events):
+		if not isinstance(event, dict):
+			rejected.append(index)
+			continue
+		card_id = str(event.get('card_id') or '').strip()
+		scanned_at = _scan_time(event.get('scanned_at'), now)
+		if not card_id or len(card_id) > 64 or scanned_at is None:
+			rejected.append(index)
+			continue
+		scans.append(GateScanEvent(
+			card_id=card_id,
+			scanned_at=scanned_at,
+			device=str(event.get('device') or device)[:64]
+		))
+	GateScanEvent.objects.bulk_create(scans, batch_size=1000)
+	return len(scans), rejected
+
+
+def flush_gate_scans(batch_size=GATE_FLUSH_BATCH_SIZE):
+	"""
+	Mark students present from up to ``batch_size`` buffered scans.
+
+	Scans are reduced to the first scan per student per day and applied through
+	``apply_attendance_changes`` with the scan time as ``modified_at``, so a teacher's
+	later correction still wins. Records that are already present are not rewritten.
+	Concurrent flushes skip each other's locked events.
+	"""
+	with transaction.atomic():
+		events = list(
+			GateScanEvent.objects.select_for_update(skip_locked=True).filter(
+				processed_at__isnull=True
+			).order_by('received_at').values_list('id', 'card_id', 'scanned_at')[:batch_size]
+		)
+		if not events:
+			return {'events': 0, 'unmatched': 0, 'updated': 0}
+
+		students = {
+			card_id: (student_id, section_id)
+			for card_id, student_id, section_id in Student.objects.filter(
+				card_id__in={card_id for _, card_id, _ in events}
+			).values_list('card_id', 'id', 'current_enrollment__section_id')
+		}
+		first_scan = {}
+		scanned_sections = defaultdict(set)
+		unmatched = 0
+		for _, card_id, scanned_at in events:
+			if card_id not in students:
+				unmatched += 1
+				continue
+			student_id, section_id = students[card_id]
+			key = (student_id, timezone.localdate(scanned_at))
+			if key not in first_scan or scanned_at < first_scan[key]:
+				first_scan[key] = scanned_at
+			if section_id:
+				scanned_sections[key[1]].add(section_id)
+
+		dates = {date for _, date in first_scan}
+		for date, section_ids in scanned_sections.items():
+			# Only the scanned students' sections: a late scan must not open (and mark absent) every
+			# other section on that day. A no-op once the morning job has run.
+			if date <= timezone.localdate():
+				precreate_attendance_sessions(date, section_ids=section_ids)
+
+		records = AttendanceRecord.objects.filter(
+			student_id__in={student_id for student_id, _ in first_scan},
+			session__date__in=dates,
+			status=False
+		).values_list('id', 'student_id', 'session__date')
+		items = [
+			{'id': str(record_id), 'status': True, 'modified_at': first_scan[(student_id, date)].isoformat()}
+			for record_id, student_id, date in records if (student_id, date) in first_scan
+		]
+		_, updated = apply_attendance_changes(items) if items else ([], [])
+
+		GateScanEvent.objects.filter(id__in=[event_id for event_id, _, _ in events]).update(
+			processed_at=timezone.now()
+		)
+	return {'events': len(events), 'unmatched': unmatched, 'updated': len(updated)}
+
+
+def drain_gate_scans(batch_size=GATE_FLUSH_BATCH_SIZE):
+	totals = {'events': 0, 'unmatched': 0, 'updated': 0}
+	while True:
+		result = flush_gate_scans(batch_size)
+		for key in totals:
+			totals[key] += result[key]
+		if result['events'] < batch_size:
+			return totals
@@ -0,0 +1,282 @@
+import datetime
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from academic.models import AcademicYear, Assignment, Exam, Routine
+from user.models import CustomUser, Parent, Student, Teacher
+
+CALENDAR_STAMP_KEY = 'academic:calendar:changed'
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+PRODID = '-//Sikshyalaya//Timetable//EN'
+UID_DOMAIN = 'sikshyalaya'
+WEEKDAYS = {'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3, 'Friday': 4, 'Saturday': 5, 'Sunday': 6}
+
+
+def feed_token(user):
+	return str(user.calendar_key)
+
+
+def rotate_feed_token(user):
+	"""Give ``user`` a new feed URL; the old one stops working at once."""
+	user.calendar_key = uuid.uuid4()
+	user.save(update_fields=['calendar_key'])
+	return feed_token(user)
+
+
+def user_for_token(token):
+	"""Return the active user a feed token belongs to, or None if it is unknown or was rotated."""
+	return CustomUser.objects.filter(calendar_key=token, is_active=True).first()
+
+
+def calendar_changed_at():
+	"""
+	Unix time, in whole seconds, of the last change to anything the feeds show. Feeds are cached and
+	validated against it, so one cache read answers a conditional request.
+	"""
+	stamp = cache.get(CALENDAR_STAMP_KEY)
+	if stamp is None:
+		cache.add(CALENDAR_STAMP_KEY, int(timezone.now().timestamp()), None)
+		stamp = cache.get(CALENDAR_STAMP_KEY)
+	return stamp
+
+
+def touch_calendars():
+	def bump():
+		previous = cache.get(CALENDAR_STAMP_KEY) or 0
+		# Always move forward by at least a second so two changes never share a Last-Modified.
+		cache.set(CALENDAR_STAMP_KEY, max(int(timezone.now().timestamp()), previous + 1), None)
+
+	transaction.on_commit(bump)
+
+
+def feed_etag(user, stamp):
+	return '"%s"' % hashlib.sha1(f'{user.pk}:{stamp}'.encode()).hexdigest()
+
+
+def _escape(text):
+	return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _fold(line):
+	"""Split a content line into 75-octet pieces joined by CRLF + space (RFC 5545, 3.1)."""
+	data = line.encode()
+	if len(data) <= 75:
+		return line
+	parts = []
+	while data:
+		size = 75 if not parts else 74
+		# Never cut a UTF-8 sequence in half.
+		while size < len(data) and (data[size] & 0xC0) == 0x80:
+			size -= 1
+		parts.append(data[:size].decode())
+		data = data[size:]
+	return '\r\n '.join(parts)
+
+
+def _local(name, date, time):
+	"""A DTSTART/DTEND in the school's time zone, described by the feed's VTIMEZONE."""
+	return f"{name};TZID={settings.TIME_ZONE}:{datetime.datetime.combine(date, time).strftime('%Y%m%dT%H%M%S')}"
+
+
+def _utc(value):
+	return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _offset(delta):
+	minutes = int(delta.total_seconds()) // 60
+	return f"{'-' if minutes < 0 else '+'}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}"
+
+
+def vtimezone(first, last):
+	"""
+	VTIMEZONE for ``settings.TIME_ZONE`` covering ``first``..``last``: the offset in force at the
+	start plus every transition in between, found by scanning the zone day by day and narrowing
+	each change down to the minute.
+	"""
+	zone = timezone.get_default_timezone()
+	utc = datetime.timezone.utc
+	moment = datetime.datetime.combine(first, datetime.time(), tzinfo=zone).astimezone(utc)
+	end = datetime.datetime.combine(last + datetime.timedelta(days=1), datetime.time(), tzinfo=zone).astimezone(utc)
+
+	def observance(when, before, after):
+		local = when.astimezone(zone)
+		kind = 'DAYLIGHT' if local.dst() else 'STANDARD'
+		return [
+			f'BEGIN:{kind}',
+			f"DTSTART:{(when + before).replace(tzinfo=None).strftime('%Y%m%dT%H%M%S')}",
+			f'TZOFFSETFROM:{_offset(before)}',
+			f'TZOFFSETTO:{_offset(after)}',
+			f'TZNAME:{local.tzname()}',
+			f'END:{kind}',
+		]
+
+	offset = moment.astimezone(zone).utcoffset()
+	lines = ['BEGIN:VTIMEZONE', f'TZID:{settings.TIME_ZONE}', *observance(moment, offset, offset)]
+	while moment < end:
+		following_moment = min(moment + datetime.timedelta(days=1), end)
+		following = following_moment.astimezone(zone).utcoffset()
+		if following != offset:
+			low, high = moment, following_moment
+			while high - low > datetime.timedelta(minutes=1):
+				middle = low + (high - low) / 2
+				if middle.astimezone(zone).utcoffset() == offset:
+					low = middle
+				else:
+					high = middle
+			lines.extend(observance(high.replace(second=0, microsecond=0), offset, following))
+			offset = following
+		moment = following_moment
+	lines.append('END:VTIMEZONE')
+	return lines
+
+
+def _date(date):
+	return date.strftime('%Y%m%d')
+
+
+def _year_end(academic_year):
+	start = academic_year.start_date
+	try:
+		return start.replace(year=start.year + 1) - datetime.timedelta(days=1)
+	except ValueError:  # 29 February
+		return start.replace(year=start.year + 1, day=28)
+
+
+def routine_event(routine, stamp):
+	"""One weekly-recurring event for the whole academic year instead of an event per week."""
+	start = routine.academic_year.start_date
+	first = start + datetime.timedelta(days=(WEEKDAYS[routine.day] - start.weekday()) % 7)
+	# With a TZID start, UNTIL has to be given in UTC (RFC 5545, 3.3.10).
+	until = datetime.datetime.combine(
+		_year_end(routine.academic_year), datetime.time(23, 59, 59), tzinfo=timezone.get_default_timezone()
+	)
+	return [
+		'BEGIN:VEVENT',
+		f'UID:routine-{routine.id}@{UID_DOMAIN}',
+		f'DTSTAMP:{stamp}',
+		_local('DTSTART', first, routine.start_time),
+		_local('DTEND', first, routine.end_time),
+		f'RRULE:FREQ=WEEKLY;UNTIL={_utc(until)}',
+		f'SUMMARY:{_escape(routine.subject.name)}',
+		f'LOCATION:{_escape(f"{routine.school_class.name} {routine.section.name}")}',
+		f'DESCRIPTION:{_escape(routine.teacher.staff.get_fullname())}',
+		'END:VEVENT',
+	]
+
+
+def exam_event(exam, stamp):
+	if exam.start_time and exam.end_time:
+		when = [_local('DTSTART', exam.exam_date, exam.start_time), _local('DTEND', exam.exam_date, exam.end_time)]
+	else:
+		when = [
+			f'DTSTART;VALUE=DATE:{_date(exam.exam_date)}',
+			f'DTEND;VALUE=DATE:{_date(exam.exam_date + datetime.timedelta(days=1))}',
+		]
+	return [
+		'BEGIN:VEVENT',
+		f'UID:exam-{exam.id}@{UID_DOMAIN}',
+		f'DTSTAMP:{stamp}',
+		*when,
+		f'SUMMARY:{_escape(f"{exam.get_exam_type_display()}: {exam.subject.name}")}',
+		f'LOCATION:{_escape(exam.school_class.name if exam.school_class else "")}',
+		'END:VEVENT',
+	]
+
+
+def assignment_event(assignment, stamp):
+	return [
+		'BEGIN:VEVENT',
+		f'UID:assignment-{assignment.id}@{UID_DOMAIN}',
+		f'DTSTAMP:{stamp}',
+		f'DTSTART;VALUE=DATE:{_date(assignment.due_date)}',
+		f'DTEND;VALUE=DATE:{_date(assignment.due_date + datetime.timedelta(days=1))}',
+		f'SUMMARY:{_escape(f"Due: {assignment.title} ({assignment.subject.name})")}',
+		f'DESCRIPTION:{_escape(assignment.description)}',
+		'TRANSP:TRANSPARENT',
+		'END:VEVENT',
+	]
+
+
+def feed_querysets(user):
+	"""
+	The routines, exams and assignments a user's feed shows, following the same role scoping as the
+	Routine, Exam and Assignment viewsets. Parents see what their children see.
+	"""
+	routines = Q(pk__in=[])
+	exams = Q(pk__in=[])
+	assignments = Q(pk__in=[])
+	academic_year = AcademicYear.objects.filter(is_active=True).first()
+
+	enrollments = []
+	if user.has_role('student'):
+		student = Student.objects.select_related('current_enrollment').filter(email=user.email).first()
+		enrollments.append(student.current_enrollment if student else None)
+	if user.has_role('parent'):
+		parent = Parent.objects.filter(email=user.email).first()
+		if parent:
+			enrollments.extend(
+				child.current_enrollment for child in Student.objects.select_related('current_enrollment').filter(
+					Q(father=parent) | Q(mother=parent) | Q(guardian=parent)
+				).distinct()
+			)
+	for enrollment in filter(None, enrollments):
+		routines |= Q(academic_year_id=enrollment.academic_year_id, section_id=enrollment.section_id)
+		exams |= Q(academic_year_id=enrollment.academic_year_id, school_class_id=enrollment.school_class_id)
+		assignments |= Q(school_class_id=enrollment.school_class_id, section=enrollment.section_id)
+
+	if user.has_role('teacher'):
+		teacher = Teacher.objects.filter(staff__email=user.email).first()
+		if teacher:
+			routines |= Q(academic_year=academic_year, teacher=teacher)
+			exams |= Q(academic_year=academic_year, school_class__in=teacher.school_class.all())
+			assignments |= Q(teacher=teacher)
+
+	return (
+		Routine.objects.filter(routines).select_related(
+			'academic_year', 'school_class', 'section', 'subject', 'teacher__staff'
+		).order_by('academic_year__start_date', 'day', 'start_time').distinct(),
+		Exam.objects.filter(exams).select_related('school_class', 'subject').order_by('exam_date').distinct(),
+		Assignment.objects.filter(assignments, is_active=True).select_related('subject').order_by('due_date').distinct(),
+	)
+
+
+def build_feed(user, stamp):
+	dtstamp = _utc(datetime.datetime.fromtimestamp(stamp, datetime.timezone.utc))
+	routines, exams, assignments = feed_querysets(user)
+	routines, exams = list(routines), list(exams)
+	lines = [
+		'BEGIN:VCALENDAR',
+		'VERSION:2.0',
+		f'PRODID:{PRODID}',
+		'CALSCALE:GREGORIAN',
+		'METHOD:PUBLISH',
+		f'X-WR-CALNAME:{_escape("School timetable")}',
+	]
+	dates = [day for routine in routines for day in (routine.academic_year.start_date, _year_end(routine.academic_year))]
+	dates += [exam.exam_date for exam in exams if exam.start_time and exam.end_time]
+	if dates:
+		lines.extend(vtimezone(min(dates), max(dates)))
+	for routine in routines:
+		lines.extend(routine_event(routine, dtstamp))
+	for exam in exams:
+		lines.extend(exam_event(exam, dtstamp))
+	for assignment in assignments:
+		lines.extend(assignment_event(assignment, dtstamp))
+	lines.append('END:VCALENDAR')
+	return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+def get_feed(user, stamp):
+	"""The user's ICS feed as of ``stamp``, built at most once per change."""
+	key = f'academic:calendar:{user.pk}:{stamp}'
+	feed = cache.get(key)
+	if feed is None:
+		feed = build_feed(user, stamp)
+		cache.set(key, feed, CALENDAR_CACHE_TIMEOUT)
+	return feed
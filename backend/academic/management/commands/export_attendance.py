@@ -0,0 +1,40 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.exports import attendance_export_rows, stream_csv, stream_parquet, parquet_available
+
+
+class Command(BaseCommand):
+	help = 'Stream attendance records to a CSV or Parquet file without loading them into memory.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('output', help='File to write.')
+		parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+		parser.add_argument('--year', help='Academic year id.')
+		parser.add_argument('--school-class', help='School class id.')
+		parser.add_argument('--section', help='Section id.')
+		parser.add_argument('--start', type=datetime.date.fromisoformat, help='First date (YYYY-MM-DD).')
+		parser.add_argument('--end', type=datetime.date.fromisoformat, help='Last date (YYYY-MM-DD).')
+
+	def handle(self, *args, **options):
+		if options['format'] == 'parquet' and not parquet_available():
+			raise CommandError('Parquet export requires pyarrow to be installed.')
+
+		rows = attendance_export_rows(
+			academic_year=options['year'],
+			school_class=options['school_class'],
+			section=options['section'],
+			start=options['start'],
+			end=options['end'],
+		)
+		if options['format'] == 'parquet':
+			chunks, mode = stream_parquet(rows), 'wb'
+		else:
+			chunks, mode = stream_csv(rows), 'w'
+
+		written = 0
+		with open(options['output'], mode, newline='' if mode == 'w' else None) as output:
+			for chunk in chunks:
+				written += output.write(chunk)
+		self.stdout.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}."))
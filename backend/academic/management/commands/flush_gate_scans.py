@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from academic.gate import GATE_FLUSH_BATCH_SIZE, drain_gate_scans
+
+
+class Command(BaseCommand):
+	help = 'Apply buffered gate scans to attendance records.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--batch-size', type=int, default=GATE_FLUSH_BATCH_SIZE)
+		parser.add_argument('--interval', type=float,
+		                    help='Keep running and flush every INTERVAL seconds instead of exiting once drained.')
+
+	def handle(self, *args, **options):
+		while True:
+			totals = drain_gate_scans(options['batch_size'])
+			if totals['events'] or not options['interval']:
+				self.stdout.write(self.style.SUCCESS(
+					f"Flushed {totals['events']} scans: {totals['updated']} records marked present, "
+					f"{totals['unmatched']} unknown cards."
+				))
+			if not options['interval']:
+				return
+			time.sleep(options['interval'])
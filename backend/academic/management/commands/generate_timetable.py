@@ -0,0 +1,72 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.models import AcademicYear, TimetableJob
+from academic.timetable import DEFAULT_TIME_LIMIT, generate_timetable, recover_timetable_jobs, run_timetable_job
+
+
+class Command(BaseCommand):
+	help = (
+		'Generate a conflict-free weekly routine for every section of the active academic year, or run a '
+		'queued timetable job with --job, or recover the jobs a restart left behind with --recover. Quotas, periods and teacher availability are read from --options, '
+		'a JSON file with the same keys the timetable-jobs API accepts.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--job', help='Id of a pending timetable job to run in this process.')
+		parser.add_argument(
+			'--recover', action='store_true',
+			help='Fail timetable jobs whose worker died and run every pending job in this process.'
+		)
+		parser.add_argument('--options', help='Path to a JSON file of generator options.')
+		parser.add_argument('--time-limit', type=int, default=DEFAULT_TIME_LIMIT, help='Seconds to search for.')
+		parser.add_argument('--seed', type=int, help='Random seed, for reproducible timetables.')
+		parser.add_argument('--dry-run', action='store_true', help='Solve and report without saving routines.')
+
+	def handle(self, *args, **options):
+		if options['job']:
+			try:
+				TimetableJob.objects.get(id=options['job'], status='pending')
+			except (TimetableJob.DoesNotExist, ValidationError):
+				raise CommandError(f"No pending timetable job {options['job']}.")
+			run_timetable_job(options['job'])
+			job = TimetableJob.objects.get(id=options['job'])
+			style = self.style.SUCCESS if job.status == 'succeeded' else self.style.ERROR
+			self.stdout.write(style(f'{job.status}: {job.message}'))
+			return
+
+		if options['recover']:
+			failed, pending = recover_timetable_jobs(run=run_timetable_job)
+			self.stdout.write(self.style.SUCCESS(f'Failed {failed} stale jobs, ran {len(pending)} pending jobs.'))
+			return
+
+		academic_year = AcademicYear.objects.filter(is_active=True).first()
+		if academic_year is None:
+			raise CommandError('No active academic year found. Please set one.')
+		generator_options = {}
+		if options['options']:
+			try:
+				with open(options['options']) as f:
+					generator_options = json.load(f)
+			except (OSError, ValueError) as e:
+				raise CommandError(f'Could not read {options["options"]}: {e}')
+		generator_options.update(time_limit=options['time_limit'], dry_run=options['dry_run'])
+		if options['seed'] is not None:
+			generator_options['seed'] = options['seed']
+
+		def progress(done, total):
+			self.stderr.write(f'\rPlaced {done}/{total} periods', ending='')
+
+		try:
+			result = generate_timetable(academic_year, generator_options, progress=progress)
+		except ValidationError as e:
+			raise CommandError(e.messages[0])
+		self.stderr.write('')
+
+		self.stdout.write(json.dumps(result, indent=2))
+		verb = 'Would schedule' if result['dry_run'] else 'Scheduled'
+		self.stdout.write(self.style.SUCCESS(
+			f"{verb} {result['routines']} periods for {result['sections']} sections in {result['seconds']}s."
+		))
@@ -0,0 +1,45 @@
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.admissions import import_admissions, read_admission_file
+
+
+class Command(BaseCommand):
+	help = 'Admit students in bulk from a CSV or XLSX sheet.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('path', help='Path to a .csv or .xlsx admission sheet.')
+		parser.add_argument('--dry-run', action='store_true', help='Validate the sheet without saving anything.')
+		parser.add_argument('--credentials', help='CSV file to write the generated student logins to.')
+
+	def progress(self, stage, done, total):
+		self.stdout.write(f'{stage}: {done}/{total}')
+
+	def handle(self, *args, **options):
+		try:
+			with open(options['path'], 'rb') as file:
+				rows = read_admission_file(file, options['path'])
+			report = import_admissions(rows, dry_run=options['dry_run'], progress=self.progress)
+		except OSError as e:
+			raise CommandError(str(e))
+		except ValidationError as e:
+			raise CommandError(e.messages[0])
+
+		for error in report['errors']:
+			self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+		if report['errors']:
+			raise CommandError(f"{len(report['errors'])} of {report['total_rows']} rows are invalid; nothing was saved.")
+		if options['dry_run']:
+			self.stdout.write(self.style.SUCCESS(f"All {report['valid_rows']} rows are valid."))
+		else:
+			created = ', '.join(f'{count} {name}' for name, count in report['created'].items())
+			self.stdout.write(self.style.SUCCESS(f'Created {created}.'))
+			if options['credentials']:
+				with open(options['credentials'], 'w', newline='') as file:
+					writer = csv.DictWriter(file, ['email', 'password'])
+					writer.writeheader()
+					writer.writerows(report['credentials'])
+				self.stdout.write(f"Wrote {len(report['credentials'])} logins to {options['credentials']}.")
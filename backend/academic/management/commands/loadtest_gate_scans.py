@@ -0,0 +1,100 @@
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from academic.gate import drain_gate_scans
+from user.models import Student
+
+
+class Command(BaseCommand):
+	help = (
+		'Replay a gate burst against a running server: POST batches of scans to gate-scans/ from several '
+		'concurrent "gates", then drain the buffer and report throughput against the burst window.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--url', default='http://127.0.0.1:8000/api/academic/gate-scans/')
+		parser.add_argument('--token', required=True, help='Access token of an admin or staff account.')
+		parser.add_argument('--scans', type=int, default=20000, help='Total scans in the burst.')
+		parser.add_argument('--window', type=int, default=600,
+		                    help='Seconds the real burst is spread over (the ten minutes before the bell).')
+		parser.add_argument('--batch-size', type=int, default=200)
+		parser.add_argument('--gates', type=int, default=8, help='Concurrent scanners posting batches.')
+		parser.add_argument('--duplicates', type=float, default=0.1,
+		                    help='Share of scans that repeat a card already scanned (double taps).')
+		parser.add_argument('--no-flush', action='store_true', help='Only ingest; leave the buffer for the job.')
+
+	def handle(self, *args, **options):
+		cards = list(Student.objects.exclude(card_id=None).values_list('card_id', flat=True))
+		if not cards:
+			self.stdout.write(self.style.WARNING('No students have a card_id; using synthetic cards.'))
+			cards = [f'LOADTEST{i:06d}' for i in range(options['scans'])]
+
+		now = timezone.now().isoformat()
+		scans = []
+		for _ in range(options['scans']):
+			if scans and random.random() < options['duplicates']:
+				scans.append(random.choice(scans))
+			else:
+				scans.append({'card_id': random.choice(cards), 'scanned_at': now})
+		batch_size = options['batch_size']
+		batches = [scans[i:i + batch_size] for i in range(0, len(scans), batch_size)]
+
+		def post(index_and_batch):
+			index, batch = index_and_batch
+			body = json.dumps({'device': f'loadtest-{index % options["gates"]}', 'events': batch}).encode()
+			request = urllib.request.Request(options['url'], data=body, method='POST', headers={
+				'Content-Type': 'application/json',
+				'Authorization': f'Bearer {options["token"]}',
+			})
+			started = time.perf_counter()
+			try:
+				with urllib.request.urlopen(request, timeout=60) as response:
+					ok = response.status == 202
+			except (urllib.error.URLError, OSError):
+				ok = False
+			return ok, time.perf_counter() - started
+
+		started = time.perf_counter()
+		with ThreadPoolExecutor(max_workers=options['gates']) as pool:
+			results = list(pool.map(post, enumerate(batches)))
+		ingest_seconds = time.perf_counter() - started
+
+		failures = sum(1 for ok, _ in results if not ok)
+		if failures == len(results):
+			raise CommandError(f'Every request to {options["url"]} failed; is the server running and the token valid?')
+
+		latencies = sorted(latency for _, latency in results)
+		p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+		rate = len(scans) / ingest_seconds
+		required = len(scans) / options['window']
+		self.stdout.write(
+			f'Ingested {len(scans)} scans in {len(batches)} batches over {ingest_seconds:.2f}s '
+			f'({rate:.0f} scans/s, {failures} failed batches).\n'
+			f'Batch latency: p50 {statistics.median(latencies) * 1000:.0f}ms, '
+			f'p95 {p95 * 1000:.0f}ms, max {latencies[-1] * 1000:.0f}ms.'
+		)
+
+		if not options['no_flush']:
+			started = time.perf_counter()
+			totals = drain_gate_scans()
+			self.stdout.write(
+				f"Flushed {totals['events']} scans in {time.perf_counter() - started:.2f}s: "
+				f"{totals['updated']} records marked present, {totals['unmatched']} unknown cards."
+			)
+
+		if rate >= required and not failures:
+			self.stdout.write(self.style.SUCCESS(
+				f'Sustained {rate:.0f} scans/s; the burst needs {required:.1f} scans/s.'
+			))
+		else:
+			self.stdout.write(self.style.ERROR(
+				f'Sustained {rate:.0f} scans/s with {failures} failed batches; the burst needs {required:.1f} scans/s.'
+			))
@@ -0,0 +1,28 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from crons.cron import precreate_attendance_sessions
+
+
+class Command(BaseCommand):
+	help = "Create the day's attendance sessions and default records for every section with a class teacher."
+
+	def add_arguments(self, parser):
+		parser.add_argument('--date', help='Session date as YYYY-MM-DD. Defaults to today.')
+		parser.add_argument('--include-holidays', action='store_true',
+		                    help='Create sessions even when the date falls on a weekly holiday.')
+
+	def handle(self, *args, **options):
+		date = None
+		if options['date']:
+			try:
+				date = datetime.date.fromisoformat(options['date'])
+			except ValueError:
+				raise CommandError('--date must be in YYYY-MM-DD format.')
+			if date > timezone.localdate():
+				raise CommandError('Cannot create attendance sessions in the future.')
+
+		sessions = precreate_attendance_sessions(date=date, include_holidays=options['include_holidays'])
+		self.stdout.write(self.style.SUCCESS(f'Created {len(sessions)} attendance sessions.'))
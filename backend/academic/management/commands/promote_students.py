@@ -0,0 +1,90 @@
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from academic.models import AcademicYear, Routine, SchoolClass
+from academic.promotion import promote_students
+
+
+class Command(BaseCommand):
+	help = (
+		'Promote every student of an academic year into the next one, e.g. '
+		'--map "Class 5=Class 6" --map "Class 6=Class 7" --graduate "Class 10".'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--from-year', help='Start date (YYYY-MM-DD) of the year to promote from. '
+		                                        'Defaults to the active year.')
+		parser.add_argument('--to-year', required=True,
+		                    help='Start date (YYYY-MM-DD) of the target year; it is created when missing.')
+		parser.add_argument('--map', action='append', default=[], metavar='FROM=TO',
+		                    help='Class name mapping; repeat for every class.')
+		parser.add_argument('--graduate', action='append', default=[], metavar='CLASS',
+		                    help='Class whose students graduate instead of moving up.')
+		parser.add_argument('--preview', action='store_true', help='Report the result without saving it.')
+		parser.add_argument('--no-routines', action='store_true', help='Do not copy routines to the new year.')
+		parser.add_argument('--activate', action='store_true', help='Make the target year the active one.')
+
+	def parse_date(self, value, option):
+		try:
+			return datetime.date.fromisoformat(value)
+		except ValueError:
+			raise CommandError(f'{option} must be in YYYY-MM-DD format.')
+
+	def handle(self, *args, **options):
+		if options['from_year']:
+			from_year = AcademicYear.objects.filter(start_date=self.parse_date(options['from_year'], '--from-year')).first()
+		else:
+			from_year = AcademicYear.objects.filter(is_active=True).first()
+		if from_year is None:
+			raise CommandError('The academic year to promote from does not exist.')
+
+		classes = {name.strip().lower(): class_id for class_id, name in SchoolClass.objects.values_list('id', 'name')}
+
+		def class_id(name):
+			if name.strip().lower() not in classes:
+				raise CommandError(f'Unknown class "{name}".')
+			return classes[name.strip().lower()]
+
+		class_map = {}
+		for mapping in options['map']:
+			source, separator, target = mapping.partition('=')
+			if not separator:
+				raise CommandError(f'--map must look like "Class 5=Class 6", got "{mapping}".')
+			class_map[class_id(source)] = class_id(target)
+		for name in options['graduate']:
+			class_map[class_id(name)] = None
+		if not class_map:
+			raise CommandError('Give at least one --map or --graduate.')
+
+		start_date = self.parse_date(options['to_year'], '--to-year')
+		try:
+			with transaction.atomic():
+				to_year = AcademicYear.objects.filter(start_date=start_date).first()
+				if to_year is None:
+					# Created inactive so the running year stays current until --activate.
+					to_year = AcademicYear.objects.create(start_date=start_date, is_active=False)
+				report = promote_students(
+					from_year, to_year, class_map,
+					preview=options['preview'],
+					copy_routines=not options['no_routines'],
+					activate=options['activate'],
+				)
+				if options['preview']:
+					transaction.set_rollback(True)
+		except ValidationError as e:
+			raise CommandError(e.messages[0])
+		except IntegrityError as e:
+			message = Routine.overlap_message(e)
+			if message is None:
+				raise
+			raise CommandError(f'Routines could not be copied: {message} Nothing was saved.')
+
+		self.stdout.write(json.dumps(report, indent=2))
+		verb = 'Would promote' if options['preview'] else 'Promoted'
+		self.stdout.write(self.style.SUCCESS(
+			f"{verb} {report['promoted']} students into {report['to_year']}; {report['graduated']} graduated."
+		))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.models import AcademicYear, AttendanceSummary
+
+
+class Command(BaseCommand):
+	help = 'Recompute per-student attendance summaries from attendance records.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--year', help='Academic year id to rebuild. Rebuilds every year when omitted.')
+
+	def handle(self, *args, **options):
+		academic_year = None
+		if options['year']:
+			academic_year = AcademicYear.objects.filter(id=options['year']).first()
+			if academic_year is None:
+				raise CommandError(f"Academic year {options['year']} does not exist.")
+
+		total = AttendanceSummary.rebuild(academic_year=academic_year)
+		self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} attendance summaries.'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:09
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0028_remove_onlinepaymenttransaction_fees_delete_fees_and_more'),
+        ('user', '0009_remove_leave_available_days_leave_total_days'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('last_marked', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='academic.academicyear')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='user.student')),
+            ],
+            options={
+                'verbose_name_plural': 'Attendance summaries',
+                'unique_together': {('student', 'academic_year')},
+            },
+        ),
+    ]
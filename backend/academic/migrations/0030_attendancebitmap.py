@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:11
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0029_attendancesummary'),
+        ('user', '0009_remove_leave_available_days_leave_total_days'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceBitmap',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('marked', models.BinaryField(default=bytes)),
+                ('present', models.BinaryField(default=bytes)),
+                ('remarks', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='academic.academicyear')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='user.student')),
+            ],
+            options={
+                'unique_together': {('student', 'academic_year')},
+            },
+        ),
+    ]
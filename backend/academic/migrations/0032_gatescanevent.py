@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:19
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0031_attendancerecord_sync_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GateScanEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('card_id', models.CharField(max_length=64)),
+                ('scanned_at', models.DateTimeField()),
+                ('device', models.CharField(blank=True, max_length=64)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['received_at'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['received_at'], name='gatescan_pending_idx')],
+            },
+        ),
+    ]
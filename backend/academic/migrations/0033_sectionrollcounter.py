@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:23
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0032_gatescanevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectionRollCounter',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('last_roll', models.PositiveIntegerField(default=0)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roll_counters', to='academic.academicyear')),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roll_counters', to='academic.schoolclass')),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roll_counters', to='academic.section')),
+            ],
+            options={
+                'unique_together': {('academic_year', 'school_class', 'section')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0033_sectionrollcounter'),
+        ('user', '0013_student_current_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['created_at', 'id'], name='announcement_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['created_at', 'id'], name='assignment_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['created_at', 'id'], name='exam_created_id_idx'),
+        ),
+    ]
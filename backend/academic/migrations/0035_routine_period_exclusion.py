@@ -0,0 +1,82 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:05
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+def check_routines(apps, schema_editor):
+    """
+    Refuse to migrate, naming the rows, while routines exist that the new constraints would
+    reject: an end time not after the start time, or two routines of one section or one teacher
+    overlapping on the same day. Adding the constraints would otherwise fail with a bare
+    database error.
+    """
+    Routine = apps.get_model('academic', 'Routine')
+    rows = Routine.objects.order_by('start_time').values_list(
+        'id', 'academic_year_id', 'day', 'section_id', 'teacher_id', 'start_time', 'end_time'
+    )
+    problems = []
+    groups = {}
+    for routine_id, academic_year_id, day, section_id, teacher_id, start_time, end_time in rows:
+        if end_time <= start_time:
+            problems.append(f'routine {routine_id} ends at {end_time}, not after its start at {start_time}')
+            continue
+        for kind, owner in (('section', section_id), ('teacher', teacher_id)):
+            key = (kind, academic_year_id, day, owner)
+            latest = groups.get(key)
+            if latest and start_time < latest[1]:
+                problems.append(f'routines {latest[0]} and {routine_id} overlap for the same {kind} on {day}')
+            if not latest or end_time > latest[1]:
+                groups[key] = (routine_id, end_time)
+    if problems:
+        raise RuntimeError(
+            'Fix or delete these routines before migrating; the no-overlap constraints cannot be added '
+            'while they exist:\n  ' + '\n  '.join(problems)
+        )
+
+
+def populate_period(apps, schema_editor):
+    from django.db.backends.postgresql.psycopg_any import NumericRange
+
+    Routine = apps.get_model('academic', 'Routine')
+    routines = list(Routine.objects.only('id', 'start_time', 'end_time'))
+    for routine in routines:
+        routine.period = NumericRange(
+            routine.start_time.hour * 60 + routine.start_time.minute,
+            routine.end_time.hour * 60 + routine.end_time.minute,
+        )
+    Routine.objects.bulk_update(routines, ['period'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0034_created_id_indexes'),
+    ]
+
+    operations = [
+        # btree_gist provides the GiST "=" operator classes for the uuid and varchar columns.
+        BtreeGistExtension(),
+        migrations.RunPython(check_routines, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='routine',
+            name='period',
+            field=django.contrib.postgres.fields.ranges.IntegerRangeField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_period, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='routine',
+            name='period',
+            field=django.contrib.postgres.fields.ranges.IntegerRangeField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='routine',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('academic_year', '='), ('day', '='), ('section', '='), ('period', '&&')], name='routine_section_no_overlap'),
+        ),
+        migrations.AddConstraint(
+            model_name='routine',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('academic_year', '='), ('day', '='), ('teacher', '='), ('period', '&&')], name='routine_teacher_no_overlap'),
+        ),
+    ]
@@ -1,8 +1,15 @@
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned, ValidationError
-from django.db import models
+from collections import defaultdict
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import IntegerRangeField, RangeOperators
+from django.db.backends.postgresql.psycopg_any import NumericRange
+
+from django.db import connection, models, transaction
 import uuid
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, F, Count, Max, Value, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from user.models import Student, Teacher, CustomUser
 
 
@@ -115,16 +122,7 @@ class Enrollment(models.Model):
 				raise ValueError("Multiple active academic years found. Please ensure only one is active.")
 
 		if not self.roll_number:
-			latest_enrollment = Enrollment.objects.filter(
-				academic_year=self.academic_year,
-				school_class=self.school_class,
-				section=self.section
-			).order_by("-roll_number").first()
-
-			if latest_enrollment and latest_enrollment.roll_number:
-				self.roll_number = latest_enrollment.roll_number + 1
-			else:
-				self.roll_number = 1
+			self.roll_number = SectionRollCounter.reserve(self.academic_year_id, self.school_class_id, self.section_id)
 
 		super().save(*args, **kwargs)
 
@@ -132,6 +130,114 @@ class Enrollment(models.Model):
 		return f"{self.student.get_fullname()} - {self.school_class.name} - {self.academic_year}"
 
 
+class SectionRollCounter(models.Model):
+	"""Last roll number handed out in one section of one academic year."""
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name='roll_counters')
+	school_class = models.ForeignKey(SchoolClass, on_delete=models.CASCADE, related_name='roll_counters')
+	section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name='roll_counters')
+	last_roll = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		unique_together = ['academic_year', 'school_class', 'section']
+
+	@staticmethod
+	def _lookup(keys):
+		lookup = Q(pk__in=[])
+		for academic_year_id, school_class_id, section_id in keys:
+			lookup |= Q(academic_year_id=academic_year_id, school_class_id=school_class_id, section_id=section_id)
+		return lookup
+
+	@classmethod
+	def reserve(cls, academic_year_id, school_class_id, section_id, count=1):
+		key = (academic_year_id, school_class_id, section_id)
+		return cls.reserve_blocks({key: count})[key]
+
+	@classmethod
+	def reserve_blocks(cls, counts):
+		"""
+		Reserve ``count`` consecutive roll numbers for every (academic_year, school_class, section)
+		key of ``counts`` and return the first number of each block, keyed the same way.
+
+		Counters are row-locked in a fixed order, so concurrent admissions into a section queue
+		behind each other instead of colliding on the enrollment unique constraint.
+		"""
+		keys = {tuple(uuid.UUID(str(value)) for value in key): key for key in counts}
+		with transaction.atomic():
+			existing = set(cls.objects.filter(cls._lookup(keys)).values_list(
+				'academic_year_id', 'school_class_id', 'section_id'
+			))
+			missing = [key for key in keys if key not in existing]
+			if missing:
+				# Start new counters after roll numbers given out before counters existed.
+				seeds = {
+					(academic_year_id, school_class_id, section_id): last or 0
+					for academic_year_id, school_class_id, section_id, last in Enrollment.objects.filter(
+						cls._lookup(missing)
+					).values('academic_year_id', 'school_class_id', 'section_id').annotate(
+						last=Max('roll_number')
+					).values_list('academic_year_id', 'school_class_id', 'section_id', 'last')
+				}
+				cls.objects.bulk_create([
+					cls(
+						academic_year_id=academic_year_id,
+						school_class_id=school_class_id,
+						section_id=section_id,
+						last_roll=seeds.get((academic_year_id, school_class_id, section_id), 0)
+					) for academic_year_id, school_class_id, section_id in missing
+				], ignore_conflicts=True)
+
+			counters = cls.objects.select_for_update().filter(cls._lookup(keys)).order_by('id')
+			first = {}
+			for counter in counters:
+				key = keys[(counter.academic_year_id, counter.school_class_id, counter.section_id)]
+				first[key] = counter.last_roll + 1
+				counter.last_roll += counts[key]
+			cls.objects.bulk_update(counters, ['last_roll'])
+		return first
+
+	@classmethod
+	def renumber_alphabetically(cls, academic_year_id, school_class_id, section_id):
+		"""Reassign the section's roll numbers as 1..n in student name order. Returns n."""
+		params = [
+			Enrollment._meta.get_field(name).get_db_prep_value(value, connection)
+			for name, value in (
+				('academic_year', academic_year_id), ('school_class', school_class_id), ('section', section_id)
+			)
+		]
+		enrollments = Enrollment._meta.db_table
+		with transaction.atomic():
+			# Holds the section's counter lock so no admission takes a number meanwhile.
+			cls.reserve(academic_year_id, school_class_id, section_id, count=0)
+			# The unique constraint is checked row by row, so numbers are cleared before being reassigned.
+			Enrollment.objects.filter(
+				academic_year_id=academic_year_id, school_class_id=school_class_id, section_id=section_id
+			).update(roll_number=None)
+			with connection.cursor() as cursor:
+				cursor.execute(
+					f"""
+					UPDATE {enrollments} SET roll_number = ranked.position
+					FROM (
+						SELECT enrollment.id, ROW_NUMBER() OVER (
+							ORDER BY UPPER(student.first_name), UPPER(student.last_name), enrollment.id
+						) AS position
+						FROM {enrollments} AS enrollment
+						JOIN {Student._meta.db_table} AS student ON student.id = enrollment.student_id
+						WHERE enrollment.academic_year_id = %s
+						AND enrollment.school_class_id = %s
+						AND enrollment.section_id = %s
+					) AS ranked
+					WHERE {enrollments}.id = ranked.id
+					""",
+					params
+				)
+				total = cursor.rowcount
+			cls.objects.filter(
+				academic_year_id=academic_year_id, school_class_id=school_class_id, section_id=section_id
+			).update(last_roll=total)
+		return total
+
+
 class Department(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	name = models.CharField(max_length=100, unique=True)
@@ -143,6 +249,11 @@ class Department(models.Model):
 		return self.name
 
 
+# Names of the exclusion constraints on Routine; IntegrityErrors are told apart by them.
+ROUTINE_SECTION_OVERLAP_CONSTRAINT = 'routine_section_no_overlap'
+ROUTINE_TEACHER_OVERLAP_CONSTRAINT = 'routine_teacher_no_overlap'
+
+
 class Routine(models.Model):
 	DAY_CHOICES = [
 		('Sunday', 'Sunday'),
@@ -178,52 +289,66 @@ class Routine(models.Model):
 		Teacher, on_delete=models.CASCADE,
 		related_name='routines'
 	)
+	# [start, end) in minutes since midnight, kept in step with start_time/end_time for the exclusion constraints.
+	period = IntegerRangeField(editable=False)
 
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	SECTION_OVERLAP_CONSTRAINT = ROUTINE_SECTION_OVERLAP_CONSTRAINT
+	TEACHER_OVERLAP_CONSTRAINT = ROUTINE_TEACHER_OVERLAP_CONSTRAINT
+
 	class Meta:
 		unique_together = [
 			"academic_year", "day", "start_time",
 			"school_class", "section", "subject", "teacher"
 		]
+		# Double-bookings are rejected by the database itself, so concurrent edits cannot both pass a check.
+		constraints = [
+			ExclusionConstraint(
+				name=ROUTINE_SECTION_OVERLAP_CONSTRAINT,
+				expressions=[
+					('academic_year', RangeOperators.EQUAL),
+					('day', RangeOperators.EQUAL),
+					('section', RangeOperators.EQUAL),
+					('period', RangeOperators.OVERLAPS),
+				],
+			),
+			ExclusionConstraint(
+				name=ROUTINE_TEACHER_OVERLAP_CONSTRAINT,
+				expressions=[
+					('academic_year', RangeOperators.EQUAL),
+					('day', RangeOperators.EQUAL),
+					('teacher', RangeOperators.EQUAL),
+					('period', RangeOperators.OVERLAPS),
+				],
+			),
+		]
+
+	@staticmethod
+	def period_for(start_time, end_time):
+		return NumericRange(start_time.hour * 60 + start_time.minute, end_time.hour * 60 + end_time.minute)
+
+	@classmethod
+	def overlap_message(cls, error):
+		"""Human-readable message for an IntegrityError raised by one of the overlap constraints, else None."""
+		if cls.SECTION_OVERLAP_CONSTRAINT in str(error):
+			return 'This time slot overlaps with an existing routine for this class section.'
+		if cls.TEACHER_OVERLAP_CONSTRAINT in str(error):
+			return 'The teacher is already scheduled for another class during this time.'
+		return None
 
 	def clean(self):
 		if self.end_time <= self.start_time:
 			raise ValidationError("End time must be after start time.")
 
-		qs = Routine.objects.filter(
-			academic_year=self.academic_year,
-			day=self.day
-		)
-		if self.pk:
-			qs = qs.exclude(pk=self.pk)
-
-		overlap_q = Q(start_time__lt=self.end_time) & Q(end_time__gt=self.start_time)
-
-		if qs.filter(
-				overlap_q,
-				school_class=self.school_class,
-				section=self.section
-		).exists():
-			raise ValidationError(
-				"This time slot overlaps with an existing routine for "
-				f"class {self.school_class} section {self.section}."
-			)
-
-		if qs.filter(
-				overlap_q,
-				teacher=self.teacher
-		).exists():
-			raise ValidationError(
-				f"Teacher {self.teacher} is already scheduled for another class "
-				"during this time."
-			)
-
 	def save(self, *args, **kwargs):
 		if not self.academic_year:
 			self.academic_year = AcademicYear.objects.get(is_active=True)
-		self.full_clean()
+		# Overlaps are left to the exclusion constraints; checking them here would only add racy queries.
+		self.full_clean(exclude=['period'], validate_constraints=False)
+		# After full_clean, so times given as strings have been converted.
+		self.period = self.period_for(self.start_time, self.end_time)
 		super().save(*args, **kwargs)
 
 	def __str__(self):
@@ -257,25 +382,59 @@ class AttendanceSession(models.Model):
 		if not self.academic_year:
 			self.academic_year = AcademicYear.objects.get(is_active=True)
 		self.full_clean()
-		super().save(*args, **kwargs)
-		if is_new:
-			students = Student.objects.filter(
-				enrollments__academic_year=self.academic_year,
-				enrollments__school_class=self.school_class,
-				enrollments__section=self.section
-			).distinct()
-			AttendanceRecord.objects.bulk_create([
-				AttendanceRecord(
-					session=self,
-					student=stu,
-					status=False
-				) for stu in students
-			])
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+			if is_new:
+				self.create_default_records()
+
+	def create_default_records(self):
+		return AttendanceSession.create_default_records_for([self])
+
+	@staticmethod
+	def create_default_records_for(sessions):
+		"""Mark every student enrolled in the sessions' sections absent, using one query and one insert."""
+		by_section = {(session.academic_year_id, session.school_class_id, session.section_id): session
+		              for session in sessions}
+		enrollments = Enrollment.objects.filter(
+			academic_year_id__in={session.academic_year_id for session in sessions},
+			section_id__in={session.section_id for session in sessions},
+		).values_list('academic_year_id', 'school_class_id', 'section_id', 'student_id').distinct()
+
+		records = []
+		for academic_year_id, school_class_id, section_id, student_id in enrollments:
+			session = by_section.get((academic_year_id, school_class_id, section_id))
+			if session is not None:
+				records.append(AttendanceRecord(session=session, student_id=student_id, status=False))
+		AttendanceRecord.objects.bulk_create(records, batch_size=2000)
+
+		by_year = defaultdict(lambda: defaultdict(list))
+		for record in records:
+			by_year[record.session.academic_year_id][record.session.date].append(record.student_id)
+		for academic_year_id, dates in by_year.items():
+			for date, student_ids in dates.items():
+				AttendanceSummary.apply_deltas(
+					academic_year_id,
+					{student_id: (0, 1) for student_id in student_ids},
+					marked_on=date
+				)
+		AttendanceBitmap.sync_records(records)
+		return records
 
 	def __str__(self):
 		return f"{self.school_class}-{self.section} on {self.date}"
 
 
+class AttendanceRecordQuerySet(models.QuerySet):
+	def with_present_days(self):
+		summary = AttendanceSummary.objects.filter(
+			student=OuterRef('student'),
+			academic_year=OuterRef('session__academic_year')
+		)
+		return self.select_related('student').annotate(
+			present_days=Coalesce(Subquery(summary.values('present')[:1]), 0)
+		)
+
+
 class AttendanceRecord(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	session = models.ForeignKey(AttendanceSession, on_delete=models.CASCADE, related_name='records')
@@ -283,14 +442,324 @@ class AttendanceRecord(models.Model):
 	status = models.BooleanField(default=False)
 	remarks = models.TextField(blank=True, null=True)
 
+	# Bumped on every change; offline clients use it to detect that their copy is stale.
+	version = models.PositiveIntegerField(default=1)
+	# When the change was made, by the client's clock for synced edits. Used for last-writer-wins.
+	modified_at = models.DateTimeField(null=True, blank=True)
+	updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+	objects = AttendanceRecordQuerySet.as_manager()
+
 	class Meta:
 		unique_together = ['session', 'student']
 		ordering = ['student__last_name', 'student__first_name']
 
+	def save(self, *args, **kwargs):
+		if not self._state.adding:
+			self.version += 1
+		self.modified_at = timezone.now()
+		super().save(*args, **kwargs)
+
 	def __str__(self):
 		return f"{self.student} – {'Present' if self.status else 'Absent'}"
 
 
+class AttendanceSummary(models.Model):
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_summaries')
+	academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name='attendance_summaries')
+	present = models.PositiveIntegerField(default=0)
+	absent = models.PositiveIntegerField(default=0)
+	last_marked = models.DateField(null=True, blank=True)
+
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		unique_together = ['student', 'academic_year']
+		verbose_name_plural = "Attendance summaries"
+
+	@classmethod
+	def rebuild(cls, academic_year=None, student_ids=None):
+		records = AttendanceRecord.objects.order_by().filter(session__academic_year__isnull=False)
+		summaries = cls.objects.all()
+		if academic_year is not None:
+			records = records.filter(session__academic_year=academic_year)
+			summaries = summaries.filter(academic_year=academic_year)
+		if student_ids is not None:
+			records = records.filter(student_id__in=student_ids)
+			summaries = summaries.filter(student_id__in=student_ids)
+
+		rows = records.values('student_id', 'session__academic_year_id').annotate(
+			present=Count('id', filter=Q(status=True)),
+			absent=Count('id', filter=Q(status=False)),
+			last_marked=Max('session__date'),
+		)
+		with transaction.atomic():
+			summaries.delete()
+			created = cls.objects.bulk_create([
+				cls(
+					student_id=row['student_id'],
+					academic_year_id=row['session__academic_year_id'],
+					present=row['present'],
+					absent=row['absent'],
+					last_marked=row['last_marked'],
+				) for row in rows
+			])
+		return len(created)
+
+	@classmethod
+	def apply_deltas(cls, academic_year_id, deltas, marked_on=None):
+		"""
+		Shift the counters of many students by ``deltas`` ({student_id: (present, absent)}).
+
+		Students sharing the same delta are updated with a single statement. Students
+		without a summary row yet are rebuilt from their records instead, so this must
+		run after the records themselves have been written.
+		"""
+		if not academic_year_id or not deltas:
+			return
+
+		existing = set(cls.objects.filter(
+			academic_year_id=academic_year_id,
+			student_id__in=deltas.keys()
+		).values_list('student_id', flat=True))
+		missing = [student_id for student_id in deltas if student_id not in existing]
+		if missing:
+			cls.rebuild(academic_year=academic_year_id, student_ids=missing)
+
+		groups = defaultdict(list)
+		for student_id in existing:
+			groups[deltas[student_id]].append(student_id)
+
+		for (present, absent), student_ids in groups.items():
+			if not present and not absent and not marked_on:
+				continue
+			updates = {
+				'present': F('present') + present,
+				'absent': F('absent') + absent,
+				'updated_at': timezone.now(),
+			}
+			if marked_on:
+				updates['last_marked'] = Greatest(Coalesce('last_marked', Value(marked_on)), Value(marked_on))
+			cls.objects.filter(academic_year_id=academic_year_id, student_id__in=student_ids).update(**updates)
+
+	@classmethod
+	def apply_status_changes(cls, records, previous_status):
+		"""Update summaries after ``records`` were bulk-updated from ``previous_status`` ({pk: status})."""
+		deltas = defaultdict(dict)
+		for record in records:
+			before = previous_status.get(record.pk, record.status)
+			if before == record.status:
+				continue
+			present, absent = deltas[record.session.academic_year_id].get(record.student_id, (0, 0))
+			if record.status:
+				present, absent = present + 1, absent - 1
+			else:
+				present, absent = present - 1, absent + 1
+			deltas[record.session.academic_year_id][record.student_id] = (present, absent)
+		for academic_year_id, student_deltas in deltas.items():
+			cls.apply_deltas(academic_year_id, student_deltas)
+
+	def __str__(self):
+		return f"{self.student} - {self.academic_year}: {self.present} present, {self.absent} absent"
+
+
+class AttendanceBitmap(models.Model):
+	"""
+	Compact attendance history of one student for one academic year.
+
+	Bit ``n`` of ``marked`` is set when attendance was taken ``n`` days after the academic
+	year started and the same bit of ``present`` holds the status. Remarks are kept sparsely,
+	keyed by the same day offset.
+	"""
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+	academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name='attendance_bitmaps')
+	marked = models.BinaryField(default=bytes)
+	present = models.BinaryField(default=bytes)
+	remarks = models.JSONField(default=dict, blank=True)
+
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		unique_together = ['student', 'academic_year']
+
+	@staticmethod
+	def _to_int(data):
+		return int.from_bytes(bytes(data or b''), 'little')
+
+	@staticmethod
+	def _to_bytes(value):
+		return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+	def set_day(self, offset, status, remarks=None):
+		bit = 1 << offset
+		marked = self._to_int(self.marked) | bit
+		present = self._to_int(self.present)
+		present = present | bit if status else present & ~bit
+		self.marked = self._to_bytes(marked)
+		self.present = self._to_bytes(present)
+		if remarks:
+			self.remarks[str(offset)] = remarks
+		else:
+			self.remarks.pop(str(offset), None)
+
+	def days(self, start_offset=0, end_offset=None):
+		marked = self._to_int(self.marked) >> start_offset
+		present = self._to_int(self.present) >> start_offset
+		offset = start_offset
+		while marked and (end_offset is None or offset <= end_offset):
+			if marked & 1:
+				yield offset, bool(present & 1), self.remarks.get(str(offset))
+			marked >>= 1
+			present >>= 1
+			offset += 1
+
+	def totals(self):
+		marked = self._to_int(self.marked)
+		present = self._to_int(self.present)
+		return present.bit_count(), marked.bit_count() - present.bit_count()
+
+	def current_streak(self):
+		marked = self._to_int(self.marked)
+		present = self._to_int(self.present)
+		streak = 0
+		for offset in range(marked.bit_length() - 1, -1, -1):
+			if not marked >> offset & 1:
+				continue
+			if not present >> offset & 1:
+				break
+			streak += 1
+		return streak
+
+	@classmethod
+	def rebuild(cls, academic_year=None, student_ids=None):
+		records = AttendanceRecord.objects.order_by().filter(session__academic_year__isnull=False)
+		bitmaps = cls.objects.all()
+		if academic_year is not None:
+			records = records.filter(session__academic_year=academic_year)
+			bitmaps = bitmaps.filter(academic_year=academic_year)
+		if student_ids is not None:
+			records = records.filter(student_id__in=student_ids)
+			bitmaps = bitmaps.filter(student_id__in=student_ids)
+
+		built = {}
+		rows = records.values_list(
+			'student_id', 'session__academic_year_id', 'session__academic_year__start_date', 'session__date',
+			'status', 'remarks'
+		)
+		for student_id, academic_year_id, start_date, date, status, remarks in rows.iterator(chunk_size=5000):
+			offset = (date - start_date).days
+			if offset < 0:
+				continue
+			key = (student_id, academic_year_id)
+			if key not in built:
+				built[key] = cls(student_id=student_id, academic_year_id=academic_year_id, remarks={})
+			built[key].set_day(offset, status, remarks)
+
+		with transaction.atomic():
+			bitmaps.delete()
+			cls.objects.bulk_create(built.values(), batch_size=1000)
+		return len(built)
+
+	@classmethod
+	def sync_records(cls, records):
+		"""
+		Copy the status and remarks of ``records`` (with their sessions loaded) into the bitmaps.
+
+		Bitmaps that do not exist yet are rebuilt from the database, so this must run after
+		the records themselves have been written. The bitmaps are locked, in student order, until
+		the surrounding transaction ends, so concurrent writers (gate flushes, teacher edits,
+		offline syncs) apply their days one after the other instead of overwriting each other.
+		"""
+		by_year = defaultdict(list)
+		for record in records:
+			if record.session.academic_year_id:
+				by_year[record.session.academic_year_id].append(record)
+
+		with transaction.atomic():
+			for academic_year_id, year_records in sorted(by_year.items(), key=lambda item: str(item[0])):
+				cls._sync_year(academic_year_id, year_records)
+
+	@classmethod
+	def _sync_year(cls, academic_year_id, year_records):
+		student_ids = {record.student_id for record in year_records}
+		bitmaps = {
+			bitmap.student_id: bitmap
+			for bitmap in cls.objects.select_for_update(of=('self',)).select_related('academic_year').filter(
+				academic_year_id=academic_year_id,
+				student_id__in=student_ids
+			).order_by('student_id')
+		}
+		missing = student_ids - bitmaps.keys()
+		if missing:
+			cls.rebuild(academic_year=academic_year_id, student_ids=missing)
+
+		changed = []
+		for record in year_records:
+			bitmap = bitmaps.get(record.student_id)
+			if bitmap is None:
+				continue
+			offset = (record.session.date - bitmap.academic_year.start_date).days
+			if offset >= 0:
+				bitmap.set_day(offset, record.status, record.remarks)
+				bitmap.updated_at = timezone.now()
+				changed.append(bitmap)
+		if changed:
+			cls.objects.bulk_update(set(changed), ['marked', 'present', 'remarks', 'updated_at'])
+
+	def __str__(self):
+		return f"{self.student} - {self.academic_year}"
+
+
+class GateScanEvent(models.Model):
+	"""Raw card scan from a gate reader, buffered until the next flush marks the student present."""
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	card_id = models.CharField(max_length=64)
+	scanned_at = models.DateTimeField()
+	device = models.CharField(max_length=64, blank=True)
+	received_at = models.DateTimeField(auto_now_add=True)
+	processed_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ['received_at']
+		indexes = [
+			models.Index(fields=['received_at'], condition=Q(processed_at__isnull=True), name='gatescan_pending_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.card_id} at {self.scanned_at} ({self.device})"
+
+
+class TimetableJob(models.Model):
+	"""A timetable generation run; the worker reports progress here so the requesting admin can poll it."""
+	STATUS_CHOICES = [
+		('pending', 'Pending'),
+		('running', 'Running'),
+		('succeeded', 'Succeeded'),
+		('failed', 'Failed'),
+	]
+
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name='timetable_jobs')
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+	progress = models.PositiveSmallIntegerField(default=0)
+	message = models.TextField(blank=True)
+	options = models.JSONField(default=dict)
+	result = models.JSONField(null=True, blank=True)
+	created_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+
+	created_at = models.DateTimeField(auto_now_add=True)
+	started_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ['-created_at']
+
+	def __str__(self):
+		return f"Timetable {self.academic_year} ({self.status}, {self.progress}%)"
+
+
 class Assignment(models.Model):
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	school_class = models.ForeignKey(SchoolClass, on_delete=models.CASCADE, related_name='assignments')
@@ -306,6 +775,9 @@ class Assignment(models.Model):
 	due_date = models.DateField()
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [models.Index(fields=['created_at', 'id'], name='assignment_created_id_idx')]
+
 	def __str__(self):
 		return F"{self.title}"
 
@@ -359,6 +831,9 @@ class Announcement(models.Model):
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [models.Index(fields=['created_at', 'id'], name='announcement_created_id_idx')]
+
 	def __str__(self):
 		return f"{self.title} - {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
 
@@ -389,6 +864,9 @@ class Exam(models.Model):
 
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [models.Index(fields=['created_at', 'id'], name='exam_created_id_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.academic_year:
 			self.academic_year = AcademicYear.objects.get(is_active=True)
@@ -0,0 +1,209 @@
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from academic.dashboard import invalidate_dashboard_snapshot
+from academic.ical import touch_calendars
+from academic.models import AcademicYear, Enrollment, Routine, SchoolClass, Section, SectionRollCounter
+from user.models import Student
+
+# Server-side UUIDs for the INSERT ... SELECT statements; UUIDs are stored as 32-char hex on SQLite.
+NEW_UUID_SQL = {
+	'postgresql': 'gen_random_uuid()',
+	'sqlite': 'lower(hex(randomblob(16)))',
+}
+
+
+def _param(model, field, value):
+	return model._meta.get_field(field).get_db_prep_value(value, connection)
+
+
+def promote_students(from_year, to_year, class_map, preview=False, copy_routines=True, activate=False):
+	"""
+	Enroll every active student of ``from_year`` into ``to_year`` according to ``class_map``
+	(``{from_class_id: to_class_id}``; ``None`` graduates the class).
+
+	Students keep their section name and house; missing target sections are created. Roll
+	numbers are assigned alphabetically per section after any already in ``to_year``. All
+	enrollments are written with one INSERT ... SELECT, routines are copied forward with another,
+	and graduates are marked 'G'. Students already enrolled in ``to_year`` are left alone.
+
+	With ``activate`` the target year becomes the active one. Everything runs in one transaction;
+	with ``preview`` it is rolled back and only the report of what would change is returned.
+	"""
+	if from_year.pk == to_year.pk:
+		raise ValidationError('The target academic year must differ from the current one.')
+	class_ids = {class_id for pair in class_map.items() for class_id in pair if class_id}
+	if SchoolClass.objects.filter(id__in=class_ids).count() != len(class_ids):
+		raise ValidationError('The class mapping refers to unknown classes.')
+
+	promoted = {source: target for source, target in class_map.items() if target}
+	graduating = [source for source, target in class_map.items() if not target]
+	now = timezone.now()
+	new_uuid = NEW_UUID_SQL[connection.vendor]
+	enrollments = Enrollment._meta.db_table
+
+	with transaction.atomic():
+		# Source section -> same-named section of the target class, created when missing.
+		targets = {
+			(section.school_class_id, section.name): section.id
+			for section in Section.objects.filter(school_class_id__in=promoted.values())
+		}
+		section_map = {}
+		new_sections = []
+		for section in Section.objects.filter(school_class_id__in=promoted):
+			key = (promoted[section.school_class_id], section.name)
+			if key not in targets:
+				new_section = Section(school_class_id=key[0], name=section.name)
+				new_sections.append(new_section)
+				targets[key] = new_section.id
+			section_map[section.id] = targets[key]
+		Section.objects.bulk_create(new_sections)
+
+		promoted_count = 0
+		if section_map:
+			cases = ' '.join('WHEN %s THEN %s' for _ in section_map)
+			case_params = [
+				_param(Section, 'id', value) for pair in section_map.items() for value in pair
+			]
+			year_param = _param(AcademicYear, 'id', to_year.pk)
+			with connection.cursor() as cursor:
+				cursor.execute(
+					f"""
+					INSERT INTO {enrollments} (
+						id, student_id, academic_year_id, school_class_id, section_id, house_id,
+						enrollment_date, roll_number, created_at, updated_at
+					)
+					SELECT
+						{new_uuid}, enrollment.student_id, %s, target.school_class_id, target.id,
+						enrollment.house_id, %s,
+						ROW_NUMBER() OVER (
+							PARTITION BY target.id
+							ORDER BY UPPER(student.first_name), UPPER(student.last_name), student.id
+						) + COALESCE((
+							SELECT MAX(existing.roll_number) FROM {enrollments} AS existing
+							WHERE existing.academic_year_id = %s AND existing.section_id = target.id
+						), 0),
+						%s, %s
+					FROM {enrollments} AS enrollment
+					JOIN {Student._meta.db_table} AS student ON student.id = enrollment.student_id
+					JOIN {Section._meta.db_table} AS target ON target.id = CASE enrollment.section_id {cases} END
+					WHERE enrollment.academic_year_id = %s
+					AND student.account_status = 'A'
+					AND NOT EXISTS (
+						SELECT 1 FROM {enrollments} AS already
+						WHERE already.student_id = enrollment.student_id AND already.academic_year_id = %s
+					)
+					""",
+					[
+						year_param,
+						_param(Enrollment, 'enrollment_date', to_year.start_date),
+						year_param,
+						_param(Enrollment, 'created_at', now),
+						_param(Enrollment, 'updated_at', now),
+						*case_params,
+						_param(AcademicYear, 'id', from_year.pk),
+						year_param,
+					]
+				)
+				promoted_count = cursor.rowcount
+			# Pointers stay on the running year until the target year is active; activating it below
+			# re-points everyone through the AcademicYear post_save signal.
+			if to_year.is_active:
+				Student.objects.filter(enrollments__academic_year=to_year).refresh_current_enrollment()
+
+			# Counters continue after the highest roll number now in each section.
+			last_rolls = Enrollment.objects.filter(
+				academic_year=to_year, section_id__in=set(section_map.values())
+			).values('school_class_id', 'section_id').annotate(last=Max('roll_number'))
+			SectionRollCounter.objects.filter(academic_year=to_year, section_id__in=set(section_map.values())).delete()
+			SectionRollCounter.objects.bulk_create([
+				SectionRollCounter(
+					academic_year=to_year,
+					school_class_id=row['school_class_id'],
+					section_id=row['section_id'],
+					last_roll=row['last']
+				) for row in last_rolls
+			])
+
+		graduated = Student.objects.filter(
+			account_status='A',
+			enrollments__academic_year=from_year,
+			enrollments__school_class_id__in=graduating
+		).update(account_status='G') if graduating else 0
+
+		routines_copied = routines_skipped = 0
+		if copy_routines:
+			routines = Routine._meta.db_table
+			candidates = Routine.objects.filter(academic_year=from_year).exclude(
+				section_id__in=Routine.objects.filter(academic_year=to_year).values('section_id')
+			).count()
+			with connection.cursor() as cursor:
+				cursor.execute(
+					f"""
+					INSERT INTO {routines} (
+						id, academic_year_id, day, start_time, end_time, period, school_class_id, section_id,
+						subject_id, teacher_id, created_at, updated_at
+					)
+					SELECT
+						{new_uuid}, %s, routine.day, routine.start_time, routine.end_time, routine.period,
+						routine.school_class_id, routine.section_id, routine.subject_id, routine.teacher_id, %s, %s
+					FROM {routines} AS routine
+					WHERE routine.academic_year_id = %s
+					AND NOT EXISTS (
+						SELECT 1 FROM {routines} AS already
+						WHERE already.academic_year_id = %s
+						AND already.school_class_id = routine.school_class_id
+						AND already.section_id = routine.section_id
+					)
+					-- Periods whose teacher is already busy then in the target year would break the
+					-- teacher exclusion constraint; they are left out and reported as skipped.
+					AND NOT EXISTS (
+						SELECT 1 FROM {routines} AS busy
+						WHERE busy.academic_year_id = %s
+						AND busy.day = routine.day
+						AND busy.teacher_id = routine.teacher_id
+						AND busy.start_time < routine.end_time
+						AND routine.start_time < busy.end_time
+					)
+					""",
+					[
+						_param(Routine, 'academic_year', to_year.pk),
+						_param(Routine, 'created_at', now),
+						_param(Routine, 'updated_at', now),
+						_param(Routine, 'academic_year', from_year.pk),
+						_param(Routine, 'academic_year', to_year.pk),
+						_param(Routine, 'academic_year', to_year.pk),
+					]
+				)
+				routines_copied = cursor.rowcount
+			routines_skipped = candidates - routines_copied
+
+		report = {
+			'preview': preview,
+			'from_year': str(from_year),
+			'to_year': str(to_year),
+			'promoted': promoted_count,
+			'graduated': graduated,
+			'sections_created': len(new_sections),
+			'routines_copied': routines_copied,
+			'routines_skipped': routines_skipped,
+			'sections': [
+				{'school_class': row['school_class__name'], 'section': row['section__name'], 'students': row['students']}
+				for row in Enrollment.objects.filter(academic_year=to_year, created_at=now).values(
+					'school_class__name', 'section__name'
+				).annotate(students=Count('id')).order_by('school_class__name', 'section__name')
+			],
+		}
+
+		if activate and not preview:
+			to_year.is_active = True
+			to_year.save()
+
+		if preview:
+			transaction.set_rollback(True)
+		else:
+			invalidate_dashboard_snapshot()
+			touch_calendars()
+	return report
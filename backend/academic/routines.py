@@ -0,0 +1,271 @@
+import datetime
+import heapq
+import time
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.backends.postgresql.psycopg_any import NumericRange
+from django.db.models import Q
+
+from academic.ical import touch_calendars
+from academic.models import AcademicYear, Routine, SchoolClass, Section, Subject
+from user.models import Teacher
+
+ROUTINE_COLUMNS = ['day', 'start_time', 'end_time', 'school_class', 'section', 'subject', 'teacher']
+ID_COLUMNS = ['school_class', 'section', 'subject', 'teacher']
+BULK_BATCH_SIZE = 500
+
+ROUTINE_FORM_VERSION_KEY = 'academic:routine-form:version'
+ROUTINE_FORM_CACHE_TIMEOUT = 60 * 60
+
+
+def _minutes(value):
+	if isinstance(value, datetime.time):
+		return value.hour * 60 + value.minute
+	time = datetime.time.fromisoformat(str(value).strip())
+	return time.hour * 60 + time.minute
+
+
+def _id(value):
+	try:
+		return str(uuid.UUID(str(value)))
+	except ValueError:
+		return None
+
+
+def _clock(minutes):
+	return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def find_overlaps(intervals):
+	"""
+	Return every overlapping pair among ``intervals``, an iterable of ``(key, start, end, ref)``.
+	Only intervals sharing a key can overlap; touching ends (10:00-11:00, 11:00-12:00) do not.
+
+	Sweeps each key's intervals in start order while a heap holds the ones still running, so the
+	cost is O(n log n) plus one step per reported pair.
+	"""
+	by_key = defaultdict(list)
+	for key, start, end, ref in intervals:
+		by_key[key].append((start, end, ref))
+
+	overlaps = []
+	for key, items in by_key.items():
+		items.sort(key=lambda item: (item[0], item[1]))
+		running = []
+		for index, (start, end, ref) in enumerate(items):
+			while running and running[0][0] <= start:
+				heapq.heappop(running)
+			for _, _, other in running:
+				overlaps.append((key, other, ref))
+			heapq.heappush(running, (end, index, ref))
+	return overlaps
+
+
+def import_routines(rows, academic_year=None, dry_run=False, replace=False):
+	"""
+	Validate a whole timetable and, unless ``dry_run``, insert it with one ``bulk_create``.
+
+	``rows`` are dicts with the ``ROUTINE_COLUMNS`` (ids for the related objects, ``HH:MM``
+	times). Existing routines of the year that share a day with the batch are read once, and
+	every section or teacher double-booking, inside the batch or against the existing
+	timetable, is reported in one pass. With ``replace`` the existing periods of the
+	imported sections are deleted first, so a section's timetable can be re-imported as a whole.
+	Nothing is written if any row is invalid or conflicts.
+	"""
+	academic_year = academic_year or AcademicYear.objects.filter(is_active=True).first()
+	if academic_year is None:
+		raise ValidationError('No active academic year found. Please set one.')
+	report = {'dry_run': dry_run, 'total_rows': len(rows), 'errors': [], 'conflicts': [], 'created': 0, 'replaced': 0}
+
+	ids = {column: {_id(row.get(column)) for row in rows} - {None} for column in ID_COLUMNS}
+	sections = {
+		str(section_id): str(school_class_id)
+		for section_id, school_class_id in Section.objects.filter(id__in=ids['section']).values_list(
+			'id', 'school_class_id'
+		)
+	}
+	subjects = {
+		str(subject_id): str(school_class_id)
+		for subject_id, school_class_id in Subject.objects.filter(id__in=ids['subject']).values_list(
+			'id', 'school_class_id'
+		)
+	}
+	teachers = {
+		str(teacher_id): f'{first_name} {last_name}'
+		for teacher_id, first_name, last_name in Teacher.objects.filter(id__in=ids['teacher']).values_list(
+			'id', 'staff__first_name', 'staff__last_name'
+		)
+	}
+	days = {day for day, _ in Routine.DAY_CHOICES}
+
+	routines = []
+	for index, row in enumerate(rows):
+		errors = {}
+		missing = [column for column in ROUTINE_COLUMNS if not row.get(column)]
+		for column in missing:
+			errors[column] = ['This field is required.']
+		values = {column: str(row[column]).strip() for column in ROUTINE_COLUMNS if column not in missing}
+		for column in ID_COLUMNS:
+			if column in values:
+				values[column] = _id(values[column])
+				if values[column] is None:
+					errors[column] = ['Enter a valid id.']
+
+		if 'day' in values and values['day'] not in days:
+			errors['day'] = [f"\"{values['day']}\" is not a valid day."]
+		try:
+			start = _minutes(values['start_time']) if 'start_time' in values else None
+			end = _minutes(values['end_time']) if 'end_time' in values else None
+			if start is not None and end is not None and end <= start:
+				errors['end_time'] = ['End time must be after start time.']
+		except ValueError:
+			errors['time'] = ['Enter times in HH:MM format.']
+		if 'section' in values and sections.get(values['section']) != values.get('school_class'):
+			errors['section'] = ['Unknown section for this class.']
+		if 'subject' in values and subjects.get(values['subject']) != values.get('school_class'):
+			errors['subject'] = ['Unknown subject for this class.']
+		if 'teacher' in values and values['teacher'] not in teachers:
+			errors['teacher'] = ['Unknown teacher.']
+
+		if errors:
+			report['errors'].append({'row': index + 1, 'errors': errors})
+		else:
+			routines.append((index + 1, values, start, end))
+	if report['errors']:
+		return report
+
+	section_ids = {values['section'] for _, values, _, _ in routines}
+	existing = Routine.objects.filter(
+		academic_year=academic_year,
+		day__in={values['day'] for _, values, _, _ in routines}
+	).filter(
+		Q(section_id__in=section_ids) | Q(teacher_id__in={values['teacher'] for _, values, _, _ in routines})
+	)
+	if replace:
+		existing = existing.exclude(section_id__in=section_ids)
+
+	intervals = []
+	for row_number, values, start, end in routines:
+		intervals.append((('section', values['day'], values['section']), start, end, row_number))
+		intervals.append((('teacher', values['day'], values['teacher']), start, end, row_number))
+	for routine_id, day, start_time, end_time, section_id, teacher_id in existing.values_list(
+		'id', 'day', 'start_time', 'end_time', 'section_id', 'teacher_id'
+	):
+		ref = ('existing', str(routine_id), _minutes(start_time), _minutes(end_time))
+		intervals.append((('section', day, str(section_id)), _minutes(start_time), _minutes(end_time), ref))
+		intervals.append((('teacher', day, str(teacher_id)), _minutes(start_time), _minutes(end_time), ref))
+
+	timing = {row_number: (start, end) for row_number, _, start, end in routines}
+	for (kind, day, owner), first, second in find_overlaps(intervals):
+		if isinstance(first, tuple) and isinstance(second, tuple):
+			continue  # Both already in the timetable; not this import's problem.
+		rows_involved = [ref for ref in (first, second) if not isinstance(ref, tuple)]
+		existing_ref = next((ref for ref in (first, second) if isinstance(ref, tuple)), None)
+		start, end = timing[rows_involved[-1]]
+		who = f'Teacher {teachers[owner]}' if kind == 'teacher' else 'The section'
+		conflict = {
+			'type': kind,
+			'day': day,
+			'rows': rows_involved,
+			'detail': f'{who} is double-booked on {day} around {_clock(start)}-{_clock(end)}.',
+		}
+		if existing_ref:
+			conflict['existing_routine'] = existing_ref[1]
+			conflict['detail'] += f' It overlaps the existing {_clock(existing_ref[2])}-{_clock(existing_ref[3])} period.'
+		report['conflicts'].append(conflict)
+	if report['conflicts'] or dry_run:
+		return report
+
+	try:
+		with transaction.atomic():
+			if replace:
+				report['replaced'], _ = Routine.objects.filter(
+					academic_year=academic_year, section_id__in=section_ids
+				).delete()
+			Routine.objects.bulk_create([
+				Routine(
+					academic_year=academic_year,
+					day=values['day'],
+					start_time=datetime.time(start // 60, start % 60),
+					end_time=datetime.time(end // 60, end % 60),
+					period=NumericRange(start, end),
+					school_class_id=values['school_class'],
+					section_id=values['section'],
+					subject_id=values['subject'],
+					teacher_id=values['teacher'],
+				) for _, values, start, end in routines
+			], batch_size=BULK_BATCH_SIZE)
+			touch_calendars()
+	except IntegrityError as e:
+		# Another admin booked an overlapping period between the check and the insert.
+		message = Routine.overlap_message(e)
+		if message is None:
+			raise
+		report['replaced'] = 0
+		report['conflicts'].append({'type': 'concurrent', 'rows': [], 'detail': message})
+		return report
+	report['created'] = len(routines)
+	return report
+
+
+def teachers_by_subject():
+	"""
+	Map ``(class id, lower-cased subject name)`` to the teachers who can take that subject in that
+	class, read with one query. A teacher's subject belongs to one class, so the name is what
+	matches it to the same subject in the other classes the teacher is assigned to.
+	"""
+	index = defaultdict(list)
+	rows = Teacher.objects.filter(subject__isnull=False, school_class__isnull=False).order_by(
+		'staff__first_name', 'staff__last_name'
+	).values_list('id', 'staff__first_name', 'staff__last_name', 'subject__name', 'school_class')
+	for teacher_id, first_name, last_name, subject_name, school_class_id in rows:
+		index[(school_class_id, subject_name.strip().lower())].append(
+			{'id': str(teacher_id), 'first_name': first_name, 'last_name': last_name}
+		)
+	return index
+
+
+def build_routine_form():
+	from academic.serializer import RoutineSchoolClassGetSerializer
+
+	classes = SchoolClass.objects.order_by('name').prefetch_related('section', 'subjects')
+	return RoutineSchoolClassGetSerializer(
+		classes, many=True, context={'teachers_by_subject': teachers_by_subject()}
+	).data
+
+
+def _routine_form_version():
+	version = cache.get(ROUTINE_FORM_VERSION_KEY)
+	if version is None:
+		# Start from the clock rather than 1 so a payload left over from before an eviction is never reused.
+		cache.add(ROUTINE_FORM_VERSION_KEY, time.time_ns(), None)
+		version = cache.get(ROUTINE_FORM_VERSION_KEY)
+	return version
+
+
+def get_routine_form():
+	"""
+	The routine form's classes with their sections, subjects and eligible teachers. Cached under
+	the current version number; ``invalidate_routine_form`` moves to a new one.
+	"""
+	key = f'academic:routine-form:{_routine_form_version()}'
+	payload = cache.get(key)
+	if payload is None:
+		payload = build_routine_form()
+		cache.set(key, payload, ROUTINE_FORM_CACHE_TIMEOUT)
+	return payload
+
+
+def invalidate_routine_form():
+	def bump():
+		try:
+			cache.incr(ROUTINE_FORM_VERSION_KEY)
+		except ValueError:
+			cache.add(ROUTINE_FORM_VERSION_KEY, time.time_ns(), None)
+
+	# Deferred until commit so a concurrent reader cannot cache the pre-commit state under the new version.
+	transaction.on_commit(bump)
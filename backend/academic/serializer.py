@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from academic.models import Enrollment, AcademicYear, SchoolClass, Section, House, Subject, Department, Routine, \
 	AttendanceSession, AttendanceRecord, Assignment, Exam, Announcement, Submission, AssignmentAttachment
+from user.images import image_url
 from user.models import Staff, Teacher, ManagementStaff, Student
 
 
@@ -180,7 +181,7 @@ class SchoolClassRetrieveSerializer(serializers.ModelSerializer):
 			def get_profile_picture(self, obj):
 				context = self.context
 				if obj.staff.profile_picture:
-					return f"{context['request'].build_absolute_uri(obj.staff.profile_picture.url)}"
+					return f"{context['request'].build_absolute_uri(image_url(obj.staff.profile_picture, 64))}"
 				return None
 
 		house = InlineHouseSerializer(many=True)
@@ -329,6 +330,10 @@ class RoutineSubjectGetSerializer(serializers.ModelSerializer):
 		]
 
 	def get_teacher(self, obj):
+		# Pass 'teachers_by_subject' (see academic.routines.teachers_by_subject) to skip the per-subject query.
+		index = self.context.get('teachers_by_subject')
+		if index is not None:
+			return index.get((obj.school_class_id, obj.name.strip().lower()), [])
 		subject_name = obj.name.strip().lower()
 		teachers = Teacher.objects.filter(subject__name__iexact=subject_name, school_class=obj.school_class)
 		if teachers.exists():
@@ -437,7 +442,10 @@ class AttendanceRecordGetSerializer(serializers.ModelSerializer):
 		]
 
 	def get_present_days(self, obj):
-		return obj.student.get_total_present()
+		if hasattr(obj, 'present_days'):
+			return obj.present_days
+		summary = obj.student.attendance_summaries.filter(academic_year_id=obj.session.academic_year_id).first()
+		return summary.present if summary else 0
 
 
 class AttendanceSessionDetailViewUpdateSerializer(serializers.ModelSerializer):
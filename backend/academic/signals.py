@@ -0,0 +1,112 @@
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from user.models import Student, Parent, Staff, Teacher, ManagementStaff
+from .dashboard import invalidate_dashboard_snapshot
+from .ical import touch_calendars
+from .routines import invalidate_routine_form
+from .models import AttendanceRecord, AttendanceSession, AttendanceSummary, AttendanceBitmap, SchoolClass, \
+	Enrollment, Section, Subject, AcademicYear, Routine, Exam, Assignment
+
+
+def _cascaded(origin):
+	"""Whether a record delete came from deleting something else, such as its session."""
+	if origin is None:
+		return False
+	model = origin.model if isinstance(origin, QuerySet) else type(origin)
+	return model is not AttendanceRecord
+
+
+@receiver(post_save, sender=AttendanceRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+def refresh_attendance_summary(sender, instance, origin=None, **kwargs):
+	# Records deleted along with their session are rebuilt once by rebuild_session_attendance.
+	if _cascaded(origin):
+		return
+	academic_year_id = AttendanceSession.objects.filter(
+		id=instance.session_id
+	).values_list('academic_year_id', flat=True).first()
+	if academic_year_id:
+		AttendanceSummary.rebuild(academic_year=academic_year_id, student_ids=[instance.student_id])
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def sync_attendance_bitmap(sender, instance, **kwargs):
+	AttendanceBitmap.sync_records([instance])
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def rebuild_attendance_bitmap(sender, instance, origin=None, **kwargs):
+	if _cascaded(origin):
+		return
+	academic_year_id = AttendanceSession.objects.filter(
+		id=instance.session_id
+	).values_list('academic_year_id', flat=True).first()
+	if academic_year_id:
+		AttendanceBitmap.rebuild(academic_year=academic_year_id, student_ids=[instance.student_id])
+
+
+@receiver(pre_delete, sender=AttendanceSession)
+def collect_session_students(sender, instance, **kwargs):
+	# The records are gone by post_delete, so note whose attendance has to be recomputed now.
+	instance._attendance_student_ids = list(instance.records.values_list('student_id', flat=True))
+
+
+@receiver(post_delete, sender=AttendanceSession)
+def rebuild_session_attendance(sender, instance, **kwargs):
+	student_ids = getattr(instance, '_attendance_student_ids', None)
+	if instance.academic_year_id and student_ids:
+		AttendanceSummary.rebuild(academic_year=instance.academic_year_id, student_ids=student_ids)
+		AttendanceBitmap.rebuild(academic_year=instance.academic_year_id, student_ids=student_ids)
+
+
+@receiver(post_save, sender=AcademicYear)
+def follow_active_academic_year(sender, instance, **kwargs):
+	# Activating a year moves every student enrolled in it onto that enrollment.
+	if instance.is_active:
+		Student.objects.refresh_current_enrollment()
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def refresh_current_enrollment(sender, instance, **kwargs):
+	students = Student.objects.filter(id=instance.student_id)
+	students.refresh_current_enrollment()
+	# Keep an instance the caller still holds in step, so a later save() does not write the old pointer back.
+	if Enrollment.student.is_cached(instance):
+		instance.student.current_enrollment_id = students.values_list('current_enrollment_id', flat=True).first()
+
+
+def invalidate_admin_dashboard(sender, **kwargs):
+	invalidate_dashboard_snapshot()
+
+
+for model in (Student, Parent, Staff, Teacher, ManagementStaff, SchoolClass, Enrollment, AttendanceSession,
+              AttendanceRecord):
+	post_save.connect(invalidate_admin_dashboard, sender=model, dispatch_uid=f'dashboard-save-{model.__name__}')
+	post_delete.connect(invalidate_admin_dashboard, sender=model, dispatch_uid=f'dashboard-delete-{model.__name__}')
+
+
+def invalidate_routine_form_payload(sender, action='post_save', **kwargs):
+	if action.startswith('post_'):
+		invalidate_routine_form()
+
+
+for model in (Staff, Teacher, SchoolClass, Section, Subject):
+	post_save.connect(invalidate_routine_form_payload, sender=model, dispatch_uid=f'routine-form-save-{model.__name__}')
+	post_delete.connect(invalidate_routine_form_payload, sender=model, dispatch_uid=f'routine-form-delete-{model.__name__}')
+m2m_changed.connect(invalidate_routine_form_payload, sender=Teacher.school_class.through,
+                    dispatch_uid='routine-form-teacher-classes')
+
+
+def invalidate_calendar_feeds(sender, action='post_save', **kwargs):
+	if action.startswith('post_'):
+		touch_calendars()
+
+
+for model in (AcademicYear, Routine, Exam, Assignment, Enrollment, Student, Staff, Teacher, SchoolClass, Section,
+              Subject):
+	post_save.connect(invalidate_calendar_feeds, sender=model, dispatch_uid=f'calendar-save-{model.__name__}')
+	post_delete.connect(invalidate_calendar_feeds, sender=model, dispatch_uid=f'calendar-delete-{model.__name__}')
+for through in (Assignment.section.through, Teacher.school_class.through):
+	m2m_changed.connect(invalidate_calendar_feeds, sender=through, dispatch_uid=f'calendar-m2m-{through.__name__}')
@@ -0,0 +1,474 @@
+import datetime
+import math
+import multiprocessing
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import NumericRange
+from django.utils import timezone
+
+from academic.ical import touch_calendars
+from academic.models import AcademicYear, Routine, Section, Subject, TimetableJob
+from crons.cron import WEEKLY_HOLIDAYS
+from user.models import Teacher
+
+DEFAULT_PERIODS = [
+	('10:00', '10:45'), ('10:45', '11:30'), ('11:30', '12:15'), ('12:15', '13:00'),
+	('13:30', '14:15'), ('14:15', '15:00'), ('15:00', '15:45'), ('15:45', '16:30'),
+]
+TIMETABLE_OPTIONS = ['sections', 'days', 'periods', 'quotas', 'unavailable', 'time_limit', 'seed', 'dry_run']
+DEFAULT_TIME_LIMIT = 60
+MAX_TIME_LIMIT = 300
+# Backtracks allowed before restarting with a new random tie-break; grows on every restart.
+INITIAL_BACKTRACK_BUDGET = 2000
+PROGRESS_INTERVAL = 0.5
+# A job still running this long after it started has outlived its time limit and lost its worker.
+STALE_JOB_AFTER = datetime.timedelta(seconds=MAX_TIME_LIMIT + 5 * 60)
+
+
+def _minutes(value):
+	value = datetime.time.fromisoformat(str(value).strip())
+	return value.hour * 60 + value.minute
+
+
+def _time(minutes):
+	return datetime.time(minutes // 60, minutes % 60)
+
+
+def _parse_periods(periods):
+	try:
+		periods = [(_minutes(start), _minutes(end)) for start, end in periods]
+	except (TypeError, ValueError):
+		raise ValidationError('periods must be a list of ["HH:MM", "HH:MM"] pairs.')
+	for index, (start, end) in enumerate(periods):
+		if end <= start or (index and start < periods[index - 1][1]):
+			raise ValidationError('periods must be in order and must not overlap.')
+	return periods
+
+
+def build_problem(academic_year, options):
+	"""
+	Read everything the solver needs in a handful of queries and return it as plain data.
+
+	``options`` may hold ``sections`` (ids; default every section), ``days``, ``periods``
+	(``[[start, end], ...]``), ``quotas`` (``{class_id: {subject_id: periods per week}}``; by default
+	a class's week is split evenly between its subjects) and ``unavailable``
+	(``{teacher_id: [[day, period index], ...]}``). Periods the teachers already teach in sections
+	outside this run are blocked too.
+	"""
+	days = options.get('days') or [day for day, _ in Routine.DAY_CHOICES if day not in WEEKLY_HOLIDAYS]
+	if set(days) - {day for day, _ in Routine.DAY_CHOICES}:
+		raise ValidationError('days must be names of weekdays.')
+	periods = _parse_periods(options.get('periods') or DEFAULT_PERIODS)
+	slot_count = len(days) * len(periods)
+
+	sections = Section.objects.select_related('school_class').order_by('school_class__name', 'name')
+	if options.get('sections'):
+		sections = sections.filter(id__in=options['sections'])
+	sections = list(sections)
+	if not sections:
+		raise ValidationError('There are no sections to schedule.')
+	class_ids = {section.school_class_id for section in sections}
+
+	subjects = defaultdict(list)
+	for subject in Subject.objects.filter(school_class_id__in=class_ids).order_by('name'):
+		subjects[subject.school_class_id].append(subject)
+
+	quotas = {}
+	requested = {str(class_id): value for class_id, value in (options.get('quotas') or {}).items()}
+	for class_id in class_ids:
+		class_subjects = subjects[class_id]
+		if str(class_id) in requested:
+			by_id = {str(subject.id): subject for subject in class_subjects}
+			try:
+				quota = {by_id[str(subject_id)]: int(count) for subject_id, count in requested[str(class_id)].items()}
+			except (KeyError, TypeError, ValueError):
+				raise ValidationError(f'quotas for class {class_id} must map its subject ids to period counts.')
+		elif class_subjects:
+			base, extra = divmod(slot_count, len(class_subjects))
+			quota = {subject: base + (index < extra) for index, subject in enumerate(class_subjects)}
+		else:
+			quota = {}
+		if sum(quota.values()) > slot_count:
+			raise ValidationError(
+				f'{class_subjects[0].school_class} needs {sum(quota.values())} periods a week '
+				f'but the grid only has {slot_count}.'
+			)
+		quotas[class_id] = {subject: count for subject, count in quota.items() if count > 0}
+
+	teachers = list(Teacher.objects.select_related('staff', 'subject').prefetch_related('school_class'))
+	eligible = defaultdict(list)
+	for teacher in teachers:
+		if teacher.subject is None:
+			continue
+		for school_class in teacher.school_class.all():
+			eligible[(school_class.id, teacher.subject.name.strip().lower())].append(teacher.id)
+
+	blocked = defaultdict(set)
+	day_index = {day: index for index, day in enumerate(days)}
+	for teacher_id, slots in (options.get('unavailable') or {}).items():
+		for day, period in slots:
+			if day in day_index and 0 <= int(period) < len(periods):
+				blocked[str(teacher_id)].add(day_index[day] * len(periods) + int(period))
+	for teacher_id, day, start_time, end_time in Routine.objects.filter(
+		academic_year=academic_year, day__in=days
+	).exclude(section__in=sections).values_list('teacher_id', 'day', 'start_time', 'end_time'):
+		start, end = start_time.hour * 60 + start_time.minute, end_time.hour * 60 + end_time.minute
+		for index, (period_start, period_end) in enumerate(periods):
+			if period_start < end and start < period_end:
+				blocked[str(teacher_id)].add(day_index[day] * len(periods) + index)
+
+	return {
+		'days': days,
+		'periods': periods,
+		'sections': sections,
+		'quotas': quotas,
+		'teachers': {str(teacher.id): teacher for teacher in teachers},
+		'eligible': eligible,
+		'blocked': blocked,
+	}
+
+
+def assign_teachers(problem):
+	"""
+	Give every (section, subject) one teacher for the whole week, least-loaded eligible teacher
+	first and the subjects with the fewest candidates before the rest.
+	"""
+	slot_count = len(problem['days']) * len(problem['periods'])
+	load = defaultdict(int)
+	demands = []
+	for section in problem['sections']:
+		for subject, count in problem['quotas'][section.school_class_id].items():
+			candidates = [
+				str(teacher_id)
+				for teacher_id in problem['eligible'][(section.school_class_id, subject.name.strip().lower())]
+			]
+			demands.append((section, subject, count, candidates))
+	demands.sort(key=lambda demand: (len(demand[3]), -demand[2]))
+
+	groups = []
+	for section, subject, count, candidates in demands:
+		free = [
+			teacher_id for teacher_id in candidates
+			if load[teacher_id] + count <= slot_count - len(problem['blocked'][teacher_id])
+		]
+		if not free:
+			raise ValidationError(
+				f'No teacher with free periods can teach {subject.name} in {section.school_class} {section.name}.'
+			)
+		teacher_id = min(free, key=lambda teacher_id: load[teacher_id])
+		load[teacher_id] += count
+		groups.append({'section': section, 'subject': subject, 'teacher': teacher_id, 'count': count})
+	return groups
+
+
+class _Search:
+	"""
+	Places every lesson of every group in a (day, period) slot so no section or teacher is booked
+	twice. Depth-first with forward checking: the group with the least slack (free slots left
+	minus lessons left) goes next, its candidate slots are tried on the day with fewest lessons of
+	that subject first and least constraining first, and an assignment that leaves any other group
+	of the same section or teacher without room is undone immediately.
+	"""
+
+	def __init__(self, groups, problem, rng):
+		self.groups = groups
+		self.period_count = len(problem['periods'])
+		self.slot_count = len(problem['days']) * self.period_count
+		self.rng = rng
+
+		self.section_free = {}
+		self.teacher_free = {}
+		self.by_section = defaultdict(list)
+		self.by_teacher = defaultdict(list)
+		for index, group in enumerate(groups):
+			section_id, teacher_id = group['section'].id, group['teacher']
+			self.section_free.setdefault(section_id, [True] * self.slot_count)
+			self.teacher_free.setdefault(
+				teacher_id, [slot not in problem['blocked'][teacher_id] for slot in range(self.slot_count)]
+			)
+			self.by_section[section_id].append(index)
+			self.by_teacher[teacher_id].append(index)
+		self.remaining = [group['count'] for group in groups]
+		self.room = [sum(self._open(index, slot) for slot in range(self.slot_count)) for index in range(len(groups))]
+		self.per_day = [defaultdict(int) for _ in groups]
+		self.placed = []
+		self.backtracks = 0
+
+	def _open(self, index, slot):
+		group = self.groups[index]
+		return self.section_free[group['section'].id][slot] and self.teacher_free[group['teacher']][slot]
+
+	def _neighbours(self, index):
+		group = self.groups[index]
+		return set(self.by_section[group['section'].id]) | set(self.by_teacher[group['teacher']])
+
+	def _assign(self, index, slot):
+		"""Book ``slot`` for group ``index``; returns False (with nothing booked) if that strands a neighbour."""
+		neighbours = self._neighbours(index)
+		affected = [other for other in neighbours if self._open(other, slot)]
+		group = self.groups[index]
+		self.section_free[group['section'].id][slot] = False
+		self.teacher_free[group['teacher']][slot] = False
+		for other in affected:
+			self.room[other] -= 1
+		self.remaining[index] -= 1
+		self.per_day[index][slot // self.period_count] += 1
+		if all(self.room[other] >= self.remaining[other] for other in neighbours):
+			self.placed.append((index, slot))
+			return True
+		self._release(index, slot, affected)
+		return False
+
+	def _release(self, index, slot, affected=None):
+		group = self.groups[index]
+		self.section_free[group['section'].id][slot] = True
+		self.teacher_free[group['teacher']][slot] = True
+		if affected is None:
+			affected = [other for other in self._neighbours(index) if self._open(other, slot)]
+		for other in affected:
+			self.room[other] += 1
+		self.remaining[index] += 1
+		self.per_day[index][slot // self.period_count] -= 1
+
+	def _next_group(self):
+		best, best_key = None, None
+		for index, remaining in enumerate(self.remaining):
+			if remaining:
+				key = (self.room[index] - remaining, -remaining, self.rng.random())
+				if best_key is None or key < best_key:
+					best, best_key = index, key
+		return best
+
+	def _candidates(self, index):
+		neighbours = self._neighbours(index)
+		slots = [slot for slot in range(self.slot_count) if self._open(index, slot)]
+		return sorted(slots, key=lambda slot: (
+			self.per_day[index][slot // self.period_count],
+			sum(1 for other in neighbours if self.remaining[other] and self._open(other, slot)),
+			self.rng.random(),
+		))
+
+	def run(self, budget, deadline, progress):
+		total = sum(self.remaining)
+		frames = []
+		index = self._next_group()
+		if index is not None:
+			frames.append([index, self._candidates(index), 0, None])
+		reported = time.monotonic()
+		while frames:
+			frame = frames[-1]
+			if frame[3] is not None:
+				self.placed.pop()
+				self._release(frame[0], frame[3])
+				frame[3] = None
+			while frame[2] < len(frame[1]):
+				slot = frame[1][frame[2]]
+				frame[2] += 1
+				if self._assign(frame[0], slot):
+					frame[3] = slot
+					break
+			if frame[3] is None:
+				frames.pop()
+				self.backtracks += 1
+				if self.backtracks > budget or time.monotonic() > deadline:
+					return False
+				continue
+
+			if time.monotonic() - reported > PROGRESS_INTERVAL:
+				progress(len(self.placed), total)
+				reported = time.monotonic()
+			index = self._next_group()
+			if index is None:
+				return True
+			frames.append([index, self._candidates(index), 0, None])
+		return index is None
+
+
+def solve(problem, time_limit=DEFAULT_TIME_LIMIT, seed=None, progress=None):
+	"""
+	Generate a conflict-free week for ``problem`` (see ``build_problem``). Restarts the search with
+	a new random tie-break and a larger backtrack budget whenever it stalls. Returns the groups,
+	the ``(group index, slot)`` placements and search statistics.
+	"""
+	progress = progress or (lambda done, total: None)
+	groups = assign_teachers(problem)
+	deadline = time.monotonic() + time_limit
+	rng = random.Random(seed)
+	budget = INITIAL_BACKTRACK_BUDGET
+	restarts = 0
+	backtracks = 0
+	while True:
+		search = _Search(groups, problem, rng)
+		solved = search.run(budget, deadline, progress)
+		backtracks += search.backtracks
+		if solved:
+			return groups, search.placed, {'restarts': restarts, 'backtracks': backtracks}
+		if time.monotonic() > deadline:
+			raise ValidationError(
+				f'No conflict-free timetable found within {time_limit} seconds; '
+				'add teachers, relax quotas or widen the period grid.'
+			)
+		restarts += 1
+		budget = math.ceil(budget * 1.5)
+
+
+def generate_timetable(academic_year, options, progress=None):
+	"""
+	Build and solve the timetable described by ``options`` and, unless ``options['dry_run']``,
+	replace the routines of the scheduled sections with it in one transaction.
+	"""
+	progress = progress or (lambda done, total: None)
+	started = time.perf_counter()
+	problem = build_problem(academic_year, options)
+	groups, placed, stats = solve(
+		problem, time_limit=options.get('time_limit', DEFAULT_TIME_LIMIT), seed=options.get('seed'), progress=progress
+	)
+
+	periods = problem['periods']
+	routines = []
+	for index, slot in placed:
+		group = groups[index]
+		start, end = periods[slot % len(periods)]
+		routines.append(Routine(
+			academic_year=academic_year,
+			day=problem['days'][slot // len(periods)],
+			start_time=_time(start),
+			end_time=_time(end),
+			period=NumericRange(start, end),
+			school_class_id=group['section'].school_class_id,
+			section=group['section'],
+			subject=group['subject'],
+			teacher_id=group['teacher'],
+		))
+
+	if not options.get('dry_run'):
+		with transaction.atomic():
+			Routine.objects.filter(academic_year=academic_year, section__in=problem['sections']).delete()
+			Routine.objects.bulk_create(routines, batch_size=500)
+			touch_calendars()
+
+	teachers = problem['teachers']
+	return {
+		'dry_run': bool(options.get('dry_run')),
+		'sections': len(problem['sections']),
+		'routines': len(routines),
+		'seconds': round(time.perf_counter() - started, 2),
+		**stats,
+		'assignments': [
+			{
+				'school_class': group['section'].school_class.name,
+				'section': group['section'].name,
+				'subject': group['subject'].name,
+				'teacher': teachers[group['teacher']].staff.get_fullname(),
+				'periods': group['count'],
+			} for group in groups
+		],
+	}
+
+
+def run_timetable_job(job_id):
+	"""
+	Run a pending ``TimetableJob``, recording progress, the outcome and any error on the job row.
+	The job is claimed by moving it from pending to running in one update, so a job handed to more
+	than one worker (see ``recover_timetable_jobs``) still runs once.
+	"""
+	claimed = TimetableJob.objects.filter(id=job_id, status='pending').update(
+		status='running', started_at=timezone.now(), progress=0
+	)
+	if not claimed:
+		return
+	job = TimetableJob.objects.select_related('academic_year').get(id=job_id)
+	last = [-1]
+
+	def progress(done, total):
+		percent = min(99, done * 100 // total) if total else 0
+		if percent != last[0]:
+			last[0] = percent
+			TimetableJob.objects.filter(id=job.id).update(progress=percent, message=f'Placed {done} of {total} periods.')
+
+	try:
+		result = generate_timetable(job.academic_year, job.options, progress=progress)
+	except ValidationError as e:
+		TimetableJob.objects.filter(id=job.id).update(status='failed', message=e.messages[0], finished_at=timezone.now())
+	except Exception as e:
+		TimetableJob.objects.filter(id=job.id).update(status='failed', message=str(e), finished_at=timezone.now())
+		raise
+	else:
+		TimetableJob.objects.filter(id=job.id).update(
+			status='succeeded', progress=100, result=result, finished_at=timezone.now(),
+			message=f"Scheduled {result['routines']} periods for {result['sections']} sections."
+		)
+	finally:
+		connection.close()
+
+
+def _init_worker():
+	import django
+	django.setup()
+
+
+_pool = None
+
+
+def _submit(job_id):
+	global _pool
+	for attempt in range(2):
+		if _pool is None:
+			_pool = ProcessPoolExecutor(
+				max_workers=1, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker
+			)
+		try:
+			_pool.submit(run_timetable_job, job_id)
+			return
+		except BrokenProcessPool:
+			# The worker died (killed, out of memory); start a fresh one.
+			_pool = None
+	raise BrokenProcessPool('Could not start a timetable worker.')
+
+
+def schedule_timetable_job(job):
+	"""
+	Hand ``job`` to a single background worker process once the current transaction commits.
+	The solver is CPU-bound, so it runs outside the web server process and never competes with
+	requests for the GIL. The queue lives in this process only; ``generate_timetable --recover``,
+	run after each deploy and from cron, picks up what a restart or a crashed worker leaves behind.
+	"""
+	transaction.on_commit(lambda: _submit(job.id))
+
+
+def fail_stale_timetable_jobs():
+	"""
+	Mark running jobs that have outlived ``STALE_JOB_AFTER`` as failed. Their worker is gone, and
+	with it the transaction that would have replaced the routines, so nothing was written.
+	"""
+	now = timezone.now()
+	return TimetableJob.objects.filter(status='running', started_at__lt=now - STALE_JOB_AFTER).update(
+		status='failed', finished_at=now,
+		message='The timetable worker stopped before the job finished. Please start the job again.'
+	)
+
+
+def recover_timetable_jobs(run=_submit):
+	"""
+	Sweep up jobs orphaned by a restart: fail the stale running ones and hand every pending job to
+	``run`` (this process's worker by default). Called by ``generate_timetable --recover``.
+	Returns ``(failed, pending job ids)``.
+	"""
+	failed = fail_stale_timetable_jobs()
+	pending = list(TimetableJob.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True))
+	for job_id in pending:
+		run(job_id)
+	return failed, pending
+
+
+def create_timetable_job(options, created_by=None, academic_year=None):
+	academic_year = academic_year or AcademicYear.objects.filter(is_active=True).first()
+	if academic_year is None:
+		raise ValidationError('No active academic year found. Please set one.')
+	return TimetableJob.objects.create(academic_year=academic_year, options=options, created_by=created_by)
@@ -1,12 +1,15 @@
 from django.conf import settings
 from django.urls import path
 from .views import EnrollmentApiView, AddStaffApiView, SchoolClassViewSet, SubjectApiView, RoutineViewSet, \
-	RoutineFormGetAPiView, SimpleClassListApiView, UpdateSubjectApiView, \
+	RoutineFormGetAPiView, SimpleClassListApiView, UpdateSubjectApiView, AdmissionImportView, SectionRenumberView, \
 	AttendanceRecordViewSet, DeleteStaffApiView, AddStaffImageView, EnrollmentImageView, TeacherStudentList, \
 	AttendanceRecordSearchView, TeacherStudentAttendanceView, AttendanceSessionView, AttendanceSessionDetailView, \
 	AttendanceRecordUpdateView, AttendanceRecordIndividualUpdate, AssignmentViewSet, AssignmentFormGetApiView, \
 	SchoolClassTeacherApiView, ParentDetailView, ExamViewSet, ExamFormViewSet, AnnouncementViewSet, \
-	GradeAssignmentApiView, AdminDashboard, ParentChildAttendance, SubmissionsView
+	GradeAssignmentApiView, AdminDashboard, ParentChildAttendance, SubmissionsView, AttendanceRecordBulkUpdateView, \
+	AttendanceCalendarView, AttendanceAnalyticsView, AttendanceExportView, AttendanceSyncView, \
+	GateScanIngestView, PromotionView, RoutineImportView, TimetableJobView, TimetableJobDetailView, \
+	CalendarFeedLinkView, CalendarFeedView
 from rest_framework.routers import DefaultRouter
 from django.conf.urls.static import static
 
@@ -24,6 +27,9 @@ router.register('submission', SubmissionsView, basename='submission')
 urlpatterns = [
 	path('enrollment/', EnrollmentApiView.as_view(), name='enrollment'),
 	path('enrollment-image/', EnrollmentImageView.as_view(), name='enrollment_image'),
+	path('admission-import/', AdmissionImportView.as_view(), name='admission_import'),
+	path('section/<uuid:section_id>/renumber/', SectionRenumberView.as_view(), name='section_renumber'),
+	path('promotion/', PromotionView.as_view(), name='promotion'),
 	path('add-staff/', AddStaffApiView.as_view(), name='add_staff'),
 	path('add-staff-image/', AddStaffImageView.as_view(), name='add_staff_image'),
 	path('delete-staff/<uuid:id>/', DeleteStaffApiView.as_view(), name='delete_staff'),
@@ -31,6 +37,11 @@ urlpatterns = [
 	path('subject/update/', UpdateSubjectApiView.as_view(), name='subject-update'),
 	path('subject/<uuid:id>/', SubjectApiView.as_view(), name='subject-detail'),
 	path('routine/add/', RoutineFormGetAPiView.as_view(), name='routine-add'),
+	path('routine-import/', RoutineImportView.as_view(), name='routine-import'),
+	path('timetable-jobs/', TimetableJobView.as_view(), name='timetable-jobs'),
+	path('timetable-jobs/<uuid:job_id>/', TimetableJobDetailView.as_view(), name='timetable-job-detail'),
+	path('calendar-feed/', CalendarFeedLinkView.as_view(), name='calendar-feed-link'),
+	path('calendar/<uuid:token>.ics', CalendarFeedView.as_view(), name='calendar-feed'),
 	path('class-list/', SimpleClassListApiView.as_view(), name='class-list'),
 	path('class-teacher/<uuid:class_id>/', SchoolClassTeacherApiView.as_view(), name='class-teacher'),
 	path('teacher-student-list/', TeacherStudentList.as_view(), name='teacher-student-list'),
@@ -41,6 +52,10 @@ urlpatterns = [
 	path('attendance-session-detail/<uuid:session_id>/', AttendanceSessionDetailView.as_view(), name='attendance-session-detail'),
 	path('attendance-record-update/', AttendanceRecordUpdateView.as_view(), name='attendance-record-update'),
 	path('attendance-record-individual-update/', AttendanceRecordIndividualUpdate.as_view(), name='attendance-record-individual-update'),
+	path('attendance-record-bulk-update/', AttendanceRecordBulkUpdateView.as_view(), name='attendance-record-bulk-update'),
+	path('attendance-sync/', AttendanceSyncView.as_view(), name='attendance-sync'),
+	path('gate-scans/', GateScanIngestView.as_view(), name='gate-scans'),
+	path('attendance-calendar/', AttendanceCalendarView.as_view(), name='attendance-calendar'),
 
 	path('assignment-form-get/', AssignmentFormGetApiView.as_view(), name='assignment-form-get'),
 	path('assignment-grade/', GradeAssignmentApiView.as_view(), name='assignment-grade'),
@@ -49,6 +64,8 @@ urlpatterns = [
 	path('parent-detial/<uuid:parent_id>/', ParentDetailView.as_view(), name='parent-detail'),
 
 	path('admin-dashboard/', AdminDashboard.as_view(), name='admin-dashboard'),
+	path('attendance-analytics/', AttendanceAnalyticsView.as_view(), name='attendance-analytics'),
+	path('attendance-export/', AttendanceExportView.as_view(), name='attendance-export'),
 	path('parent-child-attendance', ParentChildAttendance.as_view(), name='parent-child-attendance'),
 
 ]
@@ -1,20 +1,41 @@
+import calendar
+import datetime
 import uuid
 
-from django.db import transaction
-from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.db.models import Prefetch, Q, Count
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.viewsets import ModelViewSet
+from backend.pagination import KeysetPagination
+from backend.streaming import StreamingListMixin, streaming_response
+from academic.admissions import import_admissions, read_admission_file
+from academic.analytics import attendance_analytics
+from academic.attendance import apply_attendance_changes, sync_attendance
+from academic.dashboard import get_dashboard_snapshot
+from academic.exports import attendance_export_rows, stream_csv, stream_parquet, parquet_available
+from academic.gate import MAX_SCAN_BATCH, ingest_gate_scans
+from academic.ical import calendar_changed_at, feed_etag, feed_token, get_feed, rotate_feed_token, user_for_token
+from academic.promotion import promote_students
+from academic.routines import ROUTINE_COLUMNS, get_routine_form, import_routines
+from academic.timetable import DEFAULT_TIME_LIMIT, MAX_TIME_LIMIT, STALE_JOB_AFTER, TIMETABLE_OPTIONS, create_timetable_job, \
+	fail_stale_timetable_jobs, schedule_timetable_job
 from academic.models import SchoolClass, Department, Section, Subject, Routine, AttendanceSession, AttendanceRecord, \
-	Enrollment, Assignment, Exam, Announcement, AssignmentAttachment, Submission
+	Enrollment, Assignment, Exam, Announcement, AssignmentAttachment, Submission, AcademicYear, AttendanceBitmap, \
+	SectionRollCounter, TimetableJob
 from academic.serializer import EnrollmentPostSerializer, EnrollmentGetSchoolClassSerializer, AddStaffGetSerializer, \
 	SimpleDepartmentSerializer, AddStaffSerializer, SimpleTeacherSerializer, SimpleManagementStaffSerializer, \
 	SchoolClassGetSerializer, SchoolClassPostSerializer, SubjectListSerializer, RoutineSerializer, \
-	SimpleSchoolClassSerializer, SimpleSubjectSerializer, SimpleStaffSerializer, RoutineSchoolClassGetSerializer, \
+	SimpleSchoolClassSerializer, SimpleSubjectSerializer, SimpleStaffSerializer, \
 	RoutineTeacherGetSerializer, RoutinePostSerializer, AttendanceRecordPostSerializer, \
 	AttendanceRecordGetSerializer, AssignmentFormGetSerializer, SchoolClassRetrieveSerializer, \
 	ClassTeacherApiSerializer, ExamSerializer, ExamPostSerializer, ExamFormSerializer, AnnouncementSerializer, \
@@ -22,7 +43,7 @@ from academic.serializer import EnrollmentPostSerializer, EnrollmentGetSchoolCla
 	TeacherAssignmentDetailSerializer, AssignmentUpdateSerializer, SubmissionSerializer
 from student.serializer import ListStudentSerializer
 from user.serializer import StudentSerializer, ParentSerializer, ParentDetailSerializer
-from user.models import Parent, Teacher, Staff, CustomUser, Student, ManagementStaff
+from user.models import Parent, Teacher, Staff, CustomUser, Student
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from rest_framework import filters
@@ -84,11 +105,136 @@ class EnrollmentApiView(APIView):
 				enrollment_serializer.is_valid(raise_exception=True)
 				enrollment_serializer.save()
 
-			return Response(enrollment_serializer.data, status=status.HTTP_201_CREATED)
+			data = dict(enrollment_serializer.data)
+			if getattr(student, 'initial_password', None):
+				# The generated password exists only here; hand it out like the bulk admission import does.
+				data['credentials'] = [{'email': student.email, 'password': student.initial_password}]
+			return Response(data, status=status.HTTP_201_CREATED)
 		except Exception as e:
 			return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class AdmissionImportView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Admit many students from a CSV or XLSX sheet ('file'). The whole sheet is validated "
+		            "first and nothing is saved unless every row is valid. Send 'dry_run=true' to only validate. "
+		            "Use the import_admissions management command for very large sheets.",
+		request=None,
+	)
+	def post(self, request):
+		if not request.user.has_role('admin'):
+			return Response({'detail': 'You do not have permission to admit students.'}, status=status.HTTP_403_FORBIDDEN)
+
+		upload = request.FILES.get('file')
+		if upload is None:
+			return Response({'detail': 'Please upload a CSV or XLSX file.'}, status=status.HTTP_400_BAD_REQUEST)
+		dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+		try:
+			report = import_admissions(read_admission_file(upload, upload.name), dry_run=dry_run)
+		except (ValidationError, UnicodeDecodeError) as e:
+			detail = e.messages[0] if isinstance(e, ValidationError) else 'The file is not valid UTF-8 text.'
+			return Response({'detail': detail}, status=status.HTTP_400_BAD_REQUEST)
+
+		if report['errors']:
+			return Response(report, status=status.HTTP_400_BAD_REQUEST)
+		return Response(report, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+@extend_schema(tags=["Enrollment"])
+class SectionRenumberView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Reassign the roll numbers of a section in the active academic year as 1..n "
+		            "in alphabetical order of student name.",
+		request=None,
+	)
+	def post(self, request, section_id):
+		if not request.user.has_role('admin'):
+			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+
+		section = Section.objects.filter(id=section_id).first()
+		academic_year = AcademicYear.objects.filter(is_active=True).first()
+		if section is None or academic_year is None:
+			return Response({'detail': 'Section or active academic year not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+		total = SectionRollCounter.renumber_alphabetically(academic_year.id, section.school_class_id, section.id)
+		return Response({'renumbered': total}, status=status.HTTP_200_OK)
+
+
+class PromotionView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Promote every student of one academic year into the next according to a class mapping. "
+		            "Classes mapped to null graduate. Send preview=true to see the result without saving it.",
+		request={
+			'application/json': {
+				'type': 'object',
+				'properties': {
+					'from_year': {'type': 'string', 'format': 'uuid'},
+					'to_year': {'type': 'string', 'format': 'uuid'},
+					'class_map': {'type': 'object', 'additionalProperties': {'type': 'string', 'nullable': True}},
+					'preview': {'type': 'boolean'},
+					'copy_routines': {'type': 'boolean'},
+					'activate': {'type': 'boolean'},
+				},
+				'required': ['from_year', 'to_year', 'class_map'],
+			}
+		},
+		examples=[
+			OpenApiExample(
+				'Class 5 to Class 6, Class 10 graduates',
+				value={
+					'from_year': '5b0f1c8e-...', 'to_year': '9a3e77d2-...',
+					'class_map': {'<class 5 id>': '<class 6 id>', '<class 10 id>': None},
+					'preview': True,
+				},
+				request_only=True,
+			),
+		],
+	)
+	def post(self, request):
+		if not request.user.has_role('admin'):
+			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+
+		class_map = request.data.get('class_map')
+		if not isinstance(class_map, dict) or not class_map:
+			return Response({'detail': 'class_map must map class ids to class ids or null.'},
+			                status=status.HTTP_400_BAD_REQUEST)
+		try:
+			from_year = AcademicYear.objects.get(id=request.data.get('from_year'))
+			to_year = AcademicYear.objects.get(id=request.data.get('to_year'))
+			class_map = {
+				uuid.UUID(str(source)): uuid.UUID(str(target)) if target else None
+				for source, target in class_map.items()
+			}
+		except (AcademicYear.DoesNotExist, ValidationError, ValueError):
+			return Response({'detail': 'Unknown academic year or malformed class id.'},
+			                status=status.HTTP_400_BAD_REQUEST)
+
+		try:
+			report = promote_students(
+				from_year, to_year, class_map,
+				preview=bool(request.data.get('preview', False)),
+				copy_routines=bool(request.data.get('copy_routines', True)),
+				activate=bool(request.data.get('activate', False)),
+			)
+		except ValidationError as e:
+			return Response({'detail': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+		except IntegrityError as e:
+			# A routine booked in the target year while the copy ran.
+			message = Routine.overlap_message(e)
+			if message is None:
+				raise
+			return Response({'detail': f'Routines could not be copied: {message} Nothing was saved.'},
+			                status=status.HTTP_409_CONFLICT)
+		return Response(report, status=status.HTTP_200_OK)
+
+
 class EnrollmentImageView(APIView):
 	permission_classes = [IsAuthenticated]
 
@@ -483,18 +629,245 @@ class RoutineViewSet(ModelViewSet):
 			teacher = Teacher.objects.get(staff__email=self.request.user.email)
 			return Routine.objects.filter(teacher=teacher).order_by('created_at')
 		elif self.request.user.has_role('student'):
-			student = Student.objects.get(email=self.request.user.email)
-			enrollment = Enrollment.objects.filter(student=student).first()
+			enrollment = Student.objects.select_related('current_enrollment').get(
+				email=self.request.user.email
+			).current_enrollment
 			if enrollment:
-				return Routine.objects.filter(school_class=enrollment.school_class,
-				                              section=enrollment.section).order_by('created_at')
+				return Routine.objects.filter(school_class_id=enrollment.school_class_id,
+				                              section_id=enrollment.section_id).order_by('created_at')
 			return Routine.objects.none()
 
+	def create(self, request, *args, **kwargs):
+		try:
+			with transaction.atomic():
+				return super().create(request, *args, **kwargs)
+		except ValidationError as e:
+			return Response({"error": e.message_dict}, status=status.HTTP_400_BAD_REQUEST)
+		except IntegrityError as e:
+			return self.conflict_response(e)
+
 	def update(self, request, *args, **kwargs):
 		try:
-			return super().update(request, *args, **kwargs)
+			with transaction.atomic():
+				return super().update(request, *args, **kwargs)
 		except ValidationError as e:
 			return Response({"error": e.message_dict}, status=status.HTTP_400_BAD_REQUEST)
+		except IntegrityError as e:
+			return self.conflict_response(e)
+
+	def conflict_response(self, error):
+		message = Routine.overlap_message(error)
+		if message is None:
+			raise error
+		return Response({"error": {"__all__": [message]}}, status=status.HTTP_409_CONFLICT)
+
+
+@extend_schema(tags=['Routine'])
+class RoutineImportView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Import many routine periods at once. Every row is validated and checked for section and "
+		            "teacher double-bookings, within the batch and against the existing timetable, before one bulk "
+		            "insert. All errors and conflicts are reported together and nothing is saved unless the whole "
+		            "batch is clean. 'replace=true' swaps out the existing timetable of the imported sections; "
+		            "'dry_run=true' only checks.",
+		request={
+			'application/json': {
+				'type': 'object',
+				'properties': {
+					'routines': {'type': 'array', 'items': {'type': 'object', 'properties': {
+						column: {'type': 'string'} for column in ROUTINE_COLUMNS
+					}}},
+					'dry_run': {'type': 'boolean'},
+					'replace': {'type': 'boolean'},
+				},
+				'required': ['routines'],
+			}
+		},
+		examples=[
+			OpenApiExample(
+				'One period',
+				value={'routines': [{
+					'day': 'Sunday', 'start_time': '10:00', 'end_time': '10:45', 'school_class': '<class id>',
+					'section': '<section id>', 'subject': '<subject id>', 'teacher': '<teacher id>',
+				}], 'dry_run': True},
+				request_only=True,
+			),
+		],
+	)
+	def post(self, request):
+		if not request.user.has_role('admin'):
+			return Response({'detail': 'You do not have permission to import routines.'},
+			                status=status.HTTP_403_FORBIDDEN)
+
+		rows = request.data.get('routines')
+		if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+			return Response({'detail': 'routines must be a non-empty list of periods.'},
+			                status=status.HTTP_400_BAD_REQUEST)
+		dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+		replace = str(request.data.get('replace', '')).lower() in ('1', 'true', 'yes')
+
+		try:
+			report = import_routines(rows, dry_run=dry_run, replace=replace)
+		except ValidationError as e:
+			return Response({'detail': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+		if report['errors']:
+			return Response(report, status=status.HTTP_400_BAD_REQUEST)
+		if report['conflicts']:
+			return Response(report, status=status.HTTP_409_CONFLICT)
+		return Response(report, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+def _timetable_job_data(job):
+	return {
+		'id': job.id,
+		'academic_year': job.academic_year_id,
+		'status': job.status,
+		'progress': job.progress,
+		'message': job.message,
+		'options': job.options,
+		'result': job.result,
+		'created_at': job.created_at,
+		'started_at': job.started_at,
+		'finished_at': job.finished_at,
+	}
+
+
+class TimetableJobView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Generate a conflict-free weekly routine for every section (or the given 'sections') in a "
+		            "background worker. Each class's subjects get 'quotas' periods a week (an even split by default), "
+		            "taught by a teacher of that subject assigned to the class, on the 'days' x 'periods' grid while "
+		            "respecting 'unavailable' teacher slots. Returns the job at once; poll "
+		            "timetable-jobs/<id>/ for progress. The sections' routines are replaced when the job succeeds "
+		            "unless 'dry_run' is set.",
+		request={
+			'application/json': {
+				'type': 'object',
+				'properties': {
+					'academic_year': {'type': 'string', 'format': 'uuid'},
+					'sections': {'type': 'array', 'items': {'type': 'string', 'format': 'uuid'}},
+					'days': {'type': 'array', 'items': {'type': 'string'}},
+					'periods': {'type': 'array', 'items': {'type': 'array', 'items': {'type': 'string'}}},
+					'quotas': {'type': 'object', 'additionalProperties': {
+						'type': 'object', 'additionalProperties': {'type': 'integer'}
+					}},
+					'unavailable': {'type': 'object', 'additionalProperties': {'type': 'array', 'items': {}}},
+					'time_limit': {'type': 'integer'},
+					'seed': {'type': 'integer'},
+					'dry_run': {'type': 'boolean'},
+				},
+			}
+		},
+		examples=[
+			OpenApiExample(
+				'Six periods a week of maths for Class 5',
+				value={
+					'quotas': {'<class 5 id>': {'<maths id>': 6, '<english id>': 6, '<science id>': 5}},
+					'unavailable': {'<teacher id>': [['Sunday', 0], ['Sunday', 1]]},
+					'dry_run': True,
+				},
+				request_only=True,
+			),
+		],
+	)
+	def post(self, request):
+		if not request.user.has_role('admin'):
+			return Response({'detail': 'You do not have permission to generate routines.'},
+			                status=status.HTTP_403_FORBIDDEN)
+
+		options = {key: request.data[key] for key in TIMETABLE_OPTIONS if key in request.data}
+		options['dry_run'] = str(options.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+		try:
+			options['time_limit'] = min(int(options.get('time_limit', DEFAULT_TIME_LIMIT)), MAX_TIME_LIMIT)
+			if options['time_limit'] < 1:
+				return Response({'detail': 'time_limit must be at least 1 second.'}, status=status.HTTP_400_BAD_REQUEST)
+			academic_year = None
+			if request.data.get('academic_year'):
+				academic_year = AcademicYear.objects.get(id=request.data['academic_year'])
+			job = create_timetable_job(options, created_by=request.user, academic_year=academic_year)
+		except (AcademicYear.DoesNotExist, TypeError, ValueError):
+			return Response({'detail': 'Unknown academic year or malformed options.'},
+			                status=status.HTTP_400_BAD_REQUEST)
+		except ValidationError as e:
+			return Response({'detail': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+		schedule_timetable_job(job)
+		return Response(_timetable_job_data(job), status=status.HTTP_202_ACCEPTED)
+
+
+class TimetableJobDetailView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(description="Status, progress and, once finished, the result of a timetable generation job.")
+	def get(self, request, job_id):
+		if not request.user.has_role('admin'):
+			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+		try:
+			job = TimetableJob.objects.get(id=job_id)
+		except TimetableJob.DoesNotExist:
+			return Response({'detail': 'Timetable job not found.'}, status=status.HTTP_404_NOT_FOUND)
+		if job.status == 'running' and job.started_at < timezone.now() - STALE_JOB_AFTER:
+			fail_stale_timetable_jobs()
+			job.refresh_from_db()
+		return Response(_timetable_job_data(job), status=status.HTTP_200_OK)
+
+
+class CalendarFeedLinkView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	def feed_url(self, request, token):
+		return request.build_absolute_uri(reverse('calendar-feed', args=[token]))
+
+	@extend_schema(
+		description="The caller's private iCalendar feed URL with their routine (as weekly recurring events), "
+		            "exams and assignment due dates. Subscribe to it from a calendar app; the URL itself is the "
+		            "credential, so it works without any other login until it is replaced with POST.",
+		responses={200: OpenApiResponse(description="{'url': feed URL}")},
+	)
+	def get(self, request):
+		return Response({'url': self.feed_url(request, feed_token(request.user))}, status=status.HTTP_200_OK)
+
+	@extend_schema(
+		description="Replace the caller's feed URL with a new one. The old URL stops working immediately.",
+		request=None,
+		responses={200: OpenApiResponse(description="{'url': new feed URL}")},
+	)
+	def post(self, request):
+		return Response({'url': self.feed_url(request, rotate_feed_token(request.user))}, status=status.HTTP_200_OK)
+
+
+class CalendarFeedView(APIView):
+	# The secret key in the URL is the credential; calendar apps cannot send a JWT.
+	authentication_classes = []
+	permission_classes = [AllowAny]
+
+	@extend_schema(
+		description="iCalendar feed for the user the token was issued to. Supports If-None-Match and "
+		            "If-Modified-Since, answering 304 while nothing in the feed has changed.",
+		responses={200: OpenApiResponse(description='text/calendar'), 304: None, 404: None},
+	)
+	def get(self, request, token):
+		user = user_for_token(token)
+		if user is None:
+			return Response({'detail': 'Calendar feed not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+		stamp = calendar_changed_at()
+		etag = feed_etag(user, stamp)
+		not_modified = get_conditional_response(request, etag=etag, last_modified=stamp)
+		if not_modified is None:
+			response = HttpResponse(get_feed(user, stamp), content_type='text/calendar; charset=utf-8')
+		else:
+			response = not_modified
+		response['ETag'] = etag
+		response['Last-Modified'] = http_date(stamp)
+		# Let clients revalidate every time; the 304 path is a single cache read.
+		response['Cache-Control'] = 'private, no-cache'
+		return response
 
 
 class RoutineFormGetAPiView(APIView):
@@ -502,8 +875,7 @@ class RoutineFormGetAPiView(APIView):
 
 	def get(self, request):
 		try:
-			school_class = RoutineSchoolClassGetSerializer(SchoolClass.objects.all(), many=True)
-			return Response({'school_class': school_class.data}, status=status.HTTP_200_OK)
+			return Response({'school_class': get_routine_form()}, status=status.HTTP_200_OK)
 
 		except Exception as e:
 			return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -573,9 +945,17 @@ class AttendanceSessionView(APIView):
 			teacher = Teacher.objects.get(staff=staff)
 			class_teacher_of = SchoolClass.objects.get(section__class_teacher=teacher)
 			section = Section.objects.get(class_teacher=teacher)
+			# Sessions are normally pre-created by the morning job, so this is usually a plain read.
+			session = AttendanceSession.objects.filter(
+				academic_year__is_active=True,
+				section=section,
+				date=timezone.localdate()
+			).values_list('id', flat=True).first()
+			if session:
+				return Response({'session_id': session}, status=status.HTTP_200_OK)
 			session = AttendanceSession.objects.create(
 				school_class=class_teacher_of,
-				date=timezone.now(),
+				date=timezone.localdate(),
 				marked_by=teacher,
 				section=section
 			)
@@ -598,7 +978,7 @@ class AttendanceSessionDetailView(APIView):
 			return Response({'message': 'You dont have enough permission.'}, status=status.HTTP_403_FORBIDDEN)
 
 		try:
-			attendance_record = AttendanceRecord.objects.filter(session_id=session_id)
+			attendance_record = AttendanceRecord.objects.filter(session_id=session_id).with_present_days()
 			serializer = AttendanceRecordGetSerializer(attendance_record, many=True)
 			return Response(serializer.data, status=status.HTTP_200_OK)
 		except Exception as e:
@@ -617,26 +997,25 @@ class AttendanceRecordUpdateView(APIView):
 			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
 
 		data_list = request.data
+		if not isinstance(data_list, list):
+			return Response({'detail': 'Expected a list of attendance records.'}, status=status.HTTP_400_BAD_REQUEST)
 
 		for item in data_list:
-			record_id = item.get('id')
-			if not record_id:
+			if not isinstance(item, dict) or not item.get('id'):
 				return Response(
 					{'detail': 'Each record must include its "id".'},
 					status=status.HTTP_400_BAD_REQUEST
 				)
 
-			try:
-				record = AttendanceRecord.objects.get(id=record_id)
-			except AttendanceRecord.DoesNotExist:
+		results, _ = apply_attendance_changes(data_list, partial=False)
+		for row in results:
+			if row['result'] == 'not_found':
 				return Response(
-					{'detail': f'AttendanceRecord with id={record_id} not found.'},
+					{'detail': f'AttendanceRecord with id={row["id"]} not found.'},
 					status=status.HTTP_404_NOT_FOUND
 				)
-
-			record.status = item.get('status', record.status)
-			record.remarks = item.get('remarks', record.remarks)
-			record.save()
+			if row['result'] == 'invalid':
+				return Response({'detail': row['detail']}, status=status.HTTP_400_BAD_REQUEST)
 
 		return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -649,12 +1028,15 @@ class AttendanceRecordIndividualUpdate(APIView):
 			return Response({'error': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
 
 		try:
-			session = AttendanceSession.objects.get(id=request.data.get('session'))
-			student = Student.objects.get(id=request.data.get('student'))
-			attendance_record = AttendanceRecord.objects.get(session=session, student=student)
-			attendance_record.status = request.data.get('status')
-			attendance_record.remarks = request.data.get('remarks')
-			attendance_record.save()
+			item = {
+				'session': request.data.get('session'),
+				'student': request.data.get('student'),
+				'status': request.data.get('status'),
+				'remarks': request.data.get('remarks'),
+			}
+			results, updated = apply_attendance_changes([item], partial=False)
+			if not updated:
+				return Response({'error': results[0].get('detail')}, status=status.HTTP_400_BAD_REQUEST)
 			return Response({'message': 'Attendance record updated successfully.'}, status=status.HTTP_200_OK)
 		except Exception as e:
 			print(e)
@@ -663,7 +1045,122 @@ class AttendanceRecordIndividualUpdate(APIView):
 
 
 @extend_schema(tags=["Attendance"])
-class AttendanceRecordViewSet(ModelViewSet):
+class AttendanceRecordBulkUpdateView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Update many attendance records in one transaction. Records are addressed either by "
+		            "'id' or by 'student' (with 'session' per record or once at the top level).",
+		request=None,
+		examples=[
+			OpenApiExample(
+				'By record id',
+				value={'session': 'uuid', 'records': [{'id': 'uuid', 'status': True, 'remarks': ''}]}
+			),
+			OpenApiExample(
+				'By session and student',
+				value={'records': [{'session': 'uuid', 'student': 'uuid', 'status': False}]}
+			),
+		]
+	)
+	def post(self, request):
+		if not request.user.has_role('teacher'):
+			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+
+		if isinstance(request.data, list):
+			session_id, records = None, request.data
+		else:
+			session_id, records = request.data.get('session'), request.data.get('records')
+
+		if not isinstance(records, list) or not records:
+			return Response({'detail': 'Please provide a list of records.'}, status=status.HTTP_400_BAD_REQUEST)
+
+		try:
+			results, updated = apply_attendance_changes(records, session_id=session_id)
+			return Response({'updated': len(updated), 'results': results}, status=status.HTTP_200_OK)
+		except Exception as e:
+			print(e)
+			return Response(
+				{'detail': 'An error occurred while updating attendance records.'},
+				status=status.HTTP_400_BAD_REQUEST
+			)
+
+
+@extend_schema(tags=["Attendance"])
+class AttendanceSyncView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Offline sync. Applies a batch of client-timestamped edits (last writer wins on "
+		            "'modified_at', replays are ignored) to the teacher's sections and returns the records "
+		            "of those sections changed since 'sync_token', plus a new token for the next sync. Edits "
+		            "to records of other sections are answered with 'not_found'.",
+		request=None,
+		examples=[
+			OpenApiExample(
+				'Sync request',
+				value={
+					'sync_token': 'token from the previous sync, omitted on the first one',
+					'changes': [{
+						'session': 'uuid', 'student': 'uuid', 'status': True, 'remarks': '',
+						'modified_at': '2025-06-02T08:15:00+05:45'
+					}]
+				}
+			),
+		]
+	)
+	def post(self, request):
+		if not request.user.has_role('teacher'):
+			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+
+		changes = request.data.get('changes', [])
+		if not isinstance(changes, list):
+			return Response({'detail': '"changes" must be a list.'}, status=status.HTTP_400_BAD_REQUEST)
+
+		sections = Section.objects.filter(class_teacher__staff__email=request.user.email).values_list('id', flat=True)
+		try:
+			return Response(
+				sync_attendance(changes, request.data.get('sync_token'), list(sections)),
+				status=status.HTTP_200_OK
+			)
+		except ValidationError as e:
+			return Response({'detail': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@extend_schema(tags=["Attendance"])
+class GateScanIngestView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Buffer a batch of gate card scans. Scans are applied to attendance records by the "
+		            "flush_gate_scans job, once per student per day.",
+		request=None,
+		examples=[
+			OpenApiExample(
+				'Scan batch',
+				value={'device': 'main-gate-1', 'events': [{'card_id': '04A1B2C3', 'scanned_at': '2025-06-02T09:41:07+05:45'}]}
+			),
+		]
+	)
+	def post(self, request):
+		if not (request.user.has_role('admin') or request.user.has_role('staff')):
+			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+
+		events = request.data.get('events')
+		if not isinstance(events, list) or not events:
+			return Response({'detail': 'Please provide a list of events.'}, status=status.HTTP_400_BAD_REQUEST)
+		if len(events) > MAX_SCAN_BATCH:
+			return Response(
+				{'detail': f'A batch may contain at most {MAX_SCAN_BATCH} events.'},
+				status=status.HTTP_400_BAD_REQUEST
+			)
+
+		accepted, rejected = ingest_gate_scans(events, device=str(request.data.get('device') or ''))
+		return Response({'accepted': accepted, 'rejected': rejected}, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(tags=["Attendance"])
+class AttendanceRecordViewSet(StreamingListMixin, ModelViewSet):
 	http_method_names = ['post', 'get']
 	permission_classes = [IsAuthenticated]
 	queryset = AttendanceRecord.objects.none()
@@ -681,15 +1178,21 @@ class AttendanceRecordViewSet(ModelViewSet):
 			selected_section = self.request.query_params.get('selected_section')
 			attendanceSession = AttendanceSession.objects.get(date=selected_date, school_class_id=selected_class,
 			                                                  section_id=selected_section)
-			return AttendanceRecord.objects.filter(session=attendanceSession)
+			return AttendanceRecord.objects.filter(session=attendanceSession).with_present_days()
 		except Exception as e:
 			print(e)
 			return AttendanceRecord.objects.none()
 
 
+class AttendanceSearchPagination(PageNumberPagination):
+	page_size = 50
+	page_size_query_param = 'page_size'
+	max_page_size = 200
+
+
 @extend_schema(tags=["Attendance"])
 class AttendanceRecordSearchView(APIView):
-	permission_classes = [AllowAny]
+	permission_classes = [IsAuthenticated]
 
 	@extend_schema(
 		parameters=[
@@ -699,13 +1202,21 @@ class AttendanceRecordSearchView(APIView):
 				required=True,
 				type=str,
 				description='Search for student name or roll number'
-			)
+			),
+			OpenApiParameter(name='start_date', location=OpenApiParameter.QUERY, required=False, type=str,
+			                 description='YYYY-MM-DD. Defaults to the start of the active academic year.'),
+			OpenApiParameter(name='end_date', location=OpenApiParameter.QUERY, required=False, type=str,
+			                 description='YYYY-MM-DD. Defaults to today.'),
+			OpenApiParameter(name='school_class', location=OpenApiParameter.QUERY, required=False, type=str),
+			OpenApiParameter(name='section', location=OpenApiParameter.QUERY, required=False, type=str),
+			OpenApiParameter(name='page', location=OpenApiParameter.QUERY, required=False, type=int),
+			OpenApiParameter(name='page_size', location=OpenApiParameter.QUERY, required=False, type=int),
 		],
 		responses={
 			200: OpenApiExample(
 				'Success',
 				value={
-					'detail': 'Search results returned successfully.'
+					'count': 1, 'next': None, 'previous': None, 'results': []
 				}
 			),
 			400: OpenApiExample(
@@ -717,20 +1228,60 @@ class AttendanceRecordSearchView(APIView):
 		}
 	)
 	def get(self, request):
-		search_query = request.query_params.get('search')
+		if not (request.user.has_role('admin') or request.user.has_role('teacher')):
+			return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+
+		search_query = (request.query_params.get('search') or '').strip()
+		if not search_query:
+			return Response({'detail': 'Please provide a search value.'}, status=status.HTTP_400_BAD_REQUEST)
+
 		try:
-			student = Enrollment.objects.filter(Q(student__first_name__icontains=search_query) | Q(
-				student__last_name__icontains=search_query)).distinct()
-			record = AttendanceRecord.objects.filter(enrollment__in=student).distinct()
-			serializer = AttendanceRecordGetSerializer(record, many=True)
-			return Response(serializer.data, status=status.HTTP_200_OK)
-		except Exception as e:
-			print(e)
-			return Response(
-				{'detail': 'An error occurred while searching attendance records.'},
-				status=status.HTTP_400_BAD_REQUEST
+			start_date = request.query_params.get('start_date')
+			end_date = request.query_params.get('end_date')
+			start_date = datetime.date.fromisoformat(start_date) if start_date else None
+			end_date = datetime.date.fromisoformat(end_date) if end_date else timezone.localdate()
+		except ValueError:
+			return Response({'detail': 'Dates must be in YYYY-MM-DD format.'}, status=status.HTTP_400_BAD_REQUEST)
+
+		school_class = request.query_params.get('school_class')
+		section = request.query_params.get('section')
+
+		try:
+			# Resolve the matching students first (name terms use the trigram indexes, roll numbers the
+			# enrollment unique index) and only then touch the records table through its student index.
+			if search_query.isdigit():
+				enrollments = Enrollment.objects.filter(academic_year__is_active=True, roll_number=int(search_query))
+				if school_class:
+					enrollments = enrollments.filter(school_class_id=school_class)
+				if section:
+					enrollments = enrollments.filter(section_id=section)
+				students = enrollments.values('student_id')
+			else:
+				students = Student.objects.all()
+				for term in search_query.split():
+					students = students.filter(Q(first_name__icontains=term) | Q(last_name__icontains=term))
+				students = students.values('id')
+
+			records = AttendanceRecord.objects.filter(student_id__in=students, session__date__lte=end_date)
+			if start_date:
+				records = records.filter(session__date__gte=start_date)
+			else:
+				records = records.filter(session__academic_year__is_active=True)
+			if school_class:
+				records = records.filter(session__school_class_id=school_class)
+			if section:
+				records = records.filter(session__section_id=section)
+			records = records.with_present_days().order_by(
+				'-session__date', 'student__first_name', 'student__last_name', 'id'
 			)
 
+			paginator = AttendanceSearchPagination()
+			page = paginator.paginate_queryset(records, request, view=self)
+			serializer = AttendanceRecordGetSerializer(page, many=True)
+			return paginator.get_paginated_response(serializer.data)
+		except (ValidationError, ValueError):
+			return Response({'detail': 'Invalid class or section.'}, status=status.HTTP_400_BAD_REQUEST)
+
 
 @extend_schema(tags=["Attendance"])
 class TeacherStudentAttendanceView(APIView):
@@ -746,12 +1297,12 @@ class TeacherStudentAttendanceView(APIView):
 				teacher_class = SchoolClass.objects.filter(section__class_teacher=teacher).distinct()
 				attendanceSession = AttendanceSession.objects.filter(date=selected_date,
 				                                                     school_class__in=teacher_class).distinct()
-				attendance_records = AttendanceRecord.objects.filter(session__in=attendanceSession).distinct()
+				attendance_records = AttendanceRecord.objects.filter(session__in=attendanceSession).with_present_days()
 				serializer = AttendanceRecordGetSerializer(attendance_records, many=True)
 				return Response(serializer.data, status=status.HTTP_200_OK)
 			elif user.has_role("student"):
-				student = Student.objects.get(email=request.user.email)
-				enrollment = Enrollment.objects.filter(student=student).first()
+				student = Student.objects.select_related('current_enrollment').get(email=request.user.email)
+				enrollment = student.current_enrollment
 				if not enrollment:
 					return Response(
 						{'detail': 'No enrollment found for this student.'},
@@ -760,11 +1311,11 @@ class TeacherStudentAttendanceView(APIView):
 				selected_date = self.request.query_params.get('selected_date')
 				attendanceSession = AttendanceSession.objects.filter(
 					date=selected_date,
-					school_class=enrollment.school_class,
-					section=enrollment.section
+					school_class_id=enrollment.school_class_id,
+					section_id=enrollment.section_id
 				).distinct()
 				attendance_records = AttendanceRecord.objects.filter(session__in=attendanceSession,
-				                                                     student__email=student.email).distinct()
+				                                                     student__email=student.email).with_present_days()
 				serializer = AttendanceRecordGetSerializer(attendance_records, many=True)
 				return Response(serializer.data, status=status.HTTP_200_OK)
 		except Exception as e:
@@ -775,6 +1326,77 @@ class TeacherStudentAttendanceView(APIView):
 			)
 
 
+@extend_schema(tags=["Attendance"])
+class AttendanceCalendarView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		parameters=[
+			OpenApiParameter(name='student', type=uuid.UUID, required=False,
+			                 description='Student to show. Students always see their own calendar.'),
+			OpenApiParameter(name='academic_year', type=uuid.UUID, required=False,
+			                 description='Defaults to the active academic year.'),
+			OpenApiParameter(name='year', type=int, required=False),
+			OpenApiParameter(name='month', type=int, required=False,
+			                 description='With year, limits the calendar to one month.'),
+		]
+	)
+	def get(self, request):
+		user = request.user
+		student_id = request.query_params.get('student')
+		try:
+			if user.has_role('student'):
+				student = Student.objects.get(email=user.email)
+			elif user.has_role('parent'):
+				parent = Parent.objects.get(email=user.email)
+				children = Student.objects.filter(Q(father=parent) | Q(mother=parent) | Q(guardian=parent))
+				student = children.get(id=student_id) if student_id else children.first()
+			elif user.has_role('teacher') or user.has_role('admin'):
+				student = Student.objects.get(id=student_id)
+			else:
+				return Response({'detail': 'You do not have permission.'}, status=status.HTTP_403_FORBIDDEN)
+
+			if student is None:
+				return Response({'detail': 'Student not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+			academic_year_id = request.query_params.get('academic_year')
+			if academic_year_id:
+				academic_year = AcademicYear.objects.get(id=academic_year_id)
+			else:
+				academic_year = AcademicYear.objects.get(is_active=True)
+
+			start_offset, end_offset = 0, None
+			if request.query_params.get('year') and request.query_params.get('month'):
+				year = int(request.query_params.get('year'))
+				month = int(request.query_params.get('month'))
+				first_day = datetime.date(year, month, 1)
+				last_day = datetime.date(year, month, calendar.monthrange(year, month)[1])
+				start_offset = max((first_day - academic_year.start_date).days, 0)
+				end_offset = (last_day - academic_year.start_date).days
+		except (ObjectDoesNotExist, ValueError, ValidationError) as e:
+			print(e)
+			return Response({'detail': 'Attendance calendar not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+		bitmap = AttendanceBitmap.objects.filter(student=student, academic_year=academic_year).first()
+		days = []
+		if bitmap is not None and (end_offset is None or end_offset >= 0):
+			for offset, present, remarks in bitmap.days(start_offset, end_offset):
+				days.append({
+					'date': academic_year.start_date + datetime.timedelta(days=offset),
+					'status': present,
+					'remarks': remarks,
+				})
+
+		return Response({
+			'student': student.id,
+			'academic_year': str(academic_year),
+			'present': sum(1 for day in days if day['status']),
+			'absent': sum(1 for day in days if not day['status']),
+			'streak': bitmap.current_streak() if bitmap else 0,
+			'days': days,
+		}, status=status.HTTP_200_OK)
+
+
 class TeacherAttendanceSessionCreateAPIView(APIView):
 	pass
 
@@ -791,8 +1413,8 @@ class TeacherStudentList(APIView):
 		try:
 			staff = Staff.objects.get(email=request.user)
 			teacher = Teacher.objects.get(staff=staff)
-			queryset = queryset = Student.objects.filter(
-				enrollments__school_class__teachers=teacher).distinct().prefetch_related('enrollments')
+			queryset = Student.objects.filter(
+				enrollments__school_class__teachers=teacher).distinct().with_current_enrollment()
 			serializer = ListStudentSerializer(queryset, many=True, context={'request': request})
 			return Response(serializer.data, status=status.HTTP_200_OK)
 		except Exception as e:
@@ -807,6 +1429,8 @@ class AssignmentViewSet(ModelViewSet):
 	http_method_names = ['get', 'post', 'delete', 'put']
 	permission_classes = [AllowAny]
 	queryset = Assignment.objects.all()
+	pagination_class = KeysetPagination
+	page_size = 25
 
 	def get_serializer_class(self):
 		if self.action == 'create':
@@ -824,11 +1448,12 @@ class AssignmentViewSet(ModelViewSet):
 			teacher = Teacher.objects.get(staff__email=self.request.user.email)
 			return Assignment.objects.filter(teacher=teacher).order_by('created_at')
 		elif self.request.user.has_role('student'):
-			student = Student.objects.get(email=self.request.user.email)
-			enrollment = Enrollment.objects.filter(student=student).first()
+			enrollment = Student.objects.select_related('current_enrollment').get(
+				email=self.request.user.email
+			).current_enrollment
 			if enrollment:
-				return Assignment.objects.filter(school_class=enrollment.school_class,
-				                                 section=enrollment.section).order_by('created_at')
+				return Assignment.objects.filter(school_class_id=enrollment.school_class_id,
+				                                 section_id=enrollment.section_id).order_by('created_at')
 			return Assignment.objects.none()
 
 	def create(self, request, *args, **kwargs):
@@ -985,6 +1610,9 @@ class ExamViewSet(ModelViewSet):
 	permission_classes = [AllowAny]
 	queryset = Exam.objects.all().order_by('created_at')
 	serializer_class = ExamSerializer
+	pagination_class = KeysetPagination
+	page_size = 25
+	ordering = 'created_at'
 	lookup_field = 'id'
 
 	def get_serializer_class(self):
@@ -996,9 +1624,12 @@ class ExamViewSet(ModelViewSet):
 		if self.request.user.has_role('admin'):
 			return Exam.objects.all()
 		elif self.request.user.has_role('student'):
-			student = Student.objects.get(email=self.request.user.email)
-			return Exam.objects.filter(
-				school_class__in=student.enrollments.values_list('school_class', flat=True)).distinct()
+			enrollment = Student.objects.select_related('current_enrollment').get(
+				email=self.request.user.email
+			).current_enrollment
+			if enrollment:
+				return Exam.objects.filter(school_class_id=enrollment.school_class_id)
+			return Exam.objects.none()
 		elif self.request.user.has_role('teacher'):
 			staff = Staff.objects.get(email=self.request.user.email)
 			teacher = Teacher.objects.get(staff=staff)
@@ -1007,9 +1638,9 @@ class ExamViewSet(ModelViewSet):
 			parent = Parent.objects.get(email=self.request.user.email)
 			student = Student.objects.filter(
 				Q(father=parent) | Q(mother=parent) | Q(guardian=parent)
-			).distinct().prefetch_related('enrollments')
+			).distinct()
 			return Exam.objects.filter(
-				school_class__in=student.values_list('enrollments__school_class', flat=True)).distinct()
+				school_class__in=student.values_list('current_enrollment__school_class', flat=True)).distinct()
 
 
 @extend_schema(tags=['Exam'])
@@ -1026,6 +1657,8 @@ class AnnouncementViewSet(ModelViewSet):
 	http_method_names = ['get', 'post', 'delete', 'put']
 	queryset = Announcement.objects.all()
 	serializer_class = AnnouncementSerializer
+	pagination_class = KeysetPagination
+	page_size = 20
 
 	def get_serializer_class(self):
 		if self.action == 'create' or self.action == 'update':
@@ -1038,62 +1671,124 @@ class AdminDashboard(APIView):
 
 	def get(self, request):
 		try:
-			total_student_active = Student.objects.filter(account_status="A").count()
-			total_student_inactive = Student.objects.filter(account_status="I").count()
-			total_teacher_active = Teacher.objects.filter(staff__account_status="A").count()
-			total_teacher_inactive = Teacher.objects.filter(staff__account_status="I").count()
-			total_parent_active = Parent.objects.count()
-			total_parent_inactive = 0  # You may update this if needed
-
-			total_staff_active = ManagementStaff.objects.filter(staff__account_status="A").count()
-			total_staff_inactive = ManagementStaff.objects.filter(staff__account_status="I").count()
-			total_student = Student.objects.count()
-			total_boys = Student.objects.filter(gender='M').count()
-			total_girls = Student.objects.filter(gender='F').count()
-
-			classes = SchoolClass.objects.all()
-			average_weekly_attendance = {}
-
-			for school_class in classes:
-				attendance_records = AttendanceRecord.objects.filter(
-					session__school_class=school_class
-				)
-				total_attendance = attendance_records.count()
+			return Response(get_dashboard_snapshot(), status=status.HTTP_200_OK)
+
+		except Exception as e:
+			print(e)
+			return Response(
+				{'detail': 'An error occurred while retrieving dashboard data.'},
+				status=status.HTTP_400_BAD_REQUEST
+			)
 
-				total_sessions = AttendanceSession.objects.filter(school_class=school_class).count()
-				total_students = school_class.enrollments.count()
 
-				expected_attendance = total_sessions * total_students
-				if expected_attendance > 0:
-					attendance_percentage = (total_attendance / expected_attendance) * 100
-				else:
-					attendance_percentage = 0
-
-				average_weekly_attendance[school_class.name] = round(attendance_percentage, 2)
-
-			return Response({
-				'total_student_active': total_student_active,
-				'total_student_inactive': total_student_inactive,
-				'total_teacher_active': total_teacher_active,
-				'total_teacher_inactive': total_teacher_inactive,
-				'total_parent_active': total_parent_active,
-				'total_parent_inactive': total_parent_inactive,
-				'total_staff_active': total_staff_active,
-				'total_staff_inactive': total_staff_inactive,
-				'total_student': total_student,
-				'total_boys': total_boys,
-				'total_girls': total_girls,
-				'average_weekly_attendance': average_weekly_attendance
-			}, status=status.HTTP_200_OK)
+@extend_schema(tags=['Attendance'])
+class AttendanceAnalyticsView(APIView):
+	permission_classes = [IsAuthenticated]
 
+	@extend_schema(
+		description="Attendance rollups for a date range: daily rates with a moving average, weekly and monthly "
+		            "rates per class and section, and chronic absentees.",
+		parameters=[
+			OpenApiParameter(name='start', type=datetime.date, required=False,
+			                 description='Defaults to the start of the active academic year.'),
+			OpenApiParameter(name='end', type=datetime.date, required=False, description='Defaults to today.'),
+			OpenApiParameter(name='school_class', type=uuid.UUID, required=False),
+			OpenApiParameter(name='section', type=uuid.UUID, required=False),
+			OpenApiParameter(name='threshold', type=float, required=False,
+			                 description='Present rate (percent) below which a student is a chronic absentee.'),
+			OpenApiParameter(name='window', type=int, required=False,
+			                 description='Moving average window in school days.'),
+		]
+	)
+	def get(self, request):
+		if not request.user.has_role('admin'):
+			return Response(
+				{'detail': 'You do not have permission to view attendance analytics.'},
+				status=status.HTTP_403_FORBIDDEN
+			)
+
+		try:
+			params = request.query_params
+			end = datetime.date.fromisoformat(params['end']) if params.get('end') else timezone.localdate()
+			if params.get('start'):
+				start = datetime.date.fromisoformat(params['start'])
+			else:
+				academic_year = AcademicYear.objects.filter(is_active=True).first()
+				start = academic_year.start_date if academic_year else end - datetime.timedelta(days=365)
+
+			data = attendance_analytics(
+				start,
+				end,
+				school_class=params.get('school_class'),
+				section=params.get('section'),
+				threshold=float(params.get('threshold', 90)),
+				window=int(params.get('window', 7)),
+			)
+			return Response(data, status=status.HTTP_200_OK)
 		except Exception as e:
 			print(e)
 			return Response(
-				{'detail': 'An error occurred while retrieving dashboard data.'},
+				{'detail': 'An error occurred while computing attendance analytics.'},
 				status=status.HTTP_400_BAD_REQUEST
 			)
 
 
+@extend_schema(tags=['Attendance'])
+class AttendanceExportView(APIView):
+	permission_classes = [IsAuthenticated]
+
+	@extend_schema(
+		description="Stream every attendance record matching the filters as CSV or Parquet.",
+		parameters=[
+			OpenApiParameter(name='file_format', type=str, required=False, enum=['csv', 'parquet'],
+			                 description='Defaults to csv.'),
+			OpenApiParameter(name='academic_year', type=uuid.UUID, required=False),
+			OpenApiParameter(name='school_class', type=uuid.UUID, required=False),
+			OpenApiParameter(name='section', type=uuid.UUID, required=False),
+			OpenApiParameter(name='start', type=datetime.date, required=False),
+			OpenApiParameter(name='end', type=datetime.date, required=False),
+		]
+	)
+	def get(self, request):
+		if not request.user.has_role('admin'):
+			return Response(
+				{'detail': 'You do not have permission to export attendance.'},
+				status=status.HTTP_403_FORBIDDEN
+			)
+
+		params = request.query_params
+		file_format = params.get('file_format', 'csv')
+		if file_format not in ('csv', 'parquet'):
+			return Response({'detail': 'Unsupported export format.'}, status=status.HTTP_400_BAD_REQUEST)
+		if file_format == 'parquet' and not parquet_available():
+			return Response(
+				{'detail': 'Parquet export requires pyarrow to be installed.'},
+				status=status.HTTP_400_BAD_REQUEST
+			)
+
+		# Validated here: the queryset is lazy, so a bad value would only fail once streaming had started.
+		export_filters = {}
+		for name in ('academic_year', 'school_class', 'section'):
+			try:
+				export_filters[name] = uuid.UUID(params[name]) if params.get(name) else None
+			except ValueError:
+				return Response({'detail': f'{name} must be a valid id.'}, status=status.HTTP_400_BAD_REQUEST)
+		for name in ('start', 'end'):
+			try:
+				export_filters[name] = datetime.date.fromisoformat(params[name]) if params.get(name) else None
+			except ValueError:
+				return Response({'detail': f'{name} must be a date in YYYY-MM-DD format.'},
+				                status=status.HTTP_400_BAD_REQUEST)
+
+		rows = attendance_export_rows(**export_filters)
+		if file_format == 'parquet':
+			response = streaming_response(request, stream_parquet(rows), content_type='application/vnd.apache.parquet')
+		else:
+			response = streaming_response(request, stream_csv(rows), content_type='text/csv')
+		response['Content-Disposition'] = f'attachment; filename="attendance.{file_format}"'
+		return response
+
+
 @extend_schema(tags=['Attendance'])
 class ParentChildAttendance(APIView):
 	permission_classes = [IsAuthenticated]
@@ -1108,8 +1803,8 @@ class ParentChildAttendance(APIView):
 				{'detail': 'Parent not found.'},
 				status=status.HTTP_404_NOT_FOUND
 			)
-		child = Student.objects.filter(guardian=parent).first()
-		if not child:
+		child = Student.objects.filter(guardian=parent).select_related('current_enrollment').first()
+		if not child or not child.current_enrollment:
 			print("No child found for this parent.")
 			return Response(
 				{'detail': 'No child found for this parent.'},
@@ -1121,11 +1816,11 @@ class ParentChildAttendance(APIView):
 			selected_date = self.request.query_params.get('selected_date')
 			attendanceSession = AttendanceSession.objects.filter(
 				date=selected_date,
-				school_class__in=child.enrollments.values_list('school_class', flat=True),
-				section__in=child.enrollments.values_list('section', flat=True)
+				school_class_id=child.current_enrollment.school_class_id,
+				section_id=child.current_enrollment.section_id
 			).distinct()
 			attendance_records = AttendanceRecord.objects.filter(session__in=attendanceSession,
-			                                                     student__email=child.email).distinct()
+			                                                     student__email=child.email).with_present_days()
 			serializer = AttendanceRecordGetSerializer(attendance_records, many=True)
 			return Response(serializer.data, status=status.HTTP_200_OK)
 		except Exception as e:
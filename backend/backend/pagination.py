@@ -0,0 +1,126 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+	"""
+	Cursor pagination keyed on ``(created_at, id)``.
+
+	Each page is fetched with ``WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC
+	LIMIT n`` on the composite index, so page 1000 costs the same as page 1 and rows inserted while
+	a client pages through are neither skipped nor repeated. ``id`` breaks ties between rows created
+	in the same instant.
+
+	Views pick their own page size by setting ``page_size`` (and ``max_page_size``) and their own
+	direction by setting ``ordering``; clients may ask for fewer or more rows with ``?page_size=``.
+	"""
+	page_size = 50
+	max_page_size = 200
+	page_size_query_param = 'page_size'
+	cursor_query_param = 'cursor'
+	# '-created_at' pages newest first, 'created_at' oldest first.
+	ordering = '-created_at'
+
+	invalid_cursor_message = 'Invalid cursor.'
+
+	def get_page_size(self, request, view):
+		page_size = getattr(view, 'page_size', self.page_size)
+		max_page_size = getattr(view, 'max_page_size', self.max_page_size)
+		requested = request.query_params.get(self.page_size_query_param, '')
+		if requested.isdigit() and int(requested) > 0:
+			page_size = int(requested)
+		return min(page_size, max_page_size)
+
+	def encode_cursor(self, row, reverse):
+		position = {'c': row.created_at.isoformat(), 'i': str(row.pk), 'r': int(reverse)}
+		token = base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode()
+		return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+	def decode_cursor(self, request):
+		token = request.query_params.get(self.cursor_query_param)
+		if not token:
+			return None
+		try:
+			position = json.loads(base64.urlsafe_b64decode(token.encode()))
+			created_at = parse_datetime(position['c'])
+			if created_at is None:
+				raise ValueError
+			return created_at, position['i'], bool(position['r'])
+		except (binascii.Error, ValueError, KeyError, TypeError):
+			raise NotFound(self.invalid_cursor_message)
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.request = request
+		page_size = self.get_page_size(request, view)
+		cursor = self.decode_cursor(request)
+		ordering = getattr(view, 'ordering', self.ordering)
+		descending = ordering.startswith('-')
+		created_at, pk, reverse = cursor if cursor else (None, None, False)
+
+		# Walking backwards ("previous") reads the index in the opposite direction, then flips the page.
+		forwards = descending != reverse
+		prefix = '-' if forwards else ''
+		queryset = queryset.order_by(f'{prefix}created_at', f'{prefix}id')
+		if cursor:
+			lookup = 'lt' if forwards else 'gt'
+			queryset = queryset.filter(
+				Q(**{f'created_at__{lookup}': created_at}) | Q(created_at=created_at, **{f'id__{lookup}': pk})
+			)
+
+		rows = list(queryset[:page_size + 1])
+		has_more = len(rows) > page_size
+		rows = rows[:page_size]
+		if reverse:
+			rows.reverse()
+
+		self.next_link = self.previous_link = None
+		if rows:
+			if has_more or reverse:
+				self.next_link = self.encode_cursor(rows[-1], reverse=False)
+			if cursor and (has_more or not reverse):
+				self.previous_link = self.encode_cursor(rows[0], reverse=True)
+		return rows
+
+	def get_paginated_response(self, data):
+		return Response({
+			'next': self.next_link,
+			'previous': self.previous_link,
+			'results': data,
+		})
+
+	def get_paginated_response_schema(self, schema):
+		return {
+			'type': 'object',
+			'required': ['results'],
+			'properties': {
+				'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+				'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+				'results': schema,
+			},
+		}
+
+	def get_schema_operation_parameters(self, view):
+		return [
+			{
+				'name': self.cursor_query_param,
+				'required': False,
+				'in': 'query',
+				'description': 'Opaque position returned in "next" or "previous".',
+				'schema': {'type': 'string'},
+			},
+			{
+				'name': self.page_size_query_param,
+				'required': False,
+				'in': 'query',
+				'description': f'Number of results per page (at most {self.max_page_size}).',
+				'schema': {'type': 'integer'},
+			},
+		]
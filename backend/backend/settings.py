@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     "rest_framework_simplejwt",
@@ -107,6 +108,20 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Shared by every process (web workers, management commands, cron jobs, the timetable worker) so
+# an invalidation made in one of them is seen by all. The table is created by a migration.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        # Room for a cached calendar feed per user on top of the shared snapshots.
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -1,5 +1,7 @@
 from chat.models import ChatRoom, Message
+from user.images import image_url
 from user.models import CustomUser
+from user.serializer import ProfilePictureField
 from rest_framework import serializers
 
 
@@ -7,7 +9,7 @@ class SearchSerializer(serializers.Serializer):
 	id = serializers.UUIDField()
 	email = serializers.EmailField()
 	full_name = serializers.CharField()
-	profile_picture = serializers.ImageField(allow_null=True, required=False)
+	profile_picture = ProfilePictureField(size=64, allow_null=True, required=False)
 	role = serializers.CharField()
 
 
@@ -36,7 +38,10 @@ class GetUserSerializer(serializers.Serializer):
 
 	def get_profile_picture(self, obj):
 		request = self.context.get('request')
-		return request.build_absolute_uri(obj.get_profile_pic()) if obj.get_profile_pic() else None
+		picture = obj.get_profile_pic()
+		if not picture:
+			return None
+		return request.build_absolute_uri(picture if isinstance(picture, str) else image_url(picture, 64))
 
 	def get_roles(self, obj):
 		return obj.get_roles_display()
@@ -36,3 +36,57 @@
 # 					amount=each.school_class.fee,
 # 					status=False
 # 				)
+
+
+from django.db import transaction
+from django.utils import timezone
+
+from academic.dashboard import invalidate_dashboard_snapshot
+from academic.models import AcademicYear, AttendanceSession, Section
+
+WEEKLY_HOLIDAYS = ('Saturday',)
+
+
+def precreate_attendance_sessions(date=None, include_holidays=False, section_ids=None):
+	"""
+	Create the day's attendance session, with every enrolled student marked absent, for each
+	section that has a class teacher, or only for ``section_ids`` when given. Sections that
+	already have a session are left alone.
+
+	Meant to run once at the start of each school day, e.g. from the system crontab:
+	``0 5 * * * python manage.py precreate_attendance_sessions``.
+	Returns the created sessions.
+	"""
+	date = date or timezone.localdate()
+	if not include_holidays and date.strftime('%A') in WEEKLY_HOLIDAYS:
+		return []
+
+	academic_year = AcademicYear.objects.filter(is_active=True).first()
+	if academic_year is None:
+		return []
+
+	with transaction.atomic():
+		existing = AttendanceSession.objects.filter(academic_year=academic_year, date=date).values('section_id')
+		sections = Section.objects.filter(class_teacher__isnull=False).exclude(id__in=existing)
+		if section_ids is not None:
+			sections = sections.filter(id__in=section_ids)
+		sections = sections.values_list('id', 'school_class_id', 'class_teacher_id')
+		sessions = [
+			AttendanceSession(
+				academic_year=academic_year,
+				school_class_id=school_class_id,
+				section_id=section_id,
+				date=date,
+				marked_by_id=class_teacher_id
+			) for section_id, school_class_id, class_teacher_id in sections
+		]
+		# Sessions a teacher opened concurrently are skipped instead of failing the whole run.
+		AttendanceSession.objects.bulk_create(sessions, ignore_conflicts=True)
+		created = set(AttendanceSession.objects.filter(id__in=[session.id for session in sessions]).values_list(
+			'id', flat=True
+		))
+		sessions = [session for session in sessions if session.id in created]
+		if sessions:
+			AttendanceSession.create_default_records_for(sessions)
+			invalidate_dashboard_snapshot()
+	return sessions
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 
 from user.models import Parent, Student
+from user.serializer import ProfilePictureField
 
 
 class ParentStudentListSerializer(serializers.ModelSerializer):
 	full_name = serializers.CharField(source='get_fullname')
+	profile_picture = ProfilePictureField(size=64)
 
 	class Meta:
 		model = Student
@@ -17,6 +19,7 @@ class ParentStudentListSerializer(serializers.ModelSerializer):
 
 class ParentListSerializer(serializers.ModelSerializer):
 	guardian_of = ParentStudentListSerializer(many=True)
+	profile_picture = ProfilePictureField(size=64)
 
 	class Meta:
 		model = Parent
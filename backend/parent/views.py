@@ -3,6 +3,7 @@ from drf_spectacular.utils import extend_schema
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.viewsets import ModelViewSet
+from backend.pagination import KeysetPagination
 from user.models import Parent, Staff, Teacher
 from .serializers import ParentListSerializer, ParentDetailSerializer
 from rest_framework.views import APIView
@@ -13,6 +14,7 @@ class ParentViewSet(ModelViewSet):
 	http_method_names = ['get']
 	queryset = Parent.objects.filter(relationship='G')
 	serializer_class = ParentListSerializer
+	pagination_class = KeysetPagination
 
 	def get_queryset(self):
 		if self.request.user.has_role('admin'):
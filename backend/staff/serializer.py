@@ -1,6 +1,7 @@
 from academic.models import Subject
 from academic.serializer import SimpleSubjectSerializer
 from user.models import Staff
+from user.serializer import ProfilePictureField
 from rest_framework import serializers
 
 
@@ -37,6 +38,7 @@ class StaffSerializer(serializers.ModelSerializer):
 
 class ListStaffSerializer(serializers.ModelSerializer):
 	position_detail = serializers.SerializerMethodField()
+	profile_picture = ProfilePictureField(size=64)
 
 	class Meta:
 		model = Staff
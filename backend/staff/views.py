@@ -4,15 +4,18 @@ from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 
+from backend.pagination import KeysetPagination
+from backend.streaming import StreamingListMixin
 from staff.serializer import ListStaffSerializer, StaffSerializer
 from user.models import Staff
 
 
 @extend_schema(tags=['Staff'])
-class StaffViewSet(viewsets.ModelViewSet):
+class StaffViewSet(StreamingListMixin, viewsets.ModelViewSet):
 	http_method_names = ['get']
 	permission_classes = [AllowAny]
 	queryset = Staff.objects.all()
+	pagination_class = KeysetPagination
 
 	def get_serializer_class(self):
 		if self.action == 'list':
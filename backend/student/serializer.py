@@ -1,12 +1,15 @@
 from user.models import Student
+from user.serializer import ProfilePictureField
 from rest_framework import serializers
 
 
 class ListStudentSerializer(serializers.ModelSerializer):
+	"""Reads the ``with_current_enrollment()`` annotations; falls back to a query per row without them."""
 	gender = serializers.CharField(source='get_gender_display')
 	roll_number = serializers.SerializerMethodField()
-	school_class = serializers.CharField(source='get_enrollment.school_class.name')
-	section = serializers.CharField(source='get_enrollment.section.name')
+	school_class = serializers.SerializerMethodField()
+	section = serializers.SerializerMethodField()
+	profile_picture = ProfilePictureField(size=64)
 
 	class Meta:
 		model = Student
@@ -24,10 +27,35 @@ class ListStudentSerializer(serializers.ModelSerializer):
 			'created_at',
 		]
 
+	def _current_enrollment(self, obj):
+		if hasattr(obj, 'current_school_class'):
+			return {
+				'school_class': obj.current_school_class,
+				'section': obj.current_section,
+				'roll_number': obj.current_roll_number,
+				'year_start': obj.current_academic_year_start,
+			}
+		if not hasattr(obj, '_current_enrollment'):
+			enrollment = obj.get_enrollment()
+			obj._current_enrollment = enrollment and {
+				'school_class': enrollment.school_class.name,
+				'section': enrollment.section.name,
+				'roll_number': enrollment.roll_number,
+				'year_start': enrollment.academic_year.start_date,
+			}
+		return obj._current_enrollment
+
 	def get_roll_number(self, obj):
-		enrollment = obj.get_enrollment()
-		if enrollment:
-			year = enrollment.academic_year
-			short_year = str(year)[-2:]
-			return f"Y{short_year}-{enrollment.roll_number}"
-		return None
\ No newline at end of file
+		enrollment = self._current_enrollment(obj)
+		if enrollment and enrollment['year_start']:
+			short_year = str(enrollment['year_start'].year + 1)[-2:]
+			return f"Y{short_year}-{enrollment['roll_number']}"
+		return None
+
+	def get_school_class(self, obj):
+		enrollment = self._current_enrollment(obj)
+		return enrollment['school_class'] if enrollment else None
+
+	def get_section(self, obj):
+		enrollment = self._current_enrollment(obj)
+		return enrollment['section'] if enrollment else None
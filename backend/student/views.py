@@ -7,15 +7,18 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from backend.pagination import KeysetPagination
+from backend.streaming import StreamingListMixin
 from student.serializer import ListStudentSerializer
 from user.models import Student, CustomUser
 from user.serializer import StudentSerializer, StudentDetailSerializer
 
 
 @extend_schema(tags=['Student'])
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(StreamingListMixin, viewsets.ModelViewSet):
 	http_method_names = ['get']
-	queryset = Student.objects.all().prefetch_related('enrollments')
+	queryset = Student.objects.with_current_enrollment()
+	pagination_class = KeysetPagination
 
 	def get_serializer_class(self):
 		if self.action == 'list':
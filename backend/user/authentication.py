@@ -1,6 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import BaseBackend
 from .models import Student, Staff, CustomUser, Parent
+from .passwords import acheck_password
+
+# Roles the login form offers; each is checked against its own account table.
+LOGIN_ROLES = ('admin', 'student', 'staff', 'parent')
 
 
 class CustomAuthenticationBackend(BaseBackend):
@@ -22,6 +26,25 @@ class CustomAuthenticationBackend(BaseBackend):
 		print("Uesr: ", user)
 		return user
 
+	async def aauthenticate(self, request, email=None, password=None, role=None):
+		user_model = {
+			'admin': get_user_model(),
+			'student': Student,
+			'staff': Staff,
+			'parent': Parent,
+		}.get(role or 'admin')
+		if user_model is None:
+			return None
+
+		try:
+			user = await user_model.objects.aget(email=email)
+		except user_model.DoesNotExist:
+			return None
+		# Password hashing runs in a worker thread, off the event loop.
+		if await acheck_password(user, password):
+			return user
+		return None
+
 	def get_user_by_email(self, user_model, email, password):
 		try:
 			user = user_model.objects.get(email=email)
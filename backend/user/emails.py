@@ -0,0 +1,63 @@
+import re
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+EMAIL_DOMAIN = 'icp.edu.np'
+EMAIL_TAG = 'y22'
+STEMS_PER_QUERY = 500
+
+
+def email_stem(first_name, last_name):
+	return f"{slugify(first_name)}.{slugify(last_name)}.{EMAIL_TAG}"
+
+
+def _format(stem, counter):
+	return f"{stem}{counter or ''}@{EMAIL_DOMAIN}"
+
+
+def _taken_counters(stems):
+	"""Map each stem to the suffix counters already used by a student, staff member or user account."""
+	from user.models import CustomUser, Staff, Student
+
+	taken = {stem: set() for stem in stems}
+	stems = list(taken)
+	for start in range(0, len(stems), STEMS_PER_QUERY):
+		chunk = stems[start:start + STEMS_PER_QUERY]
+		prefix = Q()
+		for stem in chunk:
+			prefix |= Q(email__startswith=stem)
+		# One statement over the three email indexes.
+		emails = Student.objects.filter(prefix).values_list('email', flat=True).union(
+			Staff.objects.filter(prefix).values_list('email', flat=True),
+			CustomUser.objects.filter(prefix).values_list('email', flat=True),
+		)
+		pattern = re.compile(
+			rf"^({'|'.join(re.escape(stem) for stem in chunk)})(\d*)@{re.escape(EMAIL_DOMAIN)}$"
+		)
+		for email in emails:
+			match = pattern.match(email or '')
+			if match:
+				taken[match.group(1)].add(int(match.group(2) or 0))
+	return taken
+
+
+def allocate_emails(names):
+	"""
+	Return an unused institutional email for each ``(first_name, last_name)`` in ``names``,
+	checking Student, Staff and CustomUser together. Names within the batch never share an address.
+	"""
+	stems = [email_stem(first_name, last_name) for first_name, last_name in names]
+	taken = _taken_counters(stems)
+	emails = []
+	for stem in stems:
+		counter = 0
+		while counter in taken[stem]:
+			counter += 1
+		taken[stem].add(counter)
+		emails.append(_format(stem, counter))
+	return emails
+
+
+def allocate_email(first_name, last_name):
+	return allocate_emails([(first_name, last_name)])[0]
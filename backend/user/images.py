@@ -0,0 +1,101 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, features
+
+from user.models import Parent, Staff, Student
+
+IMAGE_SIZES = (64, 256, 1024)
+IMAGE_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+IMAGE_QUALITY = 80
+VARIANT_DIR = 'variants'
+# Pillow releases the GIL while decoding, resizing and encoding, so threads are enough to keep
+# uploads off the request path without forking the server.
+IMAGE_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix='image-variants')
+
+
+def variant_name(name, size):
+	"""Storage name of the ``size`` px variant of the image stored as ``name``."""
+	directory, filename = os.path.split(name)
+	stem = os.path.splitext(filename)[0]
+	return os.path.join(directory, VARIANT_DIR, f'{stem}_{size}.{IMAGE_FORMAT.lower()}')
+
+
+def render_variants(name, storage=default_storage):
+	"""
+	Downsize the stored image ``name`` to every size in ``IMAGE_SIZES`` (longest side, never
+	upscaled) and save the re-encoded copies next to it. Returns ``{size: variant name}``.
+	"""
+	with storage.open(name, 'rb') as file:
+		image = Image.open(file)
+		image.draft('RGB', (max(IMAGE_SIZES), max(IMAGE_SIZES)))
+		# Phone cameras store the rotation in EXIF; bake it in before the tag is dropped.
+		image = ImageOps.exif_transpose(image).convert('RGB')
+
+	variants = {}
+	for size in sorted(IMAGE_SIZES, reverse=True):
+		image.thumbnail((size, size), Image.LANCZOS)
+		buffer = io.BytesIO()
+		image.save(buffer, IMAGE_FORMAT, quality=IMAGE_QUALITY, method=4 if IMAGE_FORMAT == 'WEBP' else 0)
+		target = variant_name(name, size)
+		if storage.exists(target):
+			storage.delete(target)
+		variants[size] = storage.save(target, ContentFile(buffer.getvalue()))
+	return variants
+
+
+def mark_rendered(name):
+	"""
+	Record on every profile still showing ``name`` that its variants exist, so ``image_url`` can
+	build their URLs without asking the storage.
+	"""
+	for model in (Student, Staff, Parent):
+		model.objects.filter(profile_picture=name).update(profile_picture_rendered=name)
+
+
+def _render_quietly(name):
+	# Runs on a pool thread, outside any request, so drop stale connections around the job ourselves.
+	close_old_connections()
+	try:
+		render_variants(name)
+		mark_rendered(name)
+	except Exception as e:
+		# Nothing reads the future, so anything not caught here would vanish without a trace.
+		print(f'Could not render image variants for {name}: {e!r}')
+	finally:
+		close_old_connections()
+
+
+def schedule_variants(name):
+	"""Render the variants of ``name`` in the worker pool once the current transaction commits."""
+	transaction.on_commit(lambda: _executor.submit(_render_quietly, name))
+
+
+def has_variants(name, storage=default_storage):
+	return storage.exists(variant_name(name, min(IMAGE_SIZES)))
+
+
+def is_rendered(file):
+	"""Whether the variants of ``file`` exist, going by the ``<field>_rendered`` name kept next to it."""
+	return getattr(file.instance, f'{file.field.name}_rendered', None) == file.name
+
+
+def image_url(file, size=None):
+	"""
+	URL of the smallest variant of ``file`` at least ``size`` px wide, falling back to the original
+	while variants are still being rendered (or for images larger than every variant). Nothing is
+	looked up in the storage, so listing many profiles costs no extra I/O.
+	"""
+	if not file:
+		return None
+	if size and is_rendered(file):
+		for variant_size in sorted(IMAGE_SIZES):
+			if variant_size >= size:
+				return file.storage.url(variant_name(file.name, variant_size))
+	return file.url
@@ -0,0 +1,41 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from user.models import Parent, Staff, Student
+from user.passwords import provision_credentials
+
+MODELS = {'student': Student, 'staff': Staff, 'parent': Parent}
+
+
+class Command(BaseCommand):
+	help = 'Hash plaintext or empty account passwords in bulk, using every CPU core.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--model', choices=[*MODELS, 'all'], default='all')
+		parser.add_argument('--workers', type=int, help='Hashing processes. Defaults to the number of CPU cores.')
+		parser.add_argument('--credentials', help='CSV file to write generated logins to. Accounts without a '
+		                                           'password are only given one when this is set.')
+
+	def handle(self, *args, **options):
+		models = MODELS.values() if options['model'] == 'all' else [MODELS[options['model']]]
+		credentials = []
+		for model in models:
+			report = provision_credentials(
+				model,
+				workers=options['workers'],
+				generate_missing=bool(options['credentials']),
+				progress=lambda done, total: self.stdout.write(f'{model.__name__}: {done}/{total}')
+			)
+			credentials += report['credentials']
+			self.stdout.write(self.style.SUCCESS(
+				f"{report['model']}: hashed {report['hashed']} passwords in {report['seconds']}s "
+				f"({report['per_second'] or 0} per second, {report['workers']} workers)."
+			))
+
+		if options['credentials']:
+			with open(options['credentials'], 'w', newline='') as file:
+				writer = csv.DictWriter(file, ['email', 'password'])
+				writer.writeheader()
+				writer.writerows(credentials)
+			self.stdout.write(f"Wrote {len(credentials)} generated logins to {options['credentials']}.")
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from user.images import IMAGE_SIZES, IMAGE_WORKERS, has_variants, mark_rendered, render_variants
+from user.models import Parent, Staff, Student
+
+
+class Command(BaseCommand):
+	help = f'Render the {"/".join(map(str, IMAGE_SIZES))} px variants of existing profile pictures.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--workers', type=int, default=IMAGE_WORKERS)
+		parser.add_argument('--force', action='store_true', help='Re-render pictures that already have variants.')
+
+	def handle(self, *args, **options):
+		names = set()
+		for model in (Student, Staff, Parent):
+			pictures = model.objects.exclude(profile_picture='').exclude(profile_picture=None)
+			if not options['force']:
+				pictures = pictures.exclude(profile_picture_rendered=F('profile_picture'))
+			names.update(pictures.values_list('profile_picture', flat=True))
+		if not options['force']:
+			# Variants rendered before they were recorded on the profile only need recording.
+			found = {name for name in names if has_variants(name)}
+			for name in found:
+				mark_rendered(name)
+			names -= found
+
+		started = time.perf_counter()
+		failed = 0
+		with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+			futures = {pool.submit(render_variants, name): name for name in names}
+			for future in as_completed(futures):
+				try:
+					future.result()
+				except (OSError, ValueError) as e:
+					failed += 1
+					self.stderr.write(f'{futures[future]}: {e}')
+				else:
+					mark_rendered(futures[future])
+
+		self.stdout.write(self.style.SUCCESS(
+			f'Rendered {len(names) - failed} pictures in {time.perf_counter() - started:.2f}s ({failed} failed).'
+		))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_student_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='card_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_student_card_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='account_status',
+            field=models.CharField(choices=[('A', 'Active'), ('I', 'Inactive'), ('D', 'Disabled'), ('G', 'Graduated')], default='A', max_length=1),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_current_enrollment(apps, schema_editor):
+    Student = apps.get_model('user', 'Student')
+    Enrollment = apps.get_model('academic', 'Enrollment')
+    latest = Enrollment.objects.filter(student=OuterRef('pk')).order_by('-academic_year__start_date', '-created_at')
+    Student.objects.update(current_enrollment=Subquery(latest.values('id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0033_sectionrollcounter'),
+        ('user', '0012_student_graduated_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='current_enrollment',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='academic.enrollment'),
+        ),
+        migrations.RunPython(populate_current_enrollment, migrations.RunPython.noop),
+    ]
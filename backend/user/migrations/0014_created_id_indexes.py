@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0034_created_id_indexes'),
+        ('user', '0013_student_current_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['created_at', 'id'], name='leave_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parent',
+            index=models.Index(fields=['created_at', 'id'], name='parent_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['created_at', 'id'], name='staff_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['created_at', 'id'], name='student_created_id_idx'),
+        ),
+    ]
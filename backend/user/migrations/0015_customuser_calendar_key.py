@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:20
+
+import uuid
+
+from django.db import migrations, models
+
+
+def populate_calendar_key(apps, schema_editor):
+    CustomUser = apps.get_model('user', 'CustomUser')
+    users = list(CustomUser.objects.only('id'))
+    for user in users:
+        user.calendar_key = uuid.uuid4()
+    CustomUser.objects.bulk_update(users, ['calendar_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0014_created_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='calendar_key',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_calendar_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customuser',
+            name='calendar_key',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:40
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def refresh_current_enrollment(apps, schema_editor):
+    Student = apps.get_model('user', 'Student')
+    Enrollment = apps.get_model('academic', 'Enrollment')
+    current = Enrollment.objects.filter(student=OuterRef('pk')).order_by(
+        '-academic_year__is_active', '-academic_year__start_date', '-created_at'
+    )
+    Student.objects.update(current_enrollment=Subquery(current.values('id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0015_customuser_calendar_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(refresh_current_enrollment, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0016_prefer_active_enrollment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parent',
+            name='profile_picture_rendered',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='profile_picture_rendered',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='profile_picture_rendered',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+    ]
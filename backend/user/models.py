@@ -6,11 +6,15 @@ from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, Bl
 from django.contrib.auth.base_user import BaseUserManager, AbstractBaseUser
 from django.contrib.auth.hashers import make_password, check_password
 from django.contrib.auth.models import PermissionsMixin, Group, Permission
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.utils.text import slugify
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Upper
 
 from user.Manager import CustomUserManager
+from user.emails import allocate_email
+from user.passwords import generate_password, is_hashed
 
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
@@ -27,6 +31,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 	is_active = models.BooleanField(default=True)
 	is_staff = models.BooleanField(default=False)
 	date_joined = models.DateTimeField(auto_now_add=True, null=True)
+	# Secret in the user's calendar feed URL; replaced to revoke a leaked link.
+	calendar_key = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
 
 	groups = models.ManyToManyField(Group, related_name="customuser_set", blank=True)
 	user_permissions = models.ManyToManyField(Permission, related_name="customuser_set", blank=True)
@@ -77,6 +83,29 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 		verbose_name_plural = "Users"
 
 
+class StudentQuerySet(models.QuerySet):
+	def with_current_enrollment(self):
+		"""Annotate the class, section, roll number and academic year of each student's current enrollment."""
+		return self.annotate(
+			current_school_class=F('current_enrollment__school_class__name'),
+			current_section=F('current_enrollment__section__name'),
+			current_roll_number=F('current_enrollment__roll_number'),
+			current_academic_year_start=F('current_enrollment__academic_year__start_date'),
+		)
+
+	def refresh_current_enrollment(self):
+		"""
+		Point each student at their enrollment in the active academic year, or in the latest one if
+		they are not enrolled in the active year, with one UPDATE.
+		"""
+		from academic.models import Enrollment
+
+		current = Enrollment.objects.filter(student=OuterRef('pk')).order_by(
+			'-academic_year__is_active', '-academic_year__start_date', '-created_at'
+		)
+		return self.update(current_enrollment=Subquery(current.values('id')[:1]))
+
+
 class Student(models.Model):
 	# Gender Choices
 	GENDER_CHOICES = [
@@ -107,10 +136,13 @@ class Student(models.Model):
 		('A', 'Active'),
 		('I', 'Inactive'),
 		('D', 'Disabled'),
+		('G', 'Graduated'),
 	]
 
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	profile_picture = models.ImageField(upload_to='Profile Pictures/', blank=True, null=True)
+	# Name of the upload whose size variants have been rendered; see user.images.image_url.
+	profile_picture_rendered = models.CharField(max_length=100, blank=True, default='', editable=False)
 	first_name = models.CharField(max_length=30)
 	last_name = models.CharField(max_length=30)
 	date_of_birth = models.DateField()
@@ -119,12 +151,16 @@ class Student(models.Model):
 	blood_group = models.CharField(max_length=4, choices=BLOOD_GROUP_CHOICES, blank=True, null=True)
 	personal_email = models.EmailField(blank=True, null=True)
 	phone_number = models.CharField(max_length=10, blank=True, null=True)
+	current_enrollment = models.ForeignKey(
+		'academic.Enrollment', on_delete=models.SET_NULL, related_name='+', blank=True, null=True, editable=False
+	)
 	father = models.ForeignKey('Parent', on_delete=models.SET_NULL, related_name='father_of', blank=True, null=True)
 	mother = models.ForeignKey('Parent', on_delete=models.SET_NULL, related_name='mother_of', blank=True, null=True)
 	guardian = models.ForeignKey('Parent', on_delete=models.SET_NULL, related_name='guardian_of', blank=True, null=True)
 
 	email = models.EmailField(unique=True, blank=True)
 	password = models.CharField(max_length=128, blank=True)
+	card_id = models.CharField(max_length=64, unique=True, blank=True, null=True)
 
 	current_address = models.TextField()
 	permanent_address = models.TextField()
@@ -138,14 +174,22 @@ class Student(models.Model):
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	objects = StudentQuerySet.as_manager()
+
+	class Meta:
+		# Trigram indexes serve case-insensitive "contains" name searches (icontains compiles to UPPER(...) LIKE).
+		indexes = [
+			GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='student_first_name_trgm'),
+			GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='student_last_name_trgm'),
+			# (created_at, id) serves the keyset pagination of the student list.
+			models.Index(fields=['created_at', 'id'], name='student_created_id_idx'),
+		]
+
 	def get_fullname(self):
 		return f"{self.first_name} {self.last_name}"
 
 	def get_enrollment(self):
-		latest_enrollment = self.enrollments.order_by("-academic_year__start_date").first()
-		if latest_enrollment:
-			return latest_enrollment
-		return None
+		return self.current_enrollment
 
 	def get_total_present(self):
 		return self.attendance_records.filter(status=True).count()
@@ -155,26 +199,25 @@ class Student(models.Model):
 	def save(self, *args, **kwargs):
 
 		if not self.email:
-			base_email = f"{slugify(self.first_name)}.{slugify(self.last_name)}.y22@icp.edu.np"
-			unique_email = base_email
-			counter = 1
-			while Student.objects.filter(email=unique_email).exists():
-				unique_email = f"{slugify(self.first_name)}.{slugify(self.last_name)}.y22{counter}@icp.edu.np"
-				counter += 1
-			self.email = unique_email
+			self.email = allocate_email(self.first_name, self.last_name)
 
 		if not self.password:
-			self.password = uuid.uuid4().hex[:8]
-		else:
+			# Kept on the instance only, so whoever created the student can hand it out.
+			self.initial_password = generate_password()
+			self.password = make_password(self.initial_password)
+		elif not is_hashed(self.password):
 			self.password = make_password(self.password)
 
+		# Unassigned cards are stored as NULL so they do not collide on the unique index.
+		self.card_id = self.card_id or None
+
 		self.full_clean()
 		super().save(*args, **kwargs)
 
 	def check_password(self, raw_password):
-		if self.password.startswith('pbkdf2_'):
+		if is_hashed(self.password):
 			return check_password(raw_password, self.password)
-		return self.password == raw_password
+		return bool(self.password) and self.password == raw_password
 
 	def __str__(self):
 		return f"{self.first_name} {self.last_name}"
@@ -189,6 +232,8 @@ class Parent(models.Model):
 
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	profile_picture = models.ImageField(upload_to='Profile Pictures/', blank=True, null=True)
+	# Name of the upload whose size variants have been rendered; see user.images.image_url.
+	profile_picture_rendered = models.CharField(max_length=100, blank=True, default='', editable=False)
 	full_name = models.CharField(max_length=60)
 	email = models.EmailField(unique=True, blank=True, null=True)
 	password = models.CharField(max_length=128, blank=True)
@@ -201,10 +246,13 @@ class Parent(models.Model):
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [models.Index(fields=['created_at', 'id'], name='parent_created_id_idx')]
+
 	def check_password(self, raw_password):
-		if self.password.startswith('pbkdf2_'):
+		if is_hashed(self.password):
 			return check_password(raw_password, self.password)
-		return self.password == raw_password
+		return bool(self.password) and self.password == raw_password
 
 	def clean(self):
 		if self.relationship == 'G':
@@ -217,6 +265,8 @@ class Parent(models.Model):
 		return self.full_name
 
 	def save(self, *args, **kwargs):
+		if self.password and not is_hashed(self.password):
+			self.password = make_password(self.password)
 		self.full_clean()
 		super().save(*args, **kwargs)
 
@@ -277,6 +327,8 @@ class Staff(models.Model):
 
 	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 	profile_picture = models.ImageField(upload_to='Profile Pictures/', blank=True, null=True)
+	# Name of the upload whose size variants have been rendered; see user.images.image_url.
+	profile_picture_rendered = models.CharField(max_length=100, blank=True, default='', editable=False)
 	first_name = models.CharField(max_length=30)
 	last_name = models.CharField(max_length=30)
 	phone_number = models.CharField(max_length=10)
@@ -318,24 +370,18 @@ class Staff(models.Model):
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [models.Index(fields=['created_at', 'id'], name='staff_created_id_idx')]
+
 	def save(self, *args, **kwargs):
 		if not self.email:
-			base_email = f"{slugify(self.first_name)}.{slugify(self.last_name)}.y22@icp.edu.np"
-			unique_email = base_email
-			counter = 1
-
-			while Student.objects.filter(email=unique_email).exists():
-				unique_email = f"{slugify(self.first_name)}.{slugify(self.last_name)}.y22{counter}@icp.edu.np"
-				counter += 1
-
-			self.email = unique_email
+			self.email = allocate_email(self.first_name, self.last_name)
 
 		if not self.password:
 			raw_password = "H4582ed"
-			self.password = raw_password
-		else:
-			if not self.password.startswith('pbkdf2_'):
-				self.password = make_password(self.password)
+			self.password = make_password(raw_password)
+		elif not is_hashed(self.password):
+			self.password = make_password(self.password)
 
 		self.full_clean()
 		super().save(*args, **kwargs)
@@ -388,5 +434,8 @@ class Leave(models.Model):
 
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [models.Index(fields=['created_at', 'id'], name='leave_created_id_idx')]
+
 	def __str__(self):
 		return f"{self.student.get_fullname()}"
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import transaction
+
+# Below this many passwords the pool start-up costs more than it saves.
+POOL_THRESHOLD = 16
+PROVISION_BATCH_SIZE = 1000
+
+
+def is_hashed(value):
+	if not value:
+		return False
+	try:
+		identify_hasher(value)
+	except ValueError:
+		return False
+	return True
+
+
+def generate_password():
+	return secrets.token_hex(4)
+
+
+def _init_worker():
+	import django
+	django.setup()
+
+
+def hash_passwords(raw_passwords, workers=None):
+	"""Hash ``raw_passwords`` with the default hasher, spreading large batches over all CPU cores."""
+	raw_passwords = list(raw_passwords)
+	workers = workers or os.cpu_count() or 1
+	if len(raw_passwords) < POOL_THRESHOLD or workers == 1:
+		return [make_password(raw) for raw in raw_passwords]
+
+	# Spawned workers set Django up themselves instead of inheriting a forked server's threads and connections.
+	with ProcessPoolExecutor(
+		max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker
+	) as pool:
+		return list(pool.map(make_password, raw_passwords, chunksize=max(1, len(raw_passwords) // (workers * 4))))
+
+
+def provision_credentials(model, ids=None, workers=None, batch_size=PROVISION_BATCH_SIZE, progress=None,
+                          generate_missing=True):
+	"""
+	Hash every plaintext or empty password of ``model`` (Student, Staff or Parent) in a process pool
+	and write the hashes back with ``bulk_update``.
+
+	Plaintext passwords keep working after hashing; empty ones get a generated password unless
+	``generate_missing`` is false. Returns a report with throughput and the generated
+	``credentials`` that still have to be handed out.
+	"""
+	progress = progress or (lambda done, total: None)
+	accounts = model.objects.exclude(password__startswith='pbkdf2_').only('id', 'email', 'password').order_by('pk')
+	if ids is not None:
+		accounts = accounts.filter(pk__in=ids)
+	accounts = [
+		account for account in accounts
+		if not is_hashed(account.password) and (account.password or generate_missing)
+	]
+
+	started = time.perf_counter()
+	credentials = []
+	for start in range(0, len(accounts), batch_size):
+		batch = accounts[start:start + batch_size]
+		raw_passwords = []
+		for account in batch:
+			if not account.password:
+				account.password = generate_password()
+				credentials.append({'email': account.email, 'password': account.password})
+			raw_passwords.append(account.password)
+		for account, hashed in zip(batch, hash_passwords(raw_passwords, workers=workers)):
+			account.password = hashed
+		with transaction.atomic():
+			model.objects.bulk_update(batch, ['password'])
+		progress(start + len(batch), len(accounts))
+
+	seconds = time.perf_counter() - started
+	return {
+		'model': model.__name__,
+		'hashed': len(accounts),
+		'workers': workers or os.cpu_count() or 1,
+		'seconds': round(seconds, 2),
+		'per_second': round(len(accounts) / seconds, 1) if seconds else None,
+		'credentials': credentials,
+	}
+
+
+# Async helpers run the hashing in a worker thread (hashlib releases the GIL), so async code under
+# daphne never blocks the event loop, or the thread shared by sync views, on PBKDF2.
+
+async def amake_password(raw_password):
+	return await sync_to_async(make_password, thread_sensitive=False)(raw_password)
+
+
+async def acheck_password(account, raw_password):
+	return await sync_to_async(account.check_password, thread_sensitive=False)(raw_password)
+
+
+async def ahash_passwords(raw_passwords, workers=None):
+	return await sync_to_async(hash_passwords, thread_sensitive=False)(raw_passwords, workers)
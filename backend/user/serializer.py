@@ -1,9 +1,32 @@
 from rest_framework import serializers
 
 from academic.models import Enrollment
+from .images import IMAGE_SIZES, image_url
 from .models import Student, Parent, Leave, CustomUser
 
 
+class ProfilePictureField(serializers.ImageField):
+	"""
+	Serializes an image as the URL of its pre-rendered variant closest to ``size`` px. Clients can
+	ask for another size with ``?picture_size=``; ``size=None`` returns the original upload.
+	"""
+
+	def __init__(self, size=None, **kwargs):
+		self.size = size
+		kwargs.setdefault('read_only', True)
+		super().__init__(**kwargs)
+
+	def to_representation(self, value):
+		if not value:
+			return None
+		size = self.size
+		request = self.context.get('request')
+		if request is not None and request.query_params.get('picture_size', '').isdigit():
+			size = min(int(request.query_params['picture_size']), max(IMAGE_SIZES))
+		url = image_url(value, size)
+		return request.build_absolute_uri(url) if request is not None else url
+
+
 class StudentSerializer(serializers.ModelSerializer):
 	class Meta:
 		model = Student
@@ -17,6 +40,7 @@ class StudentSerializer(serializers.ModelSerializer):
 			'blood_group',
 			'personal_email',
 			'phone_number',
+			'card_id',
 
 			'father',
 			'mother',
@@ -3,6 +3,7 @@ from django.dispatch import receiver
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
+from .images import is_rendered, schedule_variants
 from .models import Parent, Staff, Student, CustomUser
 
 
@@ -38,6 +39,15 @@ def create_student_profile(sender, instance, created, **kwargs):
 		)
 
 
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Staff)
+@receiver(post_save, sender=Parent)
+def render_profile_picture_variants(sender, instance, **kwargs):
+	# A new upload always gets a new storage name, so it no longer matches profile_picture_rendered.
+	if instance.profile_picture and not is_rendered(instance.profile_picture):
+		schedule_variants(instance.profile_picture.name)
+
+
 @receiver(post_save, sender=CustomUser)
 def send_email_notification(sender, instance, created, **kwargs):
 	pass
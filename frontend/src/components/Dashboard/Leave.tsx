@@ -19,6 +19,7 @@ import {
     DialogTitle,
 } from "@/components/ui/dialog"
 import axiosInstance from "@/auth/AxiosInstance.ts";
+import { fetchAllPages } from "@/lib/pagination.ts";
 import {Link} from "react-router-dom";
 
 interface Student {
@@ -68,9 +69,9 @@ export function LeavePage() {
     }
 
     const fetchLeaveRequest = () => {
-        axiosInstance.get('/api/auth/leave/')
-            .then((res) => {
-                setLeaveRequests(res.data)
+        fetchAllPages<LeaveRequest>('/api/auth/leave/')
+            .then((data) => {
+                setLeaveRequests(data)
             })
             .catch((error) => {
                 console.error("Error fetching leave requests:", error)
@@ -0,0 +1,24 @@
+import AxiosInstance from "@/auth/AxiosInstance.ts"
+
+export interface Page<T> {
+    next: string | null
+    previous: string | null
+    results: T[]
+}
+
+// List endpoints answer one cursor page at a time ({next, previous, results}). Screens that filter
+// and sort the whole list in the browser follow `next` to the last page and get the rows back as
+// one array, the shape these endpoints used to return.
+export async function fetchAllPages<T>(url: string, pageSize = 200): Promise<T[]> {
+    const rows: T[] = []
+    let next: string | null = url
+    // The `next` links already carry page_size and the cursor, so the params only go on the first request.
+    let params: { page_size: number } | undefined = { page_size: pageSize }
+    while (next) {
+        const response: { data: Page<T> } = await AxiosInstance.get<Page<T>>(next, { params })
+        rows.push(...response.data.results)
+        next = response.data.next
+        params = undefined
+    }
+    return rows
+}
@@ -22,6 +22,7 @@ import { useForm } from "react-hook-form"
 import { Form, FormControl, FormField, FormItem, FormLabel, FormMessage } from "@/components/ui/form"
 import { useAuthStore } from "@/store/AuthStore.ts"
 import axiosInstance from "@/auth/AxiosInstance.ts"
+import { fetchAllPages } from "@/lib/pagination.ts"
 
 interface ExamRoutine {
     id: string
@@ -187,9 +188,9 @@ export function ExamRoutinesPage() {
     const fetchExams = async () => {
         try {
             setLoading(true)
-            const response = await axiosInstance.get("/api/academic/exam/")
+            const exams = await fetchAllPages<ExamRoutine>("/api/academic/exam/")
 
-            const examsWithStatus = response.data.map((exam: ExamRoutine) => {
+            const examsWithStatus = exams.map((exam: ExamRoutine) => {
                 const examDate = new Date(exam.exam_date)
                 const today = new Date()
                 today.setHours(0, 0, 0, 0)
@@ -3,7 +3,7 @@ import { PlusCircle } from "lucide-react"
 import { FilterBar } from "@/components/ListPage/FilterBar.tsx"
 import { useNavigate } from "react-router-dom"
 import { useEffect, useState } from "react"
-import AxiosInstance from "@/auth/AxiosInstance.ts"
+import { fetchAllPages } from "@/lib/pagination.ts"
 import { toast } from "sonner"
 import { StudentCardSkeleton } from "@/components/ListPage/StudentCardSkeleton.tsx"
 import { ParentCard } from "@/components/ListPage/ParentCard.tsx"
@@ -49,9 +49,9 @@ export function ParentListPage() {
     const [sortOrder, setSortOrder] = useState("name_asc")
 
     useEffect(() => {
-        AxiosInstance.get("/api/parent/") // Changed to correct API endpoint
-            .then((response) => {
-                setApiData(response.data)
+        fetchAllPages<(typeof apiData)[number]>("/api/parent/")
+            .then((data) => {
+                setApiData(data)
             })
             .catch((error) => {
                 console.error(error)
@@ -7,6 +7,7 @@ import { FilterBar } from "@/components/ListPage/FilterBar.tsx"
 import { useNavigate } from "react-router-dom"
 import { useEffect, useState } from "react"
 import AxiosInstance from "@/auth/AxiosInstance.ts"
+import { fetchAllPages } from "@/lib/pagination.ts"
 import { toast } from "sonner"
 import { StaffCardSkeletonShimmerV4 } from "@/components/ListPage/StaffCardSkeleton.tsx"
 
@@ -53,10 +54,10 @@ export function StaffListPage() {
 
     const fetchStaffMembers = () => {
         setLoading(true)
-        AxiosInstance.get("/api/staff/")
-            .then((response) => {
-                console.log("Staff members:", response.data)
-                setApiData(response.data)
+        fetchAllPages<(typeof apiData)[number]>("/api/staff/")
+            .then((data) => {
+                console.log("Staff members:", data)
+                setApiData(data)
             })
             .catch((error) => {
                 console.error(error)
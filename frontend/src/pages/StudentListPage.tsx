@@ -6,6 +6,7 @@ import { FilterBar } from "@/components/ListPage/FilterBar.tsx"
 import { useNavigate } from "react-router-dom"
 import { useEffect, useState, useMemo } from "react"
 import AxiosInstance from "@/auth/AxiosInstance.ts"
+import { fetchAllPages } from "@/lib/pagination.ts"
 import { toast } from "sonner"
 import { StudentCard } from "@/components/ListPage/StudentCard.tsx"
 import { StudentCardSkeleton } from "@/components/ListPage/StudentCardSkeleton.tsx"
@@ -50,9 +51,9 @@ export function StudentListPage() {
 
     const fetchStudents = () => {
         setLoading(true)
-        AxiosInstance.get("/api/student/")
-            .then((response) => {
-                setApiData(response.data)
+        fetchAllPages<(typeof apiData)[number]>("/api/student/")
+            .then((data) => {
+                setApiData(data)
             })
             .catch((error) => {
                 console.error(error)
@@ -45,6 +45,7 @@ import { Label } from "@/components/ui/label"
 import { Textarea } from "@/components/ui/textarea"
 import { Switch } from "@/components/ui/switch"
 import axiosInstance from "@/auth/AxiosInstance.ts"
+import { fetchAllPages } from "@/lib/pagination.ts"
 import {useAuthStore} from "@/store/AuthStore.ts";
 
 interface SchoolClass {
@@ -112,8 +113,7 @@ export default function AdminAnnouncementPage() {
     const fetchAnnouncements = async () => {
         setLoading(true)
         try {
-            const response = await axiosInstance.get("/api/academic/announcement/")
-            setAnnouncements(response.data)
+            setAnnouncements(await fetchAllPages<Announcement>("/api/academic/announcement/"))
             setLoading(false)
         } catch (error) {
             console.error("Error fetching announcements:", error)
@@ -29,6 +29,7 @@ import { Popover, PopoverContent, PopoverTrigger } from "@/components/ui/popover
 import { Calendar as CalendarComponent } from "@/components/ui/calendar"
 import { Skeleton } from "@/components/ui/skeleton"
 import axiosInstance from "@/auth/AxiosInstance.ts"
+import { fetchAllPages } from "@/lib/pagination.ts"
 import {useAuthStore} from "@/store/AuthStore.ts";
 
 interface Assignment {
@@ -89,10 +90,8 @@ export default function TeacherAssignmentPage() {
 
     const fetchAssignments = async () => {
         setLoading(true)
-        axiosInstance
-            .get("/api/academic/assignment/")
-            .then((response) => {
-                const data = response.data
+        fetchAllPages<Assignment>("/api/academic/assignment/")
+            .then((data) => {
                 setAssignments(data)
             })
             .catch((error) => {
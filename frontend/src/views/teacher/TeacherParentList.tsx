@@ -1,7 +1,7 @@
 import { PageHeader } from "@/components/ListPage/PageHeader.tsx"
 import { FilterBar } from "@/components/ListPage/FilterBar.tsx"
 import { useEffect, useState } from "react"
-import AxiosInstance from "@/auth/AxiosInstance.ts"
+import { fetchAllPages } from "@/lib/pagination.ts"
 import { toast } from "sonner"
 import { StudentCardSkeleton } from "@/components/ListPage/StudentCardSkeleton.tsx"
 import { ParentCard } from "@/components/ListPage/ParentCard.tsx"
@@ -46,9 +46,9 @@ export function TeacherParentList() {
     const [sortOrder, setSortOrder] = useState("name_asc")
 
     useEffect(() => {
-        AxiosInstance.get("/api/parent/") // Changed to correct API endpoint
-            .then((response) => {
-                setApiData(response.data)
+        fetchAllPages<(typeof apiData)[number]>("/api/parent/")
+            .then((data) => {
+                setApiData(data)
             })
             .catch((error) => {
                 console.error(error)